@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
+import base64
+import contextlib
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, List, Literal, get_args
+from typing import Any, Callable, Dict, Iterator, List, Literal, get_args
 
 import tweepy
 
-from pysna.fetch import TwitterDataFetcher
-from pysna.process import TwitterDataProcessor
+from pysna.fetch import TwitterDataFetcher, require_available
+from pysna.process import SketchIndex, TwitterDataProcessor
+from pysna.retry import DeadlineExceeded, RetryPolicy
+from pysna.store import LRUCache, NegativeCache, RateLimitStore, TimelineStore
 from pysna.utils import strf_datetime
 
 # create logger instance
@@ -54,6 +63,7 @@ class TwitterAPI(tweepy.Client):
         "default_profile_image",
         "withheld_in_countries",
         "bot_scores",
+        "sentiment_profile",
     ]
 
     LITERALS_TWEET_INFO = Literal[
@@ -108,6 +118,43 @@ class TwitterAPI(tweepy.Client):
 
     SIMILARITY_FEATURES_COMPARE_USERS = Literal["followers_count", "friends_count", "listed_count", "favourites_count", "statuses_count"]
 
+    # maps comparison attributes that can be approximated to the total count field of the Twitter User Object and the page size of the respective endpoint
+    APPROXIMATE_ATTRIBUTES_COMPARE_USERS = {"common_followers": ("followers_count", 5000), "common_followees": ("friends_count", 5000), "commonly_liked_tweets": ("favourites_count", 100)}
+
+    # maps comparison attributes to the fetcher methods that are scheduled for every user, so they run concurrently while other endpoints are rate limited
+    SCHEDULED_ATTRIBUTES_COMPARE_USERS = {
+        "distinct_followers": "get_user_follower_ids",
+        "common_followees": "get_user_followee_ids",
+        "distinct_followees": "get_user_followee_ids",
+        "commonly_liked_tweets": "get_liked_tweets_ids",
+        "distinctly_liked_tweets": "get_liked_tweets_ids",
+    }
+
+    # maps numeric comparison attributes to the corresponding field of the Twitter User Object
+    COUNT_ATTRIBUTES_COMPARE_USERS = {"followers_count": "followers_count", "followees_count": "friends_count", "tweets_count": "statuses_count", "favourites_count": "favourites_count"}
+
+    # relative costs of comparison attributes: fields of the user objects, relationships of all user pairs, estimates from bounded samples, and complete paginated lists
+    # cheaper attributes are started first, so their results are available (and streamed) first
+    ATTRIBUTE_COSTS_COMPARE_USERS = {
+        "followers_count": 0,
+        "followees_count": 0,
+        "tweets_count": 0,
+        "favourites_count": 0,
+        "similarity": 0,
+        "created_at": 0,
+        "protected": 0,
+        "verified": 0,
+        "relationship": 1,
+        "common_followers": 3,
+        "distinct_followers": 3,
+        "common_followees": 3,
+        "distinct_followees": 3,
+        "commonly_liked_tweets": 3,
+        "distinctly_liked_tweets": 3,
+    }
+    # cost of approximated comparison attributes
+    APPROXIMATE_ATTRIBUTE_COST = 2
+
     LITERALS_COMPARE_TWEETS = Literal[
         "view_count",
         "like_count",
@@ -126,6 +173,26 @@ class TwitterAPI(tweepy.Client):
 
     SIMILARITY_FEATURES_COMPARE_TWEETS = Literal["retweet_count", "reply_count", "like_count", "quote_count", "impression_count"]
 
+    # maps numeric comparison attributes to the corresponding public metric of a Tweet
+    COUNT_ATTRIBUTES_COMPARE_TWEETS = {"view_count": "impression_count", "like_count": "like_count", "retweet_count": "retweet_count", "quote_count": "quote_count", "reply_count": "reply_count"}
+
+    # relative costs of comparison attributes: public metrics and fields of the Tweet objects, and complete paginated user lists
+    ATTRIBUTE_COSTS_COMPARE_TWEETS = {
+        "view_count": 0,
+        "like_count": 0,
+        "retweet_count": 0,
+        "quote_count": 0,
+        "reply_count": 0,
+        "similarity": 0,
+        "created_at": 0,
+        "common_quoting_users": 3,
+        "distinct_quoting_users": 3,
+        "common_liking_users": 3,
+        "distinct_liking_users": 3,
+        "common_retweeters": 3,
+        "distinct_retweeters": 3,
+    }
+
     def __init__(
         self,
         bearer_token: Any | None = None,
@@ -136,6 +203,12 @@ class TwitterAPI(tweepy.Client):
         x_rapidapi_key: Any | None = None,
         x_rapidapi_host: Any | None = None,
         wait_on_rate_limit: bool = True,
+        credentials: List[Dict[str, Any]] | None = None,
+        rate_limit_state: RateLimitStore | None = None,
+        retry_policy: RetryPolicy | None = None,
+        negative_cache: NegativeCache | None = None,
+        priority: str = "normal",
+        background_share: float = 0.5,
     ):
         super(self.__class__, self).__init__(bearer_token, consumer_key, consumer_secret, access_token, access_token_secret, wait_on_rate_limit=wait_on_rate_limit)
 
@@ -149,11 +222,29 @@ class TwitterAPI(tweepy.Client):
         self._wait_on_rate_limit = wait_on_rate_limit
 
         # init TwitterDataFetcher
-        self.fetcher = TwitterDataFetcher(self._bearer_token, self._consumer_key, self._consumer_secret, self._access_token, self._access_token_secret, self._x_rapidapi_key, self._x_rapidapi_host)
+        self.fetcher = TwitterDataFetcher(
+            self._bearer_token,
+            self._consumer_key,
+            self._consumer_secret,
+            self._access_token,
+            self._access_token_secret,
+            self._x_rapidapi_key,
+            self._x_rapidapi_host,
+            wait_on_rate_limit=self._wait_on_rate_limit,
+            credentials=credentials,
+            rate_limit_state=rate_limit_state,
+            retry_policy=retry_policy,
+            negative_cache=negative_cache,
+            priority=priority,
+            background_share=background_share,
+        )
 
         # init DataProcessor
         self.data_processor = TwitterDataProcessor()
 
+        # sentiment labels and compound scores of recently scored Tweets with Tweet IDs as keys
+        self._sentiment_cache = LRUCache(max_size=100000)
+
     def _handle_output(self, output: dict) -> Any:
         """Returns either the single value from one-key dictionary or the dictionary itself.
 
@@ -171,15 +262,204 @@ class TwitterAPI(tweepy.Client):
             # else return original output
             return output
 
-    def user_info(self, user: str | int, attributes: List[LITERALS_USER_INFO] | str, return_timestamp: bool = False) -> Any:
+    def _calc_count_metrics(self, objs: Dict[str | int, dict], attributes: Dict[str, str]) -> Dict[str, dict]:
+        """Calculates descriptive metrics for several numeric attributes of several objects in one pass.
+
+        Args:
+            objs (Dict[str | int, dict]): Serialized objects (e.g., users or public Tweet metrics) with their identifiers as keys.
+            attributes (Dict[str, str]): Comparison attributes mapped to the respective field of the serialized objects.
+
+        Returns:
+            Dict[str, dict]: Individual values and descriptive metrics for each comparison attribute.
+        """
+        # build objects x attributes matrix
+        matrix = [[obj[field] for field in attributes.values()] for obj in objs.values()]
+        metrics = self.data_processor.calc_descriptive_metrics_matrix(matrix, columns=list(attributes.keys()))
+        # add individual values and metrics for each attribute
+        results = dict()
+        for attr, field in attributes.items():
+            results[attr] = {key: obj[field] for key, obj in objs.items()}
+            results[attr]["metrics"] = metrics[attr]
+        return results
+
+    def _deadline(self, timeout: float | None):
+        """Returns a context that sets the deadline of all requests made within it, or a context without effect if no timeout is given."""
+        return contextlib.nullcontext() if timeout is None else self.fetcher.retry.deadline(timeout)
+
+    def _compute_attributes(self, attributes: List[str], compute, timeout: float | None, prepare=None, costs: Dict[str, int] | None = None, callback: Callable[[dict], None] | None = None) -> tuple:
+        """Computes the values of the requested attributes.
+
+        Without a timeout and callback, the attributes are computed one after another. Otherwise, they are computed concurrently (see '_iter_attributes') and every attribute that has not finished before the deadline is cancelled: queued requests are dropped and running requests fail with DeadlineExceeded.
+
+        Args:
+            attributes (List[str]): Requested attributes.
+            compute: Function that returns the value of an attribute.
+            timeout (float | None): Seconds until unfinished attributes are cancelled.
+            prepare (optional): Function that schedules the requests of an attribute before any attribute is computed. Defaults to None.
+            costs (Dict[str, int] | None, optional): Relative costs of the attributes. Cheaper attributes are started first. Defaults to None.
+            callback (Callable[[dict], None] | None, optional): Function that is called with every event of the computation. Defaults to None.
+
+        Returns:
+            tuple: Values and completion status ('complete' or 'pending') per attribute. The status is None if no timeout was given.
+        """
+        if (timeout is None) and (callback is None):
+            if prepare is not None:
+                for attr in attributes:
+                    prepare(attr)
+            return {attr: compute(attr) for attr in attributes}, None
+        results, status = dict(), dict()
+        for event in self._iter_attributes(attributes, compute, timeout, prepare=prepare, costs=costs):
+            if callback is not None:
+                callback(event)
+            if event["event"] == "result":
+                results[event["attribute"]], status[event["attribute"]] = event["value"], "complete"
+            elif event["event"] == "pending":
+                status[event["attribute"]] = "pending"
+        # keep the requested order of the attributes
+        results = {attr: results[attr] for attr in attributes if attr in results}
+        return results, (None if timeout is None else {attr: status[attr] for attr in attributes})
+
+    def _iter_attributes(self, attributes: List[str], compute, timeout: float | None = None, prepare=None, costs: Dict[str, int] | None = None, priority: str | None = None) -> Iterator[dict]:
+        """Computes the requested attributes concurrently and yields events as soon as they occur.
+
+        Attributes are started cheapest first, so cheap attributes are usually finished first. Events are dictionaries with an 'event' and an 'attribute' key:
+        'progress' events contain the number of 'pages' and 'items' requested so far by paginated requests of the attribute, 'result' events contain the 'value' of a finished attribute,
+        and 'pending' events are yielded for attributes that have not finished before the timeout.
+
+        Args:
+            attributes (List[str]): Requested attributes.
+            compute: Function that returns the value of an attribute.
+            timeout (float | None, optional): Seconds until unfinished attributes are cancelled. Defaults to None.
+            prepare (optional): Function that schedules the requests of an attribute before it is computed. Defaults to None.
+            costs (Dict[str, int] | None, optional): Relative costs of the attributes. Defaults to None.
+            priority (str | None, optional): Priority of the requests. Defaults to None, thus, the priority of the iterating thread.
+
+        Yields:
+            dict: Progress, result, and pending events.
+        """
+        costs = costs or dict()
+        priority = priority or self.fetcher.pool.current_priority()
+        # an earlier deadline of the caller cannot be extended
+        limits = [limit for limit in (timeout, self.fetcher.retry.remaining_time()) if limit is not None]
+        deadline = time.monotonic() + min(limits) if limits else None
+        # progress events and finished attributes of all workers
+        events = queue.Queue()
+
+        def run(attr):
+            progress, lock = {"pages": 0, "items": 0}, threading.Lock()
+
+            def page_fetched(items: int):
+                with lock:
+                    progress["pages"] += 1
+                    progress["items"] += items
+                    events.put((attr, {"event": "progress", "attribute": attr, **progress}))
+
+            # deadlines, priorities, and progress callbacks are set per thread and passed on to scheduled requests
+            with self._deadline(None if deadline is None else deadline - time.monotonic()), self.fetcher.pool.prioritized(priority), self.fetcher.track_progress(page_fetched):
+                if prepare is not None:
+                    prepare(attr)
+                return compute(attr)
+
+        order = sorted(dict.fromkeys(attributes), key=lambda attr: costs.get(attr, 0))
+        executor = ThreadPoolExecutor(max_workers=max(1, len(order)))
+        futures = dict()
+        for attr in order:
+            futures[attr] = executor.submit(run, attr)
+            futures[attr].add_done_callback(lambda future, attr=attr: events.put((attr, None)))
+        pending = set(order)
+        try:
+            while pending:
+                try:
+                    attr, event = events.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if event is not None:
+                    yield event
+                    continue
+                pending.discard(attr)
+                error = futures[attr].exception()
+                if error is None:
+                    yield {"event": "result", "attribute": attr, "value": futures[attr].result()}
+                elif isinstance(error, DeadlineExceeded):
+                    yield {"event": "pending", "attribute": attr}
+                else:
+                    raise error
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for attr in order:
+            if attr in pending:
+                yield {"event": "pending", "attribute": attr}
+
+    def _stream_output(self, method: str, arguments: Dict[str, Any], events: Iterator[dict], return_timestamp: bool = False) -> Iterator[dict]:
+        """Yields the events of a streamed call followed by an 'end' event with the completion status per attribute and a continuation token for pending attributes.
+
+        Args:
+            method (str): Name of the called method.
+            arguments (Dict[str, Any]): Arguments of the call to be resumed.
+            events (Iterator[dict]): Events of the attributes.
+            return_timestamp (bool, optional): Add UTC Timestamp to the 'end' event. Defaults to False.
+
+        Yields:
+            dict: Progress, result, pending, and end events.
+        """
+        status = dict()
+        for event in events:
+            if event["event"] in ("result", "pending"):
+                status[event["attribute"]] = "complete" if event["event"] == "result" else "pending"
+            yield event
+        end = {"event": "end", "status": status, "continuation": self._continuation(method, arguments, status)}
+        if return_timestamp:
+            end["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
+        yield end
+
+    def _continuation(self, method: str, arguments: Dict[str, Any], status: dict) -> str | None:
+        """Returns a continuation token for the pending attributes of a call, or None if all attributes were completed.
+
+        Args:
+            method (str): Name of the called method.
+            arguments (Dict[str, Any]): Arguments of the call to be resumed. The attributes argument is replaced with the pending attributes.
+            status (dict): Completion status per attribute.
+
+        Returns:
+            str | None: Continuation token.
+        """
+        pending = [attr for attr, state in status.items() if state != "complete"]
+        if not pending:
+            return None
+        attributes_argument = "attributes" if method in ("user_info", "tweet_info") else "compare"
+        state = {"method": method, "arguments": {**arguments, attributes_argument: pending}}
+        return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+    def _partial_output(self, method: str, arguments: Dict[str, Any], results: dict, status: dict, return_timestamp: bool = False) -> dict:
+        """Returns the results of a call with a timeout together with the completion status per attribute and a continuation token for pending attributes.
+
+        Args:
+            method (str): Name of the called method.
+            arguments (Dict[str, Any]): Arguments of the call to be resumed. The attributes argument is replaced with the pending attributes.
+            results (dict): Values of the completed attributes.
+            status (dict): Completion status per attribute.
+            return_timestamp (bool, optional): Add UTC Timestamp to the output. Defaults to False.
+
+        Returns:
+            dict: Results, status, continuation token (None if all attributes were completed), and the UTC timestamp if requested.
+        """
+        output = {"results": results, "status": status, "continuation": self._continuation(method, arguments, status)}
+        if return_timestamp:
+            output["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
+        return output
+
+    def user_info(self, user: str | int, attributes: List[LITERALS_USER_INFO] | str, return_timestamp: bool = False, store: TimelineStore | None = None, timeout: float | None = None, priority: str | None = None) -> Any:
         """Receive requested user information from Twitter User Object.
 
         For one attribute, only the corresponding value is returned. For multiple attributes, a dictionary with the key-value pairs of the requested attributes is returned.
 
         Args:
             user (str | int): Twitter User either specified by corresponding ID or screen name.
-            attributes (List[str] | str): Attributes of the User object. These must be from: id, id_str, name, screen_name, followers, followees, location, description, url, entities, protected, followers_count, friends_count, listed_count, created_at, latest_activity, last_active, liked_tweets, composed_tweets, favourites_count, verified, statuses_count, status, contributors_enabled, profile_image_url_https, profile_banner_url, default_profile, default_profile_image, withheld_in_countries, bot_scores
+            attributes (List[str] | str): Attributes of the User object. These must be from: id, id_str, name, screen_name, followers, followees, location, description, url, entities, protected, followers_count, friends_count, listed_count, created_at, latest_activity, last_active, liked_tweets, composed_tweets, favourites_count, verified, statuses_count, status, contributors_enabled, profile_image_url_https, profile_banner_url, default_profile, default_profile_image, withheld_in_countries, bot_scores, sentiment_profile
             return_timestamp (bool, optional): Add UTC Timestamp to results. Defaults to False.
+            store (TimelineStore | None, optional): Local store for liked_tweets, composed_tweets, and sentiment_profile. If provided, only Tweets newer than the stored ones are requested and merged into the store. Defaults to None.
+            timeout (float | None, optional): Seconds until attributes that are not finished yet are cancelled. If provided, a dictionary with the 'results' of the finished attributes, the 'status' per attribute, and a 'continuation' token for the pending attributes (see 'resume') is returned. Defaults to None.
+            priority (str | None, optional): Priority of the requests: 'high' requests are served first, 'background' requests only use a share of every endpoint's quota. Defaults to None, thus, the priority of the TwitterAPI instance.
 
         Raises:
             KeyError: If invalid attribute was provided.
@@ -195,57 +475,114 @@ class TwitterAPI(tweepy.Client):
             if (self._x_rapidapi_key is None) or (self._x_rapidapi_host is None):
                 raise ValueError("'X_RAPIDAPI_KEY' and 'X_RAPIDAPI_HOST' secrets for Botometer API need to be provided.")
 
-        # initialize empty dict to store requested attributes
-        user_info = dict()
         # if single string was provided
         if isinstance(attributes, str):
             # convert to list for iteration
             attributes = [attributes]
-        # get user object
-        user_obj = self.fetcher.get_user_object(user)
-        # loop through the list of attributes and add them to the dictionary
+        # if invalid attribute was provided
         for attr in attributes:
-            # if invalid attribute was provided
             if attr not in get_args(self.LITERALS_USER_INFO):
                 raise ValueError("Invalid attribute for '{}'".format(attr))
+
+        def get_attribute(attr: str) -> Any:
             # if the desired attribute is in default user object returned by the v1 Search API
-            elif attr in user_obj._json.keys():
-                user_info[attr] = user_obj._json[attr]
-            # get information about user's followers
-            elif attr == "followers":
-                user_info[attr] = self.data_processor.extract_followers(user_obj)
-            # get information about user's followees
-            elif attr == "followees":
-                user_info[attr] = self.data_processor.extract_followees(user_obj)
-            # get all liked tweets of user
-            elif attr == "liked_tweets":
-                # get page results first
-                liked_tweets = self.fetcher.get_liked_tweets_ids(user)
-                user_info[attr] = liked_tweets
-            # get all composed tweets
-            elif attr == "composed_tweets":
-                # get page results first
-                composed_tweets = self.fetcher.get_composed_tweets_ids(user)
-                user_info[attr] = composed_tweets
-            # get user's latest activity
-            elif attr == "latest_activity":
-                user_info[attr] = self.fetcher.get_latest_activity(user)
-            # get user's latest activity date
-            elif attr == "last_active":
-                user_info[attr] = self.fetcher.get_latest_activity_date(user)
-            # get user's botometer scores
-            elif attr == "bot_scores":
-                user_info[attr] = self.fetcher.get_botometer_scores(user)
-            # if attribute was not found
-            else:
-                user_info[attr] = None
-            # if timestamp should be returned
+            if attr in user_obj._json.keys():
+                return user_obj._json[attr]
+            match attr:
+                # get information about user's followers
+                case "followers":
+                    return self.data_processor.extract_followers(user_obj)
+                # get information about user's followees
+                case "followees":
+                    return self.data_processor.extract_followees(user_obj)
+                # get all liked tweets of user
+                case "liked_tweets":
+                    # get page results first
+                    liked_tweets = self.fetcher.get_liked_tweets_ids(user, store=store)
+                    return liked_tweets if store is None else liked_tweets.tolist()
+                # get all composed tweets
+                case "composed_tweets":
+                    # get page results first
+                    composed_tweets = self.fetcher.get_composed_tweets_ids(user, store=store)
+                    return composed_tweets if store is None else composed_tweets.tolist()
+                # get user's latest activity
+                case "latest_activity":
+                    return self.fetcher.get_latest_activity(user)
+                # get user's latest activity date
+                case "last_active":
+                    return self.fetcher.get_latest_activity_date(user)
+                # get user's botometer scores
+                case "bot_scores":
+                    return self.fetcher.get_botometer_scores(user)
+                # get sentiment distribution and weekly series over user's timeline
+                case "sentiment_profile":
+                    tweets = self.fetcher.get_composed_tweets_texts(user, store=store)
+                    return self.data_processor.calc_sentiment_profile(tweets, frequency="week", cache=self._sentiment_cache)
+                # if attribute was not found
+                case _:
+                    return None
+
+        with self._deadline(timeout), self.fetcher.pool.prioritized(priority):
+            # get user object
+            user_obj = self.fetcher.get_user_object(user)
+            # loop through the list of attributes and add them to the dictionary
+            user_info, status = self._compute_attributes(attributes, get_attribute, timeout)
+        if status is not None:
+            # the store is resumed from its directory
+            arguments = {"user": user, "return_timestamp": return_timestamp, "store": None if store is None else store.directory, "priority": priority}
+            return self._partial_output("user_info", arguments, user_info, status, return_timestamp)
+        # if timestamp should be returned
         if return_timestamp:
             user_info["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
 
         return self._handle_output(user_info)
 
-    def compare_users(self, users: List[str | int], compare: str | List[LITERALS_COMPARE_USERS], return_timestamp: bool = False, features: List[str] | None = None) -> Any:
+    def _estimate_common(self, users: List[str | int], attr: str, max_pages: int | None) -> dict:
+        """Estimates the overlap of followers, followees, or liked Tweets.
+
+        Without 'max_pages', all pages are streamed into MinHash and HyperLogLog sketches. The IDs are not kept in memory and the estimates come with confidence intervals.
+        With 'max_pages', only the first pages are requested. Since these contain the most recent items instead of a random sample, only point estimates without error bounds are returned.
+
+        Args:
+            users (List[str | int]): User IDs or screen names.
+            attr (str): Comparison attribute. Must be from: common_followers, common_followees, commonly_liked_tweets.
+            max_pages (int | None): Maximum number of pages requested per user. None to stream all pages into sketches.
+
+        Returns:
+            dict: Estimated overlap and Jaccard similarity, and the number of used and saved API calls.
+        """
+        count_field, page_size = self.APPROXIMATE_ATTRIBUTES_COMPARE_USERS[attr]
+        # get total sizes from user objects
+        totals = {user: user_obj._json[count_field] for user, user_obj in require_available(self.fetcher.get_user_objects(users)).items()}
+        getter = {"common_followers": self.fetcher.get_user_follower_ids, "common_followees": self.fetcher.get_user_followee_ids, "commonly_liked_tweets": self.fetcher.get_liked_tweets_ids}[attr]
+        if max_pages is None:
+            index = SketchIndex()
+            counts = {user: getter(user, sketch=index) for user in users}
+            estimate = index.estimate_overlap(users)
+        else:
+            # request bounded samples
+            samples = {user: getter(user, limit=max_pages * page_size) for user in users}
+            counts = {user: len(samples[user]) for user in users}
+            estimate = self.data_processor.estimate_overlap(samples, totals)
+        # one user lookup per user and one request per (partial) page; at least one request is needed for empty lists
+        used_calls = sum(1 + max(1, -(-counts[user] // page_size)) for user in users)
+        full_calls = sum(max(1, -(-totals[user] // page_size)) for user in users)
+        estimate["api_calls"] = {"used": used_calls, "full": full_calls, "saved": max(full_calls - used_calls, 0)}
+        return estimate
+
+    def compare_users(
+        self,
+        users: List[str | int],
+        compare: str | List[LITERALS_COMPARE_USERS],
+        return_timestamp: bool = False,
+        features: List[str] | None = None,
+        approximate: bool = False,
+        max_pages: int | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        callback: Callable[[dict], None] | None = None,
+        priority: str | None = None,
+    ) -> Any:
         """Compare two or more users with the specified comparison attribute(s).
 
         For one attribute, only the corresponding value is returned. For multiple attributes, a dictionary with the key-value pairs of the requested attributes is returned.
@@ -255,17 +592,26 @@ class TwitterAPI(tweepy.Client):
             compare (str): Comparison attribute. Must be from: relationship, followers_count, followees_count, tweets_count, favourites_count, common_followers, distinct_followers, common_followees, distinct_followees, commonly_liked_tweets, distinctly_liked_tweets, similarity, created_at, protected, verified.
             return_timestamp (bool, optional): Add UTC Timestamp to results. Defaults to False.
             features (List[str] | None, optional): Defined features of Twitter User Object on which similarity will be computed. Must be from: followers_count, friends_count, listed_count, favourites_count, statuses_count. Defaults to None.
+            approximate (bool, optional): Estimate common_followers, common_followees, and commonly_liked_tweets instead of returning ID lists. By default, all pages are streamed into MinHash and HyperLogLog sketches and the estimates have confidence intervals. If 'max_pages' is set, only point estimates from the first pages are returned. Defaults to False.
+            max_pages (int | None, optional): Maximum number of pages per user if 'approximate' is True. Defaults to None, thus, all pages.
+            timeout (float | None, optional): Seconds until comparison attributes that are not finished yet are cancelled. If provided, a dictionary with the 'results' of the finished attributes, the 'status' per attribute, and a 'continuation' token for the pending attributes (see 'resume') is returned. Defaults to None.
+            stream (bool, optional): Return an iterator of events instead of the results. Attributes are computed concurrently, cheapest first, and every result is yielded as soon as it is computed. Events are dictionaries: 'progress' events with the 'pages' and 'items' requested so far for an 'attribute', 'result' events with the 'value' of a finished 'attribute', 'pending' events for attributes that did not finish before the timeout, and a final 'end' event with the 'status' per attribute and a 'continuation' token. Defaults to False.
+            callback (Callable[[dict], None] | None, optional): Function that is called with every progress, result, and pending event (see 'stream') while the results are computed. Attributes are computed concurrently then. Defaults to None.
+            priority (str | None, optional): Priority of the requests: 'high' requests are served first, 'background' requests only use a share of every endpoint's quota. Defaults to None, thus, the priority of the TwitterAPI instance.
 
         Raises:
             ValueError: If invalid comparison attribute was provided.
 
         Returns:
-            dict | list: Results of requested comparison attribute(s).
+            dict | list: Results of requested comparison attribute(s). An iterator of events if 'stream' is True.
 
         Referencs: https://mathun3003.github.io/PySNA/user-guide/overview/TwitterAPI/#compare_users
         """
         # users list must contain at least two elements
         assert len(users) > 1, "'users' list must contain at least two elements, {} was/were provided".format(len(users))
+        # at least one page per user is needed for estimations
+        if approximate and (max_pages is not None) and (max_pages < 1):
+            raise ValueError("'max_pages' must be at least 1.")
 
         # catch if feature vector contains only numeric values, and contains at least two elements
         if features:
@@ -278,120 +624,124 @@ class TwitterAPI(tweepy.Client):
         if isinstance(compare, str):
             # change to list object
             compare = [compare]
-        # init empty dict to store results
-        results = dict()
-        # iterate over comparison attributes
+        # if invalid attribute was provided
         for attr in compare:
-            # if invalid attribute was provided
             if attr not in get_args(self.LITERALS_COMPARE_USERS):
                 raise ValueError("Invalid attribute for '{}'".format(attr))
+        # calculate descriptive metrics of all requested numeric attributes at once from a single user object per user
+        count_attrs = {attr: field for attr, field in self.COUNT_ATTRIBUTES_COMPARE_USERS.items() if attr in compare}
+        count_metrics = dict()
+
+        def compare_attribute(attr: str) -> Any:
             # match comparison attributes
             match attr:
                 # compare relationships between two users
                 case "relationship":
-                    results[attr] = self.fetcher.get_relationship_pairs(users)
-                # compare number of followers
-                case "followers_count":
-                    # get individual followers
-                    followers = {user: self.fetcher.get_user_object(user).followers_count for user in users}
-                    # add descriptive metrics
-                    followers_with_metrics = self.data_processor.calc_descriptive_metrics(followers)
-                    results[attr] = followers_with_metrics
-                # compare number of friends
-                case "followees_count":
-                    # get individual followees
-                    followees = {user: self.fetcher.get_user_object(user).friends_count for user in users}
-                    # add descriptive metrics
-                    followees = self.data_processor.calc_descriptive_metrics(followees)
-                    results[attr] = followees
-                # compare number of Tweets issued by each user
-                case "tweets_count":
-                    # get individual statuses counts
-                    tweets = {user: self.fetcher.get_user_object(user).statuses_count for user in users}
-                    # add descriptive metrics
-                    tweets = self.data_processor.calc_descriptive_metrics(tweets)
-                    results[attr] = tweets
-                # compare number of likes issued by each user
-                case "favourites_count":
-                    # get individual likes
-                    likes = {user: self.fetcher.get_user_object(user).favourites_count for user in users}
-                    # add descriptive metrics
-                    likes = self.data_processor.calc_descriptive_metrics(likes)
-                    results[attr] = likes
+                    return self.fetcher.get_relationship_pairs(users)
+                # compare number of followers, friends, Tweets, or likes
+                case "followers_count" | "followees_count" | "tweets_count" | "favourites_count":
+                    if not count_metrics:
+                        user_objs = {user: user_obj._json for user, user_obj in require_available(self.fetcher.get_user_objects(users)).items()}
+                        count_metrics.update(self._calc_count_metrics(user_objs, count_attrs))
+                    return count_metrics[attr]
                 # compare protected attribute of users
                 case "protected":
-                    results[attr] = {user: self.fetcher.get_user_object(user).protected for user in users}
+                    return {user: user_obj.protected for user, user_obj in require_available(self.fetcher.get_user_objects(users)).items()}
                 # compare verified attribute for users
                 case "verified":
-                    results[attr] = {user: self.fetcher.get_user_object(user).verified for user in users}
+                    return {user: user_obj.verified for user, user_obj in require_available(self.fetcher.get_user_objects(users)).items()}
+                # estimate common followers, followees, or liked Tweets from samples
+                case "common_followers" | "common_followees" | "commonly_liked_tweets" if approximate:
+                    return self._estimate_common(users, attr, max_pages)
                 # get common followers
                 case "common_followers":
-                    # get individual followers first
-                    individual_followers = [self.fetcher.get_user_follower_ids(user) for user in users]
-                    # get common followers by calculating the intersection
-                    common_followers = self.data_processor.intersection(individual_followers)
-                    results[attr] = common_followers
+                    # only the smallest follower list is requested completely, the others are checked against its IDs
+                    return list(scheduled[("get_common_follower_ids", None)].result())
                 # get distinct followers
                 case "distinct_followers":
                     # get individual followers first
-                    individual_followers = {user: self.fetcher.get_user_follower_ids(user) for user in users}
+                    individual_followers = {user: scheduled[("get_user_follower_ids", user)].result() for user in users}
                     # get distinct followers by calculating the difference of each set
-                    distinct_followers = self.data_processor.difference(individual_followers)
-                    results[attr] = distinct_followers
+                    return self.data_processor.difference(individual_followers)
                 # get common followees
                 case "common_followees":
                     # get individual followees first
-                    individual_followees = [self.fetcher.get_user_followee_ids(user) for user in users]
+                    individual_followees = [scheduled[("get_user_followee_ids", user)].result() for user in users]
                     # get common followees by calculating the intersection
-                    common_followees = self.data_processor.intersection(individual_followees)
-                    results[attr] = common_followees
+                    return self.data_processor.intersection(individual_followees)
                 # get distinct followees
                 case "distinct_followees":
                     # get individual followees first
-                    individual_followees = {user: self.fetcher.get_user_followee_ids(user) for user in users}
+                    individual_followees = {user: scheduled[("get_user_followee_ids", user)].result() for user in users}
                     # get distinct followees by calculating the difference of each set
-                    distinct_followees = self.data_processor.difference(individual_followees)
-                    results[attr] = distinct_followees
+                    return self.data_processor.difference(individual_followees)
                 # get common liked tweets
                 case "commonly_liked_tweets":
                     # get individual liked tweets first
-                    individual_likes = [self.fetcher.get_liked_tweets_ids(user) for user in users]
+                    individual_likes = [scheduled[("get_liked_tweets_ids", user)].result() for user in users]
                     # get common liked tweets by calculating the intersection
-                    common_likes = self.data_processor.intersection(individual_likes)
-                    results[attr] = common_likes
+                    return self.data_processor.intersection(individual_likes)
                 # get distinct liked tweets
                 case "distinctly_liked_tweets":
                     # get individual liked tweets first
-                    individual_likes = {user: self.fetcher.get_liked_tweets_ids(user) for user in users}
+                    individual_likes = {user: scheduled[("get_liked_tweets_ids", user)].result() for user in users}
                     # get distinct liked tweets by calculating the difference for each set
-                    distinct_likes = self.data_processor.difference(individual_likes)
-                    results[attr] = distinct_likes
+                    return self.data_processor.difference(individual_likes)
                 # compute similarity between two users basd on the defined features
                 case "similarity":
                     # feature list object must be defined
                     if features is None:
                         raise ValueError("'features' list must be provided.")
                     # get serialized user objects first
-                    user_objs = [self.fetcher.get_user_object(user)._json for user in users]
+                    user_objs = require_available(self.fetcher.get_user_objects(users))
+                    user_objs = [user_objs[user]._json for user in users]
                     # calculate similarity based on defined feature vector
-                    results[attr] = self.data_processor.calc_similarity(user_objs=user_objs, features=features)
+                    return self.data_processor.calc_similarity(user_objs=user_objs, features=features)
                 # compare creaation dates
                 case "created_at":
                     # get individual creation dates first
-                    creation_dates = {user: self.fetcher.get_user_object(user).created_at for user in users}
+                    creation_dates = {user: user_obj.created_at for user, user_obj in require_available(self.fetcher.get_user_objects(users)).items()}
                     # add datetime metrics
-                    creation_dates = self.data_processor.calc_datetime_metrics(creation_dates)
-                    results[attr] = creation_dates
+                    return self.data_processor.calc_datetime_metrics(creation_dates)
                 # if comparison attribute was not found
                 case _:
-                    results[attr] = None
+                    return None
+
+        # paginated requests are queued first, so requests on endpoints with remaining quota are made while exhausted endpoints wait
+        scheduled, scheduled_lock = dict(), threading.Lock()
+
+        def schedule(attr: str):
+            if approximate and attr in self.APPROXIMATE_ATTRIBUTES_COMPARE_USERS:
+                return
+            if attr == "common_followers":
+                calls = [("get_common_follower_ids", None, users)]
+            elif attr in self.SCHEDULED_ATTRIBUTES_COMPARE_USERS:
+                calls = [(self.SCHEDULED_ATTRIBUTES_COMPARE_USERS[attr], user, user) for user in users]
+            else:
+                return
+            # attributes requesting the same lists share their calls
+            with scheduled_lock:
+                for method, key, argument in calls:
+                    if (method, key) not in scheduled:
+                        scheduled[(method, key)] = self.fetcher.schedule(method, argument)
+
+        # sketching all pages costs as much as requesting the complete lists
+        costs = {**self.ATTRIBUTE_COSTS_COMPARE_USERS, **({attr: self.APPROXIMATE_ATTRIBUTE_COST for attr in self.APPROXIMATE_ATTRIBUTES_COMPARE_USERS} if approximate and (max_pages is not None) else dict())}
+        arguments = {"users": users, "return_timestamp": return_timestamp, "features": features, "approximate": approximate, "max_pages": max_pages, "priority": priority}
+        if stream:
+            return self._stream_output("compare_users", arguments, self._iter_attributes(compare, compare_attribute, timeout, prepare=schedule, costs=costs, priority=priority), return_timestamp=return_timestamp)
+        # iterate over comparison attributes
+        with self.fetcher.pool.prioritized(priority):
+            results, status = self._compute_attributes(compare, compare_attribute, timeout, prepare=schedule, costs=costs, callback=callback)
+        if status is not None:
+            return self._partial_output("compare_users", arguments, results, status, return_timestamp)
         # if timestamp should be returned
         if return_timestamp:
             results["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
 
         return self._handle_output(results)
 
-    def tweet_info(self, tweet_id: str | int, attributes: List[LITERALS_TWEET_INFO] | str, return_timestamp: bool = False) -> Any:
+    def tweet_info(self, tweet_id: str | int, attributes: List[LITERALS_TWEET_INFO] | str, return_timestamp: bool = False, timeout: float | None = None, priority: str | None = None) -> Any:
         """Receive requested Tweet information from Tweet Object.
 
         For one attribute, only the corresponding value is returned. For multiple attributes, a dictionary with the key-value pairs of the requested attributes is returned.
@@ -400,6 +750,8 @@ class TwitterAPI(tweepy.Client):
             tweet_id (str | int): Tweet ID
             attributes (List[LITERALS_TWEET_INFO] | str): Attributes of the Tweet object. These must be from: id, id_str, full_text, display_text_range, truncated, created_at, entities, tweet_annotations, source, retweeters, in_reply_to_status_id, in_reply_to_status_id_str, in_reply_to_user_id, in_reply_to_user_id_str, in_reply_to_screen_name, user, contributors, coordinates, place, is_quote_status, public_metrics, quoting_users, liking_users, favorited, retweeted, retweeted_status, possibly_sensitive, lang, sentiment.
             return_timestamp (bool, optional): Add UTC Timestamp to results. Defaults to False.
+            timeout (float | None, optional): Seconds until attributes that are not finished yet are cancelled. If provided, a dictionary with the 'results' of the finished attributes, the 'status' per attribute, and a 'continuation' token for the pending attributes (see 'resume') is returned. Defaults to None.
+            priority (str | None, optional): Priority of the requests: 'high' requests are served first, 'background' requests only use a share of every endpoint's quota. Defaults to None, thus, the priority of the TwitterAPI instance.
 
         Raises:
             ValueError: If invalid attribute was provided.
@@ -409,54 +761,65 @@ class TwitterAPI(tweepy.Client):
 
         References: https://mathun3003.github.io/PySNA/user-guide/overview/TwitterAPI/#tweet_info
         """
-        # get tweet object
-        tweet_obj = self.fetcher.get_tweet_object(tweet_id)
-
-        # initialize empty dict to store request information
-        tweet_info = dict()
-
         # if single string was provided
         if isinstance(attributes, str):
             # convert to list for iteration
             attributes = [attributes]
+        # if invalid attribute was provided
         for attr in attributes:
-            # if invalid attribute was provided
             if attr not in get_args(self.LITERALS_TWEET_INFO):
                 raise ValueError("Invalid attribute for '{}'".format(attr))
+
+        def get_attribute(attr: str) -> Any:
             # get default attributes from tweepy Status model
-            elif attr in tweet_obj._json.keys():
-                tweet_info[attr] = tweet_obj._json[attr]
-            # get all quoting users
-            elif attr == "quoting_users":
-                quoting_users = self.fetcher.get_quoting_users_ids(tweet_id)
-                tweet_info[attr] = quoting_users
-            # get all liking users
-            elif attr == "liking_users":
-                liking_users = self.fetcher.get_liking_users_ids(tweet_id)
-                tweet_info[attr] = liking_users
-            # get all retweeters
-            elif attr == "retweeters":
-                retweeters = self.fetcher.get_retweeters_ids(tweet_id)
-                tweet_info[attr] = retweeters
-            # get public metrics
-            elif attr == "public_metrics":
-                tweet_info[attr] = self.fetcher.get_public_metrics(tweet_id)
-            # get context annotations
-            elif attr == "tweet_annotations":
-                tweet_info[attr] = self.fetcher.get_context_annotations_and_entities(tweet_id)
-            # get tweet sentiment
-            elif attr == "sentiment":
-                tweet_info[attr] = self.data_processor.detect_tweet_sentiment(tweet_obj.full_text)
-            # if attribute was not found
-            else:
-                tweet_info[attr] = None
+            if attr in tweet_obj._json.keys():
+                return tweet_obj._json[attr]
+            match attr:
+                # get all quoting users
+                case "quoting_users":
+                    return self.fetcher.get_quoting_users_ids(tweet_id)
+                # get all liking users
+                case "liking_users":
+                    return self.fetcher.get_liking_users_ids(tweet_id)
+                # get all retweeters
+                case "retweeters":
+                    return self.fetcher.get_retweeters_ids(tweet_id)
+                # get public metrics
+                case "public_metrics":
+                    return self.fetcher.get_public_metrics(tweet_id)
+                # get context annotations
+                case "tweet_annotations":
+                    return self.fetcher.get_context_annotations_and_entities(tweet_id)
+                # get tweet sentiment
+                case "sentiment":
+                    return self.data_processor.detect_tweet_sentiment(tweet_obj.full_text)
+                # if attribute was not found
+                case _:
+                    return None
+
+        with self._deadline(timeout), self.fetcher.pool.prioritized(priority):
+            # get tweet object
+            tweet_obj = self.fetcher.get_tweet_object(tweet_id)
+            tweet_info, status = self._compute_attributes(attributes, get_attribute, timeout)
+        if status is not None:
+            return self._partial_output("tweet_info", {"tweet_id": tweet_id, "return_timestamp": return_timestamp, "priority": priority}, tweet_info, status, return_timestamp)
         # if timestamp should be returned
         if return_timestamp:
             tweet_info["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
 
         return self._handle_output(tweet_info)
 
-    def compare_tweets(self, tweet_ids: List[str | int], compare: str | List[LITERALS_COMPARE_TWEETS], return_timestamp: bool = False, features: List[str] | None = None) -> Any:
+    def compare_tweets(
+        self,
+        tweet_ids: List[str | int],
+        compare: str | List[LITERALS_COMPARE_TWEETS],
+        return_timestamp: bool = False,
+        features: List[str] | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        callback: Callable[[dict], None] | None = None,
+        priority: str | None = None,
+    ) -> Any:
         """Compare two or more Tweets with the specified comparison attribute.
 
         For one attribute, only the corresponding value is returned. For multiple attributes, a dictionary with the key-value pairs of the requested attributes is returned.
@@ -466,13 +829,17 @@ class TwitterAPI(tweepy.Client):
             compare (str | List[LITERALS_COMPARE_TWEETS]): Comparison attribute. Needs to be from the following: view_count, like_count, retweet_count, quote_count, reply_count, common_quoting_users, distinct_quoting_users, common_liking_users, distinct_liking_users, common_retweeters, distinct_retweeters, similarity, created_at.
             return_timestamp (bool, optional): Add UTC Timestamp to results. Defaults to False.
             features (List[str] | None, optional): Defined features of Twitter User Object on which similarity will be computed. Must be from: retweet_count, reply_count, like_count, quote_count, impression_count. Defaults to None.
+            timeout (float | None, optional): Seconds until comparison attributes that are not finished yet are cancelled. If provided, a dictionary with the 'results' of the finished attributes, the 'status' per attribute, and a 'continuation' token for the pending attributes (see 'resume') is returned. Defaults to None.
+            stream (bool, optional): Return an iterator of events instead of the results. Attributes are computed concurrently, cheapest first, and every result is yielded as soon as it is computed. Events are dictionaries: 'progress' events with the 'pages' and 'items' requested so far for an 'attribute', 'result' events with the 'value' of a finished 'attribute', 'pending' events for attributes that did not finish before the timeout, and a final 'end' event with the 'status' per attribute and a 'continuation' token. Defaults to False.
+            callback (Callable[[dict], None] | None, optional): Function that is called with every progress, result, and pending event (see 'stream') while the results are computed. Attributes are computed concurrently then. Defaults to None.
+            priority (str | None, optional): Priority of the requests: 'high' requests are served first, 'background' requests only use a share of every endpoint's quota. Defaults to None, thus, the priority of the TwitterAPI instance.
 
         Raises:
             AssertionError: If a list of one Tweet ID was provided.
             ValueError: If invalid comparison attribute was provided.
 
         Returns:
-            dict: Requested results for comparison attribute.
+            dict: Requested results for comparison attribute. An iterator of events if 'stream' is True.
 
         References: https://mathun3003.github.io/PySNA/user-guide/overview/TwitterAPI/#compare_tweets
         """
@@ -490,95 +857,59 @@ class TwitterAPI(tweepy.Client):
         if isinstance(compare, str):
             # change to list object
             compare = [compare]
-        # init empty dict to store results
-        results = dict()
-        # iterate over every given comparison atttribute
+        # if invalid attribute was provided
         for attr in compare:
-            # if invalid attribute was provided
             if attr not in get_args(self.LITERALS_COMPARE_TWEETS):
                 raise ValueError("Invalid attribute for '{}'".format(attr))
+        # calculate descriptive metrics of all requested numeric attributes at once from a single metrics request per Tweet
+        count_attrs = {attr: field for attr, field in self.COUNT_ATTRIBUTES_COMPARE_TWEETS.items() if attr in compare}
+        count_metrics = dict()
+
+        def compare_attribute(attr: str) -> Any:
             # match comparison attribute
             match attr:
-                # compare numer of views / impressions
-                case "view_count":
-                    # get individual view_counts
-                    view_counts = {tweet_id: self.fetcher.get_public_metrics(tweet_id)["impression_count"] for tweet_id in tweet_ids}
-                    # add descriptive metrics
-                    view_counts = self.data_processor.calc_descriptive_metrics(view_counts)
-                    results[attr] = view_counts
-                # compare number of likes
-                case "like_count":
-                    # get individual like_counts
-                    like_counts = {tweet_id: self.fetcher.get_public_metrics(tweet_id)["like_count"] for tweet_id in tweet_ids}
-                    # add descriptive metrics
-                    like_counts = self.data_processor.calc_descriptive_metrics(like_counts)
-                    results[attr] = like_counts
-                # compare number or retweets
-                case "retweet_count":
-                    # get individual number of retweets
-                    retweet_counts = {tweet_id: self.fetcher.get_public_metrics(tweet_id)["retweet_count"] for tweet_id in tweet_ids}
-                    # add descriptive metrics
-                    retweet_counts = self.data_processor.calc_descriptive_metrics(retweet_counts)
-                    results[attr] = retweet_counts
-                # compare number of quotes
-                case "quote_count":
-                    # get individual number of quotes
-                    quote_counts = {tweet_id: self.fetcher.get_public_metrics(tweet_id)["quote_count"] for tweet_id in tweet_ids}
-                    # add descriptive metrics
-                    quote_counts = self.data_processor.calc_descriptive_metrics(quote_counts)
-                    results[attr] = quote_counts
-                # compare number of commonts
-                case "reply_count":
-                    # get individual number of replies first
-                    reply_counts = {tweet_id: self.fetcher.get_public_metrics(tweet_id)["reply_count"] for tweet_id in tweet_ids}
-                    # add descriptive metrics
-                    reply_counts = self.data_processor.calc_descriptive_metrics(reply_counts)
-                    results[attr] = reply_counts
+                # compare number of views, likes, retweets, quotes, or replies
+                case "view_count" | "like_count" | "retweet_count" | "quote_count" | "reply_count":
+                    if not count_metrics:
+                        public_metrics = {tweet_id: self.fetcher.get_public_metrics(tweet_id) for tweet_id in tweet_ids}
+                        count_metrics.update(self._calc_count_metrics(public_metrics, count_attrs))
+                    return count_metrics[attr]
                 # get all quoting users all Tweets have in common
                 case "common_quoting_users":
                     # get individual quoting users first
                     quoting_users = [self.fetcher.get_quoting_users_ids(tweet_id) for tweet_id in tweet_ids]
                     # get common quoting users by calculating the intersection
-                    common_quoting_users = self.data_processor.intersection(quoting_users)
-                    # return quoting users
-                    results[attr] = common_quoting_users
+                    return self.data_processor.intersection(quoting_users)
                 # get distinct quoting users for each tweet
                 case "distinct_quoting_users":
                     # get individual quoting users first
                     quoting_users = {tweet_id: self.fetcher.get_quoting_users_ids(tweet_id) for tweet_id in tweet_ids}
                     # get distinct quoting users for each tweet by calculating the difference for each set
-                    distinct_quoting_users = self.data_processor.difference(quoting_users)
-                    results[attr] = distinct_quoting_users
+                    return self.data_processor.difference(quoting_users)
                 # get all liking users that all tweets have in common
                 case "common_liking_users":
                     # get individual liking users first
                     liking_users = [self.fetcher.get_liking_users_ids(tweet_id) for tweet_id in tweet_ids]
                     # get common liking users by calculating the intersection
-                    common_liking_users = self.data_processor.intersection(liking_users)
-                    # return common liking users
-                    results[attr] = common_liking_users
+                    return self.data_processor.intersection(liking_users)
                 # get distinct liking users of all tweets
                 case "distinct_liking_users":
                     # get individual liking users first
                     liking_users = {tweet_id: self.fetcher.get_liking_users_ids(tweet_id) for tweet_id in tweet_ids}
                     # get distinct liking users for each tweet by calculating the difference for each set
-                    distinct_liking_users = self.data_processor.difference(liking_users)
-                    results[attr] = distinct_liking_users
+                    return self.data_processor.difference(liking_users)
                 # get all retweeters all tweets have in common
                 case "common_retweeters":
                     # get individual retweeters first
                     retweeters = [self.fetcher.get_retweeters_ids(tweet_id) for tweet_id in tweet_ids]
                     # get common retweeters by calculating the intersection
-                    common_retweeters = self.data_processor.intersection(retweeters)
-                    # return common retweeters
-                    results[attr] = common_retweeters
+                    return self.data_processor.intersection(retweeters)
                 # get distinct retweeters of all tweets
                 case "distinct_retweeters":
                     # get individual retweeters first
                     retweeters = {tweet_id: self.fetcher.get_retweeters_ids(tweet_id) for tweet_id in tweet_ids}
                     # get distinct retweeters by calculating the difference for each set
-                    distinct_retweeters = self.data_processor.difference(retweeters)
-                    results[attr] = distinct_retweeters
+                    return self.data_processor.difference(retweeters)
                 # compute similarity between two tweets basd on the defined features
                 case "similarity":
                     # feature list object must be defined
@@ -587,19 +918,55 @@ class TwitterAPI(tweepy.Client):
                     # get public metrics for Tweet objects first
                     public_metrics = {tweet_id: self.fetcher.get_public_metrics(tweet_id) for tweet_id in tweet_ids}
                     # calculate similarity based on defined feature vector
-                    results[attr] = self.data_processor.calc_similarity(tweet_metrics=public_metrics, features=features)
+                    return self.data_processor.calc_similarity(tweet_metrics=public_metrics, features=features)
                 # compare creation dates of tweets
                 case "created_at":
                     # get individual creation dates first
-                    creation_dates = {tweet_id: self.fetcher.get_tweet_object(tweet_id).created_at for tweet_id in tweet_ids}
+                    creation_dates = {tweet_id: tweet_obj.created_at for tweet_id, tweet_obj in require_available(self.fetcher.get_tweet_objects(tweet_ids)).items()}
                     # add datetime metrics
-                    creation_dates = self.data_processor.calc_datetime_metrics(creation_dates)
-                    results[attr] = creation_dates
+                    return self.data_processor.calc_datetime_metrics(creation_dates)
                 # if attribute was not found
                 case _:
-                    results[attr] = None
+                    return None
+
+        arguments = {"tweet_ids": tweet_ids, "return_timestamp": return_timestamp, "features": features, "priority": priority}
+        if stream:
+            return self._stream_output("compare_tweets", arguments, self._iter_attributes(compare, compare_attribute, timeout, costs=self.ATTRIBUTE_COSTS_COMPARE_TWEETS, priority=priority), return_timestamp=return_timestamp)
+        # iterate over every given comparison atttribute
+        with self.fetcher.pool.prioritized(priority):
+            results, status = self._compute_attributes(compare, compare_attribute, timeout, costs=self.ATTRIBUTE_COSTS_COMPARE_TWEETS, callback=callback)
+        if status is not None:
+            return self._partial_output("compare_tweets", arguments, results, status, return_timestamp)
         # if UTC timestamp should be returned
         if return_timestamp:
             results["utc_timestamp"] = strf_datetime(datetime.utcnow(), format="%Y-%m-%d %H:%M:%S.%f")
 
         return self._handle_output(results)
+
+    def resume(self, continuation: str, timeout: float | None = None, **kwargs) -> Any:
+        """Resumes the pending attributes of a call that exceeded its timeout.
+
+        The token contains all arguments of the call (including 'priority' and the directory of the 'store' of user_info) except for 'timeout', which is not carried over.
+
+        Args:
+            continuation (str): Continuation token of the call.
+            timeout (float | None, optional): Seconds until unfinished attributes are cancelled again. Defaults to None, thus, all pending attributes are completed.
+            kwargs: Arguments that replace the ones of the token (e.g., another 'priority').
+
+        Raises:
+            ValueError: If the continuation token is invalid.
+
+        Returns:
+            Any: Output of the resumed method for the pending attributes.
+        """
+        try:
+            state = json.loads(base64.urlsafe_b64decode(continuation.encode("ascii")))
+            method, arguments = state["method"], state["arguments"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError("Invalid continuation token.") from e
+        if method not in ("user_info", "compare_users", "tweet_info", "compare_tweets"):
+            raise ValueError("Invalid continuation token.")
+        # the store of user_info is part of the token as its directory
+        if arguments.get("store") is not None:
+            arguments["store"] = TimelineStore(arguments["store"])
+        return getattr(self, method)(**{**arguments, **kwargs}, timeout=timeout)
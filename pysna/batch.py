@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, List
+
+
+class _Batch:
+    """Keys collected for one bulk call."""
+
+    __slots__ = ("group", "futures", "full", "deadlines")
+
+    def __init__(self, group: Hashable = None):
+        self.group = group
+        self.futures = dict()
+        self.full = threading.Event()
+        # deadlines of the callers
+        self.deadlines = list()
+
+    @property
+    def deadline(self) -> float | None:
+        """Returns the latest deadline of the callers, or None if a caller has no deadline."""
+        return None if (not self.deadlines) or (None in self.deadlines) else max(self.deadlines)
+
+
+class BatchLoader:
+    """Collects single lookups of concurrent callers and resolves them with one bulk call.
+
+    The first caller of a batch waits up to 'window' seconds for further keys (or until 'max_batch_size' keys are collected) and then calls the bulk function for all keys of the batch. Every caller receives the result of its own key.
+    Duplicate keys within a batch are looked up once.
+
+    The bulk function receives a list of keys and returns a dictionary with the result (or an exception to be raised) per key. Keys missing in the dictionary raise a KeyError.
+
+    If a 'context' function is provided, it returns the group and the deadline (monotonic time or None) of the calling thread. Keys are only batched with keys of the same group (e.g., callers of the same priority),
+    and the bulk function is called with the latest deadline of the callers as 'deadline' keyword argument (None if any caller has no deadline), so no caller fails due to the earlier deadline of another one.
+    """
+
+    def __init__(self, load, max_batch_size: int = 100, window: float = 0.005, context=None):
+        if max_batch_size < 1:
+            raise ValueError("'max_batch_size' must be at least 1.")
+        self._load = load
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._context = context
+        # open batch per group
+        self._batches = dict()
+        self._lock = threading.Lock()
+        # number of bulk calls and keys looked up
+        self.batches = 0
+        self.keys = 0
+
+    def _add(self, key: Hashable) -> tuple:
+        """Adds a key to the open batch of the caller's group and returns its future, the batch, and whether the caller opened the batch."""
+        group, deadline = (None, None) if self._context is None else self._context()
+        with self._lock:
+            batch = self._batches.get(group)
+            leader = batch is None
+            if leader:
+                batch = self._batches[group] = _Batch(group)
+            batch.deadlines.append(deadline)
+            future = batch.futures.get(key)
+            if future is None:
+                future = batch.futures[key] = Future()
+            # full batches are closed, further keys open a new one
+            if len(batch.futures) >= self.max_batch_size:
+                del self._batches[group]
+                batch.full.set()
+            return future, batch, leader
+
+    def _close(self, batch: _Batch):
+        with self._lock:
+            if self._batches.get(batch.group) is batch:
+                del self._batches[batch.group]
+
+    def _dispatch(self, batch: _Batch):
+        """Calls the bulk function for all keys of a batch and distributes the results."""
+        keys = list(batch.futures.keys())
+        with self._lock:
+            self.batches += 1
+            self.keys += len(keys)
+        try:
+            results = self._load(keys) if self._context is None else self._load(keys, deadline=batch.deadline)
+        except BaseException as e:
+            for future in batch.futures.values():
+                future.set_exception(e)
+            return
+        for key, future in batch.futures.items():
+            result = results.get(key, KeyError(key))
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def load(self, key: Hashable) -> Any:
+        """Looks up a single key together with the keys of concurrent callers.
+
+        Args:
+            key (Hashable): Key to be looked up.
+
+        Returns:
+            Any: Result of the key.
+        """
+        future, batch, leader = self._add(key)
+        if leader:
+            batch.full.wait(self.window)
+            self._close(batch)
+            self._dispatch(batch)
+        return future.result()
+
+    def load_many(self, keys: List[Hashable], return_exceptions: bool = False) -> Dict[Hashable, Any]:
+        """Looks up several keys in as few bulk calls as possible without waiting for further keys.
+
+        Args:
+            keys (List[Hashable]): Keys to be looked up.
+            return_exceptions (bool, optional): Return errors of keys as results instead of raising the first one. Defaults to False.
+
+        Returns:
+            Dict[Hashable, Any]: Result per key.
+        """
+        futures = dict()
+        opened = list()
+        for key in keys:
+            future, batch, leader = self._add(key)
+            futures[key] = future
+            if leader:
+                opened.append(batch)
+        for batch in opened:
+            self._close(batch)
+            self._dispatch(batch)
+        if return_exceptions:
+            return {key: future.exception() or future.result() for key, future in futures.items()}
+        return {key: future.result() for key, future in futures.items()}
@@ -10,7 +10,14 @@ from typing import get_args
 from dotenv import load_dotenv
 
 from pysna.api import TwitterAPI
-from pysna.utils import append_to_csv, append_to_json, export_to_csv, export_to_json
+from pysna.store import NegativeCache, RateLimitStore, TimelineStore
+from pysna.utils import (
+    _tuple_to_string,
+    append_to_csv,
+    append_to_json,
+    export_to_csv,
+    export_to_json,
+)
 
 msg = """
 The command-line interface for the PySNA package
@@ -19,10 +26,10 @@ Reference: https://mathun3003.github.io/PySNA/user-guide/overview/cli/
 
 Usage:
   pysna set-secrets <path>
-  pysna user-info <user> <attributes> [--return-timestamp] [--output] [--append] [--encoding] [--env]
-  pysna compare-users <users> -c <compare> [--features] [--return-timestamp] [--output] [--append] [--encoding] [--env]
+  pysna user-info <user> <attributes> [--return-timestamp] [--store] [--output] [--append] [--encoding] [--env]
+  pysna compare-users <users> -c <compare> [--features] [--return-timestamp] [--output] [--append] [--encoding] [--env] [--stream]
   pysna tweet-info <tweet> <attributes> [--return-timestamp] [--output] [--append] [--encoding] [--env]
-  pysna compare-tweets <tweets> -c <compare> [--features] [--return-timestamp] [--output] [--append] [--encoding] [--env]
+  pysna compare-tweets <tweets> -c <compare> [--features] [--return-timestamp] [--output] [--append] [--encoding] [--env] [--stream]
 
 Options:
   -h --help        Show this screen.
@@ -45,6 +52,8 @@ REQUIRED_SECRETS = ["BEARER_TOKEN", "CONSUMER_KEY", "CONSUMER_SECRET", "ACCESS_T
 OPTIONAL_SECRETS = ["X_RAPIDAPI_KEY", "X_RAPIDAPI_HOST"]
 # set config file path under "~/.pysna/config/secrets.env"
 config_file_path = os.path.join(os.path.expanduser("~"), ".pysna", "config", "secrets.env")
+# share observed rate limits and unavailable users and Tweets between CLI runs under "~/.pysna/state"
+rate_limit_state_path = os.path.join(os.path.expanduser("~"), ".pysna", "state")
 
 # set main parser
 parser = argparse.ArgumentParser(prog="pysna", usage=msg)
@@ -83,10 +92,16 @@ def output(data: dict, encoding: str, path: str | None = None, append: bool = Fa
             append_to_csv(data, path, encoding)
     # or print them to the CLI in JSON format
     else:
-        print(json.dumps(data, ensure_ascii=False))
+        print(json.dumps(_tuple_to_string(data), ensure_ascii=False))
     pass
 
 
+def stream_output(events):
+    # print every event as a JSON line (NDJSON) as soon as it arrives, tuple-keys are encoded to strings
+    for event in events:
+        print(json.dumps(_tuple_to_string(event), ensure_ascii=False), flush=True)
+
+
 def argument(*name_or_flags, **kwargs):
     """Convenience function to properly format arguments to pass to the subcommand decorator."""
     return (list(name_or_flags), kwargs)
@@ -144,6 +159,7 @@ def set_secrets(args):
         argument("attributes", nargs="+", default=[], help=f"List or string of desired User attributes. Must be from {', '.join(get_args(TwitterAPI.LITERALS_USER_INFO))}"),
         argument("--env", "-e", type=str, default=config_file_path, required=False, help=f"Path to .env file. Defaults to {config_file_path}."),
         argument("--return-timestamp", type=bool, default=False, required=False, action=argparse.BooleanOptionalAction, help="Returns the UTC timestamp of the request."),
+        argument("--store", type=str, default=None, required=False, help="Directory of a local store for liked_tweets and composed_tweets. Only Tweets newer than the stored ones are requested."),
         argument(
             "--output",
             "-o",
@@ -161,9 +177,10 @@ def user_info_cli(args):
     # read secrets
     secrets = read_secrets(args.env)
     # establish connection to the API
-    api = TwitterAPI(**secrets)
+    api = TwitterAPI(**secrets, rate_limit_state=RateLimitStore(rate_limit_state_path), negative_cache=NegativeCache(directory=rate_limit_state_path))
     # get results
-    result = api.user_info(user=args.user, attributes=args.attributes, return_timestamp=args.return_timestamp)
+    store = TimelineStore(args.store) if args.store is not None else None
+    result = api.user_info(user=args.user, attributes=args.attributes, return_timestamp=args.return_timestamp, store=store)
     # handle output
     output(result, path=args.output, encoding=args.encoding, append=args.append)
     pass
@@ -193,7 +210,7 @@ def tweet_info_cli(args):
     # read secrets
     secrets = read_secrets(args.env)
     # establish connection to the API
-    api = TwitterAPI(**secrets)
+    api = TwitterAPI(**secrets, rate_limit_state=RateLimitStore(rate_limit_state_path), negative_cache=NegativeCache(directory=rate_limit_state_path))
     # get results
     result = api.tweet_info(tweet_id=args.tweet_id, attributes=args.attributes, return_timestamp=args.return_timestamp)
     # handle output
@@ -226,6 +243,9 @@ def tweet_info_cli(args):
         ),
         argument("--encoding", type=str, default="utf-8", required=False, help="Encoding of the output file. Defaults to UTF-8."),
         argument("--append", "-a", type=bool, default=False, required=False, action=argparse.BooleanOptionalAction, help="Add results to an existing JSON file. File needs to be specified in the --output flag."),
+        argument(
+            "--stream", type=bool, default=False, required=False, action=argparse.BooleanOptionalAction, help="Print results and progress as JSON lines as soon as they are available, cheapest comparison attributes first. Ignores the --output flag."
+        ),
     ],
 )
 def compare_users_cli(args):
@@ -233,7 +253,11 @@ def compare_users_cli(args):
     # read secrets
     secrets = read_secrets(args.env)
     # establish connection to the API
-    api = TwitterAPI(**secrets)
+    api = TwitterAPI(**secrets, rate_limit_state=RateLimitStore(rate_limit_state_path), negative_cache=NegativeCache(directory=rate_limit_state_path))
+    # print events as they arrive
+    if args.stream:
+        stream_output(api.compare_users(users=args.users, compare=args.compare, return_timestamp=args.return_timestamp, features=args.features, stream=True))
+        return
     # get results
     result = api.compare_users(users=args.users, compare=args.compare, return_timestamp=args.return_timestamp, features=args.features)
     # handle output
@@ -261,6 +285,9 @@ def compare_users_cli(args):
         ),
         argument("--encoding", type=str, default="utf-8", required=False, help="Encoding of the output file. Defaults to UTF-8."),
         argument("--append", "-a", type=bool, default=False, required=False, action=argparse.BooleanOptionalAction, help="Add results to an existing JSON file. File needs to be specified in the --output flag."),
+        argument(
+            "--stream", type=bool, default=False, required=False, action=argparse.BooleanOptionalAction, help="Print results and progress as JSON lines as soon as they are available, cheapest comparison attributes first. Ignores the --output flag."
+        ),
     ],
 )
 def compare_tweets_cli(args):
@@ -268,7 +295,11 @@ def compare_tweets_cli(args):
     # read secrets
     secrets = read_secrets(args.env)
     # establish connection to the API
-    api = TwitterAPI(**secrets)
+    api = TwitterAPI(**secrets, rate_limit_state=RateLimitStore(rate_limit_state_path), negative_cache=NegativeCache(directory=rate_limit_state_path))
+    # print events as they arrive
+    if args.stream:
+        stream_output(api.compare_tweets(tweet_ids=args.tweets, compare=args.compare, return_timestamp=args.return_timestamp, features=args.features, stream=True))
+        return
     # get results
     result = api.compare_tweets(tweet_ids=args.tweets, compare=args.compare, return_timestamp=args.return_timestamp, features=args.features)
     # handle output
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Hashable
+
+
+def flight_key(*parts: Any) -> Hashable:
+    """Returns a hashable key of call arguments, including unhashable ones like lists and dictionaries."""
+    return repr(tuple(sorted(part.items()) if isinstance(part, dict) else part for part in parts))
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one call whose result (or error) is shared by all callers.
+
+    The first caller of a key runs the call, later callers of the same key wait for its result instead of running the call again. Once the call finished, the key is released, so results are never cached.
+    Threads and asyncio tasks share the same in-flight calls: tasks await the calls of threads and vice versa.
+    Errors of 'private_errors' depend on the context of the caller that ran the call (e.g., its deadline) and are not shared: the waiting callers run the call themselves instead.
+    """
+
+    def __init__(self, private_errors: tuple = ()):
+        self.private_errors = private_errors
+        self._calls = dict()
+        self._lock = threading.Lock()
+        # number of calls served by another in-flight call
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> tuple:
+        """Returns the in-flight call of a key and whether the caller has to run it."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = Future()
+            return call, True
+
+    def _release(self, key: Hashable, call: Future, result: Any = None, error: BaseException | None = None):
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            call.set_result(result)
+        else:
+            call.set_exception(error)
+
+    def _run(self, key: Hashable, call: Future, func, args: tuple, kwargs: dict) -> Any:
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._release(key, call, error=e)
+            raise
+        self._release(key, call, result=result)
+        return result
+
+    def do(self, key: Hashable, func, *args, **kwargs) -> Any:
+        """Runs a call or waits for the identical call in flight.
+
+        Args:
+            key (Hashable): Identifier of the call, e.g. endpoint and arguments.
+            func: Function to be called.
+
+        Returns:
+            Any: Result of the call.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            try:
+                return call.result()
+            except self.private_errors:
+                return func(*args, **kwargs)
+        return self._run(key, call, func, args, kwargs)
+
+    async def do_async(self, key: Hashable, func, *args, **kwargs) -> Any:
+        """Runs a call or awaits the identical call in flight without blocking the event loop.
+
+        Args:
+            key (Hashable): Identifier of the call.
+            func: Coroutine function or blocking function. Blocking functions are run in a worker thread.
+
+        Returns:
+            Any: Result of the call.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            try:
+                return await asyncio.wrap_future(call)
+            except self.private_errors:
+                if asyncio.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await asyncio.to_thread(func, *args, **kwargs)
+        if not asyncio.iscoroutinefunction(func):
+            return await asyncio.to_thread(self._run, key, call, func, args, kwargs)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._release(key, call, error=e)
+            raise
+        self._release(key, call, result=result)
+        return result
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+import heapq
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+import tweepy
+
+from pysna.graph import FollowerGraph
+from pysna.retry import CircuitOpenError, DeadlineExceeded, RateLimitError
+
+# create logger instance
+log = logging.getLogger(__name__)
+# log to stdout
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.ERROR)
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+log.addHandler(handler)
+
+
+class EgoNetworkCrawler:
+    """Checkpointed crawler of the follower or followee ego networks of seed users.
+
+    Seeds are expanded first. Every discovered user within 'depth - 1' hops is scored with a batched user lookup and added to the frontier.
+    The frontier is ordered by hop and, within a hop, by the number of ID pages required to expand a user, so the budget covers as many users as possible.
+    Users with more followers than 'max_followers_count' (e.g., celebrities or news outlets) are not expanded.
+
+    After every request, the frontier is written to 'state.json' and new edges are appended to 'edges.bin' in the crawl directory.
+    A crawler created with the same directory resumes where the previous one stopped.
+
+    Rate limited endpoints do not block the crawl: while one endpoint is exhausted, requests to the other endpoint are made. The crawler only sleeps if no endpoint is available.
+    For this, the fetcher must be created with 'wait_on_rate_limit=False', otherwise the credential pool sleeps inside the requests.
+    Endpoints count as available if the credential pool of the fetcher has remaining requests for them. If the circuit breaker of the API host is open, the crawler pauses for its recovery time.
+    If the deadline of the retry policy of the fetcher is exceeded (see 'RetryPolicy.deadline'), the crawl stops and can be resumed later.
+    """
+
+    # maximum number of users per users/lookup request
+    LOOKUP_BATCH_SIZE = 100
+    # endpoints per crawl direction
+    ENDPOINTS = {"followers": "followers/ids", "followees": "friends/ids"}
+
+    def __init__(self, fetcher, directory: str, depth: int = 2, direction: str = "followees", max_followers_count: int | None = 100000, budget: int | None = None):
+        if depth < 1:
+            raise ValueError("'depth' must be at least 1.")
+        if direction not in self.ENDPOINTS:
+            raise ValueError("Invalid direction '{}'. Must be one of {}.".format(direction, list(self.ENDPOINTS.keys())))
+        if fetcher._wait_on_rate_limit:
+            log.warning("The fetcher waits on rate limits. Create it with 'wait_on_rate_limit=False' to keep requesting other endpoints meanwhile.")
+        self.fetcher = fetcher
+        self.directory = directory
+        self.depth = depth
+        self.direction = direction
+        self.max_followers_count = max_followers_count
+        self.budget = budget
+        self.endpoint = self.ENDPOINTS[direction]
+        # unix timestamps until which endpoints are rate limited
+        self._blocked = dict()
+        # whether the deadline of the crawl was exceeded
+        self._stopped = False
+        os.makedirs(self.directory, exist_ok=True)
+        self._state_path = os.path.join(self.directory, "state.json")
+        self._edges_path = os.path.join(self.directory, "edges.bin")
+        self._load_state()
+
+    def _load_state(self):
+        """Restores the state of a previous crawl from the crawl directory or initializes an empty crawl."""
+        if os.path.exists(self._state_path):
+            with open(self._state_path, "r", encoding="utf-8") as handle:
+                state = json.load(handle)
+            # edges appended after the last state write are dropped, as they are requested again
+            with open(self._edges_path, "ab") as handle:
+                handle.truncate(state["edges"] * 2 * np.dtype(np.int64).itemsize)
+        else:
+            state = {"calls": 0, "edges": 0, "counter": 0, "seeds": list(), "visited": list(), "pending": list(), "frontier": list(), "current": None}
+        self.calls = state["calls"]
+        self.edge_count = state["edges"]
+        self._counter = state["counter"]
+        self._seeds = state["seeds"]
+        self._visited = set(state["visited"])
+        # users to be scored, stored as [user_id, hop]
+        self._pending = state["pending"]
+        # scored users, stored as heap of [hop, pages, counter, user_id]
+        self._frontier = [list(entry) for entry in state["frontier"]]
+        heapq.heapify(self._frontier)
+        # user currently expanded, stored as {"user": user_id, "hop": hop, "cursor": cursor}
+        self._current = state["current"]
+
+    def _save_state(self):
+        """Writes the crawl state atomically."""
+        state = {
+            "calls": self.calls,
+            "edges": self.edge_count,
+            "counter": self._counter,
+            "seeds": self._seeds,
+            "visited": sorted(self._visited),
+            "pending": self._pending,
+            "frontier": self._frontier,
+            "current": self._current,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, self._state_path)
+
+    def add_seeds(self, seeds: List[str | int]):
+        """Adds seed users to the crawl. Seeds are expanded regardless of their number of followers.
+
+        Args:
+            seeds (List[str | int]): User IDs or screen names.
+        """
+        for seed in seeds:
+            if seed in self._seeds:
+                continue
+            self._seeds.append(seed)
+            self._pending.append([seed, 0])
+        self._save_state()
+
+    def _available_at(self, endpoint: str) -> float:
+        """Returns the Unix timestamp from which an endpoint can be requested again, as known to the crawler and the credential pool."""
+        pool, now = self.fetcher.pool, time.time()
+        priority = pool.current_priority()
+        blocked = self._blocked.get(endpoint, 0)
+        if any(pool.available(credential, f"1.1/{endpoint}", now, priority) > 0 for credential in pool.credentials):
+            return blocked
+        return max(blocked, pool.reset_time(f"1.1/{endpoint}"))
+
+    def _available(self, endpoint: str) -> bool:
+        return self._available_at(endpoint) <= time.time()
+
+    def _within_budget(self) -> bool:
+        return (self.budget is None) or (self.calls < self.budget)
+
+    def _request(self, endpoint: str, func, **params):
+        """Performs a request and records unavailable endpoints instead of sleeping.
+
+        Returns:
+            Response of the request or None if the endpoint is rate limited, the circuit breaker of the host is open, or the deadline is exceeded.
+        """
+        self.calls += 1
+        try:
+            return func(**params)
+        except RateLimitError:
+            # every credential of the pool is exhausted until the first reset
+            self._blocked[endpoint] = max(self.fetcher.pool.reset_time(f"1.1/{endpoint}"), time.time() + 1)
+        except tweepy.errors.TooManyRequests as e:
+            reset = e.response.headers.get("x-rate-limit-reset")
+            self._blocked[endpoint] = int(reset) if reset is not None else time.time() + 60
+        except CircuitOpenError:
+            # both endpoints share the host of the circuit breaker
+            for key in (self.endpoint, "users/lookup"):
+                self._blocked[key] = time.time() + self.fetcher.retry.recovery_time
+            log.info("Circuit breaker of the API host is open. Pausing for {:.0f} seconds.".format(self.fetcher.retry.recovery_time))
+            return None
+        except DeadlineExceeded:
+            self._stopped = True
+            log.info("Deadline exceeded. The crawl stops.")
+            return None
+        log.info("Endpoint {} is rate limited until {}.".format(endpoint, self._blocked[endpoint]))
+        return None
+
+    def _score(self):
+        """Looks up the next batch of discovered users and adds the ones worth expanding to the frontier."""
+        size = self.LOOKUP_BATCH_SIZE
+        batch, self._pending = self._pending[:size], self._pending[size:]
+        # screen names are case-insensitive
+        hops = {str(user).lower(): hop for user, hop in batch}
+        ids = [user for user, _ in batch if (isinstance(user, int)) or (user.isdigit())]
+        names = [user for user, _ in batch if not ((isinstance(user, int)) or (user.isdigit()))]
+        users = list()
+        for key, values in (("user_id", ids), ("screen_name", names)):
+            if not values:
+                continue
+            try:
+                response = self._request("users/lookup", self.fetcher.api.lookup_users, **{key: values})
+            except tweepy.errors.NotFound:
+                # none of the users exists anymore
+                continue
+            if response is None:
+                # put the batch back if rate limited
+                self._pending = batch + self._pending
+                return
+            users.extend(response)
+        for user in users:
+            # seeds may be given as screen names
+            hop = hops.get(str(user.id), hops.get(user.screen_name.lower()))
+            if hop is None or user.id in self._visited:
+                continue
+            self._visited.add(user.id)
+            # skip accounts that are too expensive to expand
+            if (hop > 0) and (self.max_followers_count is not None) and (user.followers_count > self.max_followers_count):
+                continue
+            if (hop > 0) and user.protected:
+                continue
+            count = user.followers_count if self.direction == "followers" else user.friends_count
+            pages = max(1, -(-count // self.fetcher.FOLLOWER_IDS_PAGE_SIZE))
+            heapq.heappush(self._frontier, [hop, pages, self._counter, user.id])
+            self._counter += 1
+
+    def _expand(self):
+        """Requests the next page of IDs of the current user and appends the edges."""
+        if self._current is None:
+            hop, _, _, user_id = heapq.heappop(self._frontier)
+            self._current = {"user": user_id, "hop": hop, "cursor": -1}
+        func = self.fetcher.api.get_follower_ids if self.direction == "followers" else self.fetcher.api.get_friend_ids
+        response = self._request(self.endpoint, func, user_id=self._current["user"], cursor=self._current["cursor"], return_cursors=True)
+        if response is None:
+            return
+        ids, (_, next_cursor) = response
+        ids = np.asarray(ids, dtype=np.int64)
+        user = np.full(ids.size, self._current["user"], dtype=np.int64)
+        # edges point from the following to the followed user
+        edges = np.column_stack([ids, user] if self.direction == "followers" else [user, ids])
+        with open(self._edges_path, "ab") as handle:
+            edges.tofile(handle)
+        self.edge_count += int(ids.size)
+        # neighbours within the crawl depth are scored before being expanded
+        if self._current["hop"] + 1 < self.depth:
+            self._pending.extend([user_id, self._current["hop"] + 1] for user_id in ids.tolist() if user_id not in self._visited)
+        if next_cursor == 0:
+            self._current = None
+        else:
+            self._current["cursor"] = next_cursor
+
+    def run(self) -> FollowerGraph:
+        """Crawls until the frontier is empty or the budget is spent.
+
+        Returns:
+            FollowerGraph: Graph of all edges crawled so far.
+        """
+        self._stopped = False
+        while (not self._stopped) and self._within_budget() and (self._pending or self._frontier or self._current):
+            expandable = (self._current is not None) or bool(self._frontier)
+            # ID pages are the bottleneck, so they are requested whenever possible
+            if expandable and self._available(self.endpoint):
+                self._expand()
+            # users are scored while the ID endpoint is rate limited or no user is left to expand
+            elif self._pending and self._available("users/lookup"):
+                self._score()
+            else:
+                # sleep until the next endpoint is available again
+                endpoints = ([self.endpoint] if expandable else list()) + (["users/lookup"] if self._pending else list())
+                sleep_time = max(0, min(self._available_at(endpoint) for endpoint in endpoints) - time.time()) + 1
+                remaining_time = self.fetcher.retry.remaining_time()
+                if (remaining_time is not None) and (sleep_time > remaining_time):
+                    log.info("No endpoint is available before the deadline. The crawl stops.")
+                    break
+                time.sleep(sleep_time)
+                continue
+            self._save_state()
+        return self.graph()
+
+    def edges(self) -> np.ndarray:
+        """Returns all crawled edges.
+
+        Returns:
+            np.ndarray: Array of shape (n, 2) with the IDs of the following and the followed user.
+        """
+        if not os.path.exists(self._edges_path):
+            return np.empty((0, 2), dtype=np.int64)
+        edges = np.fromfile(self._edges_path, dtype=np.int64, count=self.edge_count * 2)
+        return edges.reshape(-1, 2)
+
+    def graph(self) -> FollowerGraph:
+        """Returns the graph of all edges crawled so far."""
+        edges = self.edges()
+        return FollowerGraph.from_edges(edges[:, 0], edges[:, 1])
+
+    def progress(self) -> dict:
+        """Returns the number of requests made, crawled edges, and remaining users."""
+        return {"calls": self.calls, "edges": self.edge_count, "frontier": len(self._frontier) + (self._current is not None), "pending": len(self._pending)}
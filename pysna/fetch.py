@@ -1,11 +1,26 @@
 # -*- coding: utf-8 -*-
+import contextlib
+import functools
 import logging
 import sys
-from typing import Any, Dict, List, Set
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Set
+from urllib.parse import urlparse
 
+import numpy as np
 import requests
 import tweepy
 
+from pysna.batch import BatchLoader
+from pysna.coalesce import flight_key
+from pysna.pool import CredentialPool
+from pysna.process import IDSet, SketchIndex
+from pysna.retry import RequestError, RetryPolicy, UnavailableError, raise_for_status
+from pysna.schedule import RequestScheduler
+from pysna.store import IDStore, NegativeCache, RateLimitStore, TimelineStore
+
 # create logger instance
 log = logging.getLogger(__name__)
 # log to stdout
@@ -16,8 +31,78 @@ handler.setFormatter(formatter)
 log.addHandler(handler)
 
 
+class Unavailable:
+    """Status of a user or Tweet that is not available (suspended, not found, or protected), returned by bulk lookups instead of raising an error."""
+
+    __slots__ = ("kind", "key", "status")
+
+    def __init__(self, kind: str, key: str | int, status: str):
+        self.kind = kind
+        self.key = key
+        self.status = status
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Unavailable) and ((self.kind, self.key, self.status) == (other.kind, other.key, other.status))
+
+    def __repr__(self) -> str:
+        return "Unavailable(kind={!r}, key={!r}, status={!r})".format(self.kind, self.key, self.status)
+
+    def error(self) -> UnavailableError:
+        """Returns the error to be raised if the object is required."""
+        return UnavailableError("Requested {} '{}' is unavailable: {}.".format(self.kind.replace("_", " "), self.key, self.status), self.status)
+
+
+def require_available(objs: Dict[Any, Any]) -> Dict[Any, Any]:
+    """Raises an UnavailableError if a result of a bulk lookup is unavailable, else returns the results."""
+    for obj in objs.values():
+        if isinstance(obj, Unavailable):
+            raise obj.error()
+    return objs
+
+
 class TwitterDataFetcher:
-    """Composition class in order to fetch data from the Twitter Search API v1 and v2."""
+    """Composition class in order to fetch data from the Twitter Search API v1 and v2.
+
+    All requests are made through a CredentialPool, which tracks the rate limit headers per endpoint. If further credentials are provided, every request is routed to the credential with the most remaining requests for the endpoint.
+    If a RateLimitStore is provided, the observed rate limits are shared with other processes and later runs, so requests are paced before the API rejects them.
+    Transient failures of all requests are retried according to the retry policy.
+    Concurrent identical read requests of several threads or asyncio tasks (see 'run_async') share one in-flight request.
+    User and Tweet objects requested concurrently (e.g., by several threads) are looked up together in bulk requests.
+    Suspended, not found, and protected users and Tweets are remembered in a NegativeCache and not requested again until their entries expire.
+    Fetcher methods can be queued with 'schedule', so calls on endpoints with remaining requests run while calls on exhausted endpoints wait.
+    Requests have a priority ('priority' of the fetcher, or per thread with 'pool.prioritized'): high-priority requests are served first, background requests only use 'background_share' of every endpoint's quota.
+    Paginated methods report every requested page to the callback set with 'track_progress'.
+    """
+
+    # number of IDs per page of the followers/ids and friends/ids endpoints
+    FOLLOWER_IDS_PAGE_SIZE = 5000
+    # requests per 15-minute window with app authentication
+    RATE_LIMITS = {"followers/ids": 15, "friendships/show": 15}
+    # maximum number of Tweet IDs per request of the v2 Tweets lookup endpoint
+    TWEET_LOOKUP_BATCH_SIZE = 100
+    # maximum number of users or Tweets per request of the v1.1 lookup endpoints
+    LOOKUP_BATCH_SIZE = 100
+    # seconds a single user or Tweet lookup waits for lookups of concurrent callers
+    LOOKUP_WINDOW = 0.005
+    # rate limit endpoints mainly requested by the fetcher methods that can be scheduled
+    ENDPOINTS = {
+        "get_user_object": "1.1/users/show",
+        "get_user_objects": "1.1/users/lookup",
+        "get_user_follower_ids": "1.1/followers/ids",
+        "get_common_follower_ids": "1.1/followers/ids",
+        "get_user_followee_ids": "1.1/friends/ids",
+        "get_relationship_pairs": "1.1/friendships/show",
+        "get_liked_tweets_ids": "2/users/:id/liked_tweets",
+        "get_composed_tweets_ids": "2/users/:id/tweets",
+        "get_tweet_object": "1.1/statuses/show",
+        "get_tweet_objects": "1.1/statuses/lookup",
+        "get_liking_users_ids": "2/tweets/:id/liking_users",
+        "get_retweeters_ids": "2/tweets/:id/retweeted_by",
+        "get_quoting_users_ids": "2/tweets/:id/quote_tweets",
+    }
 
     def __init__(
         self,
@@ -29,6 +114,13 @@ class TwitterDataFetcher:
         x_rapidapi_key: Any | None = None,
         x_rapidapi_host: Any | None = None,
         wait_on_rate_limit: bool = True,
+        credentials: List[Dict[str, Any]] | None = None,
+        scheduler_workers: int = 4,
+        rate_limit_state: RateLimitStore | None = None,
+        retry_policy: RetryPolicy | None = None,
+        negative_cache: NegativeCache | None = None,
+        priority: str = "normal",
+        background_share: float = 0.5,
     ):
         self._bearer_token = bearer_token
         self._consumer_key = consumer_key
@@ -39,11 +131,26 @@ class TwitterDataFetcher:
         self._x_rapidapi_host = x_rapidapi_host
         self._wait_on_rate_limit = wait_on_rate_limit
 
-        self.api = tweepy.API(tweepy.AppAuthHandler(consumer_key=self._consumer_key, consumer_secret=self._consumer_secret), wait_on_rate_limit=self._wait_on_rate_limit)
-
-        self.client = tweepy.Client(
-            bearer_token=self._bearer_token, consumer_key=self._consumer_key, consumer_secret=self._consumer_secret, access_token=self._access_token, access_token_secret=self._access_token_secret, wait_on_rate_limit=self._wait_on_rate_limit
-        )
+        # the token set of the arguments is the first credential of the pool, unless only further credentials were provided
+        tokens = {"bearer_token": bearer_token, "consumer_key": consumer_key, "consumer_secret": consumer_secret, "access_token": access_token, "access_token_secret": access_token_secret}
+        token_sets = ([tokens] if (not credentials) or any(token is not None for token in tokens.values()) else list()) + list(credentials or list())
+        # retries transient failures of all requests
+        self.retry = retry_policy or RetryPolicy()
+        self.pool = CredentialPool(token_sets, wait_on_rate_limit=self._wait_on_rate_limit, state=rate_limit_state, retry=self.retry, priority=priority, background_share=background_share)
+        # tweepy.API and tweepy.Client interfaces that route every request through the pool
+        self.api = self.pool.api
+        self.client = self.pool.client
+
+        # scheduler for concurrent calls of fetcher methods
+        self.scheduler = RequestScheduler(self.pool, workers=scheduler_workers)
+        # users and Tweets known to be unavailable
+        self.unavailable = NegativeCache() if negative_cache is None else negative_cache
+        # batch user and Tweet lookups of concurrent callers
+        # batches only contain callers of the same priority and are looked up with the latest deadline of their callers
+        self._user_loader = BatchLoader(functools.partial(self._batched, self._load_users), max_batch_size=self.LOOKUP_BATCH_SIZE, window=self.LOOKUP_WINDOW, context=self._lookup_context)
+        self._tweet_loader = BatchLoader(functools.partial(self._batched, self._load_tweets), max_batch_size=self.LOOKUP_BATCH_SIZE, window=self.LOOKUP_WINDOW, context=self._lookup_context)
+        # progress callbacks of paginated calls per thread
+        self._progress = threading.local()
 
     def _manual_request(self, url: str, method: str = "GET", header: dict | None = None, payload: dict | None = None, additional_fields: Dict[str, List[str]] | None = None) -> dict:
         """Perform a manual request to the Twitter API.
@@ -56,7 +163,10 @@ class TwitterDataFetcher:
             additional_fields (Dict[str, List[str]] | None, optional): Fields can be specified (e.g., tweet.fields) according to the official API reference. Defaults to None.
 
         Raises:
-            Exception: If status code != 200.
+            ClientError: If the request was rejected (e.g., 400, 403, or 404).
+            TransientError: If the request still failed temporarily (e.g., 5xx or 429) after all retries.
+            CircuitOpenError: If recent requests to the host failed repeatedly.
+            DeadlineExceeded: If the request could not be completed before the deadline of the retry policy.
 
         Returns:
             dict: JSON formatted response of API request.
@@ -72,13 +182,111 @@ class TwitterDataFetcher:
             # append fields to url
             url += fields[:-1]
         if header is None:
-            # set header
-            header = {"Authorization": f"Bearer {self._bearer_token}"}
-        response = requests.request(method=method, url=url, headers=header, json=payload)
-        if response.status_code != 200:
-            raise Exception("Request returned an error: {} {}".format(response.status_code, response.text))
+            # use the bearer token of the credential with the most remaining requests
+            response = self.pool.request(method, url, payload=payload)
+        else:
+            response = self.retry.call(urlparse(url).netloc, self._send, method, url, header, payload)
         return response.json()
 
+    def _send(self, method: str, url: str, header: dict, payload: dict | None) -> requests.Response:
+        """Sends a manual request with a custom header and raises a classified error if it did not succeed."""
+        response = requests.request(method=method, url=url, headers=header, json=payload)
+        raise_for_status(response)
+        return response
+
+    def schedule(self, method: str, *args, cost: int = 1, priority: str | None = None, **kwargs) -> Future:
+        """Queues a call of a fetcher method at the scheduler. Calls on endpoints with remaining requests overtake calls on exhausted endpoints.
+
+        Args:
+            method (str): Name of the fetcher method. Must be from the keys of 'ENDPOINTS'.
+            cost (int, optional): Estimated number of requests of the call. Defaults to 1.
+            priority (str | None, optional): Priority of the call ('high', 'normal', or 'background'). Defaults to None, thus, the priority of the current thread.
+
+        Raises:
+            KeyError: If the method cannot be scheduled.
+            ValueError: If an invalid priority was provided.
+
+        Returns:
+            Future: Result of the call.
+        """
+        if method not in self.ENDPOINTS:
+            raise KeyError("Method '{}' cannot be scheduled. Must be one of {}.".format(method, list(self.ENDPOINTS.keys())))
+        func = getattr(self, method)
+        # scheduled calls report their pages to the progress callback of the submitting thread
+        callback = getattr(self._progress, "callback", None)
+        if callback is not None:
+            func = functools.partial(self._tracked, callback, func)
+        return self.scheduler.submit(self.ENDPOINTS[method], func, args=args, kwargs=kwargs, cost=cost, priority=priority)
+
+    @contextlib.contextmanager
+    def track_progress(self, callback):
+        """Reports every page requested by paginated methods of the current thread (and of the calls it schedules) within the context.
+
+        Args:
+            callback: Function that is called with the number of items of every page.
+        """
+        outer = getattr(self._progress, "callback", None)
+        self._progress.callback = callback
+        try:
+            yield
+        finally:
+            self._progress.callback = outer
+
+    def _tracked(self, callback, func, *args, **kwargs) -> Any:
+        """Calls a function while reporting its pages to the progress callback."""
+        with self.track_progress(callback):
+            return func(*args, **kwargs)
+
+    def _page_fetched(self, items: int):
+        """Reports a requested page to the progress callback of the current thread, if any."""
+        callback = getattr(self._progress, "callback", None)
+        if callback is not None:
+            callback(items)
+
+    async def run_async(self, method: str, *args, **kwargs) -> Any:
+        """Runs a fetcher method in a worker thread without blocking the event loop.
+
+        Concurrent identical calls share one call, and their requests are coalesced with identical requests of other threads.
+
+        Args:
+            method (str): Name of the fetcher method, e.g. 'get_user_object'.
+
+        Returns:
+            Any: Result of the method.
+        """
+        return await self.pool.flight.do_async(flight_key("fetcher", method, args, kwargs), getattr(self, method), *args, **kwargs)
+
+    def _iter_pages(self, func, params: Dict[str, str | int], response_attribute: str = "data", page_attribute: str | None = None) -> Iterator[list]:
+        """Yields the results of every page of a paginated Twitter API v2 endpoint.
+
+        Args:
+            func: Function used for pagination
+            params (Dict[str, str  |  int]): Dict containing request parameters. Should be of the form {'id': ..., 'max_results': ..., 'pagination_token': ...}
+            response_attribute (str, optional): Attribute of the Response object. Defaults to "data". Options: ["data", "includes"]
+            page_attribute (str, optional): The attribute that should be extracted for every entry of a page. Defaults to None.
+
+        Yields:
+            list: Results of a single page.
+        """
+        while True:
+            # make request
+            response = func(**params)
+            # if no data exists, break
+            if response.__getattribute__(response_attribute) is None:
+                break
+            # extract results of the current page
+            if page_attribute is None:
+                page = list(response.__getattribute__(response_attribute))
+            else:
+                page = [item.__getattribute__(page_attribute) for item in response.__getattribute__(response_attribute)]
+            self._page_fetched(len(page))
+            yield page
+            # if last page was reached
+            if "next_token" not in response.meta:
+                break
+            # else, set new pagination token for next iteration
+            params["pagination_token"] = response.meta["next_token"]
+
     def _paginate(self, func, params: Dict[str, str | int], limit: int | None = None, response_attribute: str = "data", page_attribute: str | None = None) -> list:
         """Pagination function
 
@@ -95,50 +303,233 @@ class TwitterDataFetcher:
         Returns:
             set: Results
         """
-        # init counter
-        counter = 0
-        # init empty results set
+        # init empty results list
         results = list()
-        # set break out var
-        break_out = False
-        while not break_out:
-            # make request
-            response = func(**params)
-            # if any data exists
-            if response.__getattribute__(response_attribute) is not None:
-                # iterate over response results
-                for item in response.__getattribute__(response_attribute):
-                    # add result
-                    if page_attribute is None:
-                        results.append(item)
-                    else:
-                        results.append(item.__getattribute__(page_attribute))
-                    # increment counter
-                    counter += 1
-                    # if limit was reached, break
-                    if (limit is not None) and (counter == limit):
-                        # set break_out var to true
-                        break_out = True
-                        break
-                # if last page was reached
-                if "next_token" not in response.meta:
-                    break
-                # else, set new pagination token for next iteration
-                else:
-                    params["pagination_token"] = response.meta["next_token"]
-            # if no data exists, break
-            else:
-                break
+        for page in self._iter_pages(func, params, response_attribute=response_attribute, page_attribute=page_attribute):
+            results.extend(page)
+            # if limit was reached, stop requesting further pages
+            if (limit is not None) and (len(results) >= limit):
+                return results[:limit]
         return results
 
+    def _cursor_pages(self, method, **params) -> Iterator[List[int]]:
+        """Yields the pages of a cursored Twitter API v1.1 endpoint (e.g., follower IDs).
+
+        Args:
+            method: tweepy.API method that supports cursoring.
+            params: Request parameters.
+
+        Yields:
+            List[int]: Results of a single page.
+        """
+        for page in tweepy.Cursor(method, **params).pages():
+            self._page_fetched(len(page))
+            yield page
+
+    def _compress_pages(self, pages: Iterator[List[int]], limit: int | None = None) -> IDSet:
+        """Collects pages of IDs in a compressed ID set.
+
+        Args:
+            pages (Iterator[List[int]]): Pages of IDs.
+            limit (int | None, optional): Maximum number of IDs. Defaults to None, thus, no limit.
+
+        Returns:
+            IDSet: Compressed set of the collected IDs.
+        """
+        # keep pages as int64 arrays instead of Python integers until the set is built
+        arrays, counter = list(), 0
+        for page in pages:
+            arrays.append(np.asarray(page, dtype=np.int64))
+            counter += len(page)
+            # if limit was reached, stop requesting further pages
+            if (limit is not None) and (counter >= limit):
+                break
+        if not arrays:
+            return IDSet()
+        return IDSet(np.concatenate(arrays)[:limit])
+
+    def _sketch_pages(self, pages: Iterator[List[int]], index: SketchIndex, key: str | int, limit: int | None = None) -> int:
+        """Adds pages of IDs to the sketches of a collection without collecting them.
+
+        Args:
+            pages (Iterator[List[int]]): Pages of IDs.
+            index (SketchIndex): Index of the sketches.
+            key (str | int): Collection identifier in the index.
+            limit (int | None, optional): Maximum number of IDs. Defaults to None, thus, no limit.
+
+        Returns:
+            int: Number of added IDs.
+        """
+        counter = 0
+        for page in pages:
+            page = page[: limit - counter] if limit is not None else page
+            index.update(key, np.asarray(page, dtype=np.int64))
+            counter += len(page)
+            # if limit was reached, stop requesting further pages
+            if (limit is not None) and (counter >= limit):
+                break
+        # collections without any IDs get empty sketches
+        index.update(key, list())
+        return counter
+
     """ User Object data methods """
 
+    @staticmethod
+    def _unavailable_status(error: Exception) -> str | None:
+        """Returns the status of an unavailable user or Tweet from a tweepy error, or None if the error does not concern the user or Tweet itself (e.g., a 401 caused by invalid or expired tokens)."""
+        if not isinstance(error, tweepy.errors.HTTPException):
+            return None
+        # 'User has been suspended' (63), 'Not authorized to see this status' (179)
+        if 63 in error.api_codes:
+            return "suspended"
+        if isinstance(error, tweepy.errors.NotFound):
+            return "not_found"
+        if 179 in error.api_codes:
+            return "protected"
+        return None
+
+    def _remember_unavailable(self, kind: str, errors: List[dict]) -> Dict[str, str]:
+        """Adds the unavailable users or Tweets of the errors of a v2 lookup response to the negative cache.
+
+        Args:
+            kind (str): Kind of the requested keys, e.g. 'user_id', 'screen_name', or 'tweet'.
+            errors (List[dict]): Errors of the response.
+
+        Returns:
+            Dict[str, str]: Status per requested value.
+        """
+        statuses = dict()
+        for error in errors:
+            value = error.get("value", error.get("resource_id"))
+            detail, title = error.get("detail", ""), error.get("title", "")
+            if value is None:
+                continue
+            if "suspended" in detail:
+                status = "suspended"
+            elif "Not Found" in title:
+                status = "not_found"
+            elif title == "Authorization Error":
+                status = "protected"
+            else:
+                continue
+            value = value.lower() if kind == "screen_name" else value
+            self.unavailable.add(kind, value, status)
+            statuses[value] = status
+        return statuses
+
+    def _cached_unavailable(self, keys: List[tuple]) -> Dict[tuple, UnavailableError]:
+        """Returns the errors of lookup keys known to be unavailable."""
+        errors = dict()
+        for key in keys:
+            status = self.unavailable.get(*key)
+            if status is not None:
+                errors[key] = Unavailable(*key, status).error()
+        return errors
+
+    @staticmethod
+    def _user_key(user: str | int) -> tuple:
+        """Returns the lookup key of a user ID or screen name."""
+        if (isinstance(user, int)) or (user.isdigit()):
+            return ("user_id", int(user))
+        # screen names are case-insensitive
+        return ("screen_name", user.lower())
+
+    def _lookup_context(self) -> tuple:
+        """Returns the priority and the deadline (monotonic time) of the calling thread for batched lookups."""
+        remaining = self.retry.remaining_time()
+        return self.pool.current_priority(), None if remaining is None else time.monotonic() + remaining
+
+    def _batched(self, load, keys: list, deadline: float | None = None) -> dict:
+        """Calls a bulk function for a batch of lookups with the deadline of the batch instead of the deadline of the dispatching thread."""
+        with self.retry.deadline(None if deadline is None else deadline - time.monotonic(), extend=True):
+            return load(keys)
+
+    def _load_users(self, keys: List[tuple]) -> Dict[tuple, tweepy.models.User | Exception]:
+        """Bulk function of the user loader. Looks up users by ID and screen name with up to one request each."""
+        # users known to be unavailable are not requested
+        user_objs = self._cached_unavailable(keys)
+        pending = [key for key in keys if key not in user_objs]
+        if len(pending) > 1:
+            for kind, url, param in (("user_id", "https://api.twitter.com/2/users", "ids"), ("screen_name", "https://api.twitter.com/2/users/by", "usernames")):
+                values = [value for key_kind, value in pending if key_kind == kind]
+                if not values:
+                    continue
+                try:
+                    for user_obj in self.api.lookup_users(**{kind: values}):
+                        user_objs[(kind, user_obj.id if kind == "user_id" else user_obj.screen_name.lower())] = user_obj
+                except tweepy.errors.NotFound:
+                    # none of the users is available
+                    pass
+                # the v2 endpoint tells why users are missing in the bulk response with a single request
+                missing = [str(value) for value in values if (kind, value) not in user_objs]
+                if missing:
+                    try:
+                        statuses = self._remember_unavailable(kind, self._manual_request(url, additional_fields={param: missing}).get("errors", list()))
+                    except RequestError:
+                        statuses = dict()
+                    for value in values:
+                        if str(value) in statuses:
+                            user_objs[(kind, value)] = Unavailable(kind, value, statuses[str(value)]).error()
+        # single users and users still missing are requested individually to get the proper error
+        for key in pending:
+            if key not in user_objs:
+                try:
+                    user_objs[key] = self._request_user_object(key[1])
+                except tweepy.errors.HTTPException as e:
+                    status = self._unavailable_status(e)
+                    if status is not None:
+                        self.unavailable.add(*key, status)
+                    user_objs[key] = e
+        return user_objs
+
+    def _collect(self, results: Dict[Any, Any], kind: str | None = None) -> Dict[Any, Any]:
+        """Replaces errors of unavailable users or Tweets in results of a bulk lookup with their status and raises other errors.
+
+        Args:
+            results (Dict[Any, Any]): Results of a loader.
+            kind (str | None, optional): Kind of the keys. Defaults to None, thus, keys are tuples of kind and value.
+        """
+        for key, result in results.items():
+            if not isinstance(result, Exception):
+                continue
+            status = result.status if isinstance(result, UnavailableError) else self._unavailable_status(result)
+            if status is None:
+                raise result
+            results[key] = Unavailable(*(key if kind is None else (kind, key)), status)
+        return results
+
     def get_user_object(self, user: str | int) -> tweepy.models.User:
         """Request Twitter User Object via tweepy
 
+        Concurrent calls are looked up together in a single request. Users known to be unavailable are not requested again and raise an UnavailableError.
+
         Args:
             user (str): Either User ID or screen name
 
+        Returns:
+            tweepy.User: Twitter User object from tweepy
+        """
+        return self._user_loader.load(self._user_key(user))
+
+    def get_user_objects(self, users: List[str | int]) -> Dict[str | int, tweepy.models.User | Unavailable]:
+        """Request Twitter User Objects of several users with bulk requests of up to 100 users.
+
+        Args:
+            users (List[str | int]): User IDs or screen names.
+
+        Returns:
+            Dict[str | int, tweepy.models.User | Unavailable]: Twitter User object per user, or the status of suspended, not found, and protected users.
+        """
+        keys = {user: self._user_key(user) for user in users}
+        user_objs = self._collect(self._user_loader.load_many(list(keys.values()), return_exceptions=True))
+        return {user: user_objs[key] for user, key in keys.items()}
+
+    def _request_user_object(self, user: str | int) -> tweepy.models.User:
+        """Requests a single Twitter User Object.
+
+        Args:
+            user (str | int): Either User ID or screen name
+
         Returns:
             tweepy.User: Twitter User object from tweepy
         """
@@ -153,29 +544,24 @@ class TwitterDataFetcher:
         except tweepy.errors.Forbidden as e:
             # log to stdout
             log.error("403 Forbidden: access refused or access is not allowed.")
-            # if user ID was provided
-            if user.isdigit() or isinstance(user, int):
-                url = f"https://api.twitter.com/2/users/{user}"
-            else:
-                # if screen name was provided
-                url = f"https://api.twitter.com/2/users/by/username/{user}"
-            response = self._manual_request(url)
-            # if an error occured that says the user has been suspended
-            if any("User has been suspended" in error["detail"] for error in response["errors"]):
+            # if the error says the user has been suspended
+            if 63 in e.api_codes:
                 log.error("User has been suspended from Twitter. Requested user: {}".format(user))
-                raise e
-            else:
-                raise e
+            raise e
         return user_obj
 
-    def get_user_follower_ids(self, user: str | int) -> Set[int]:
+    def get_user_follower_ids(self, user: str | int, limit: int | None = None, store: IDStore | None = None, compressed: bool = False, sketch: SketchIndex | None = None) -> Set[int] | np.ndarray | IDSet | int:
         """Request Twitter follower IDs from user
 
         Args:
             user (str | int): Either User ID or screen name.
+            limit (int | None, optional): The maximum number of results to be returned. Defaults to None, thus, no limit.
+            store (IDStore | None, optional): If provided, pages are written to the store under the key 'followers_<user>' instead of being collected in memory. 'limit' is ignored. Defaults to None.
+            compressed (bool, optional): Whether to return a compressed ID set instead of a Python set. Defaults to False.
+            sketch (SketchIndex | None, optional): If provided, pages are added to the sketches of 'user' in the index instead of being collected in memory. Defaults to None.
 
         Returns:
-            Set[int]: Array containing follower IDs
+            Set[int] | np.ndarray: Array containing follower IDs. A sorted, memory-mapped array if a store was provided. A compressed ID set if requested. The number of sketched IDs if a sketch index was provided.
         """
         # check if string for user1 is convertible to int in order to check for user ID or screen name
         if (isinstance(user, int)) or (user.isdigit()):
@@ -183,19 +569,101 @@ class TwitterDataFetcher:
         else:
             params = {"screen_name": user}
 
+        # stream pages directly into the ID store if provided
+        if store is not None:
+            return store.write_pages(f"followers_{user}", self._cursor_pages(self.api.get_follower_ids, **params))
+        # stream pages into the sketches if requested
+        if sketch is not None:
+            return self._sketch_pages(self._cursor_pages(self.api.get_follower_ids, **params), sketch, user, limit=limit)
+        # collect pages in a compressed ID set if requested
+        if compressed:
+            return self._compress_pages(self._cursor_pages(self.api.get_follower_ids, **params), limit=limit)
         follower_ids = list()
-        for page in tweepy.Cursor(self.api.get_follower_ids, **params).pages():
+        for page in self._cursor_pages(self.api.get_follower_ids, **params):
             follower_ids.extend(page)
-        return set(follower_ids)
+            # if limit was reached, stop requesting further pages
+            if (limit is not None) and (len(follower_ids) >= limit):
+                break
+        return set(follower_ids[:limit])
+
+    def get_common_follower_ids(self, users: List[str | int]) -> Set[int]:
+        """Request the followers all provided users have in common with as few requests as possible.
+
+        Only the follower list of the user with the fewest followers is requested completely. The remaining candidates are verified against the other users, ordered by their number of followers.
+        For each of them, the cheaper option in terms of rate limit windows is chosen: looking up the relationship of every candidate, or scanning the user's follower list until all candidates are found.
+        Suspended, deactivated, or deleted candidates are dropped, as they are missing in follower lists, too. Thus, the results are the same as intersecting the complete follower lists.
+
+        Args:
+            users (List[str | int]): User IDs or screen names.
 
-    def get_user_followee_ids(self, user: str | int) -> Set[int]:
+        Returns:
+            Set[int]: IDs of common followers.
+        """
+        # order users by their number of followers
+        followers_counts = {user: user_obj.followers_count for user, user_obj in require_available(self.get_user_objects(users)).items()}
+        ordered_users = sorted(users, key=lambda user: followers_counts[user])
+        # the followers of the smallest account are the candidates
+        candidates = self.get_user_follower_ids(ordered_users[0])
+        for user in ordered_users[1:]:
+            # stop early if no candidates are left
+            if not candidates:
+                break
+            # costs in rate limit windows
+            lookup_costs = len(candidates) / self.RATE_LIMITS["friendships/show"]
+            scan_costs = -(-followers_counts[user] // self.FOLLOWER_IDS_PAGE_SIZE) / self.RATE_LIMITS["followers/ids"]
+            if lookup_costs < scan_costs:
+                # check whether each candidate follows the user
+                candidates = {candidate for candidate in candidates if self._follows(candidate, user)}
+            else:
+                candidates = self._scan_follower_ids(user, candidates)
+        return set(candidates)
+
+    def _follows(self, candidate: int, user: str | int) -> bool:
+        """Returns whether a candidate follows a user. Suspended, deactivated, or deleted candidates do not follow anyone."""
+        try:
+            return self.get_relationship(source_user=candidate, target_user=user)["source"]["following"]
+        except tweepy.errors.HTTPException as e:
+            if self._unavailable_status(e) in ("suspended", "not_found"):
+                log.info("Candidate {} is unavailable and not counted as follower of {}.".format(candidate, user))
+                return False
+            raise
+
+    def _scan_follower_ids(self, user: str | int, candidates: Set[int]) -> Set[int]:
+        """Scan the follower list of a user page by page until all candidates were found.
+
+        Args:
+            user (str | int): User ID or screen name.
+            candidates (Set[int]): IDs to be looked up in the follower list.
+
+        Returns:
+            Set[int]: Candidates that follow the user.
+        """
+        if (isinstance(user, int)) or (user.isdigit()):
+            params = {"user_id": user}
+        else:
+            params = {"screen_name": user}
+        remaining, found = set(candidates), set()
+        for page in self._cursor_pages(self.api.get_follower_ids, **params):
+            matches = remaining.intersection(page)
+            found |= matches
+            remaining -= matches
+            # stop requesting pages if every candidate was found
+            if not remaining:
+                break
+        return found
+
+    def get_user_followee_ids(self, user: str | int, limit: int | None = None, store: IDStore | None = None, compressed: bool = False, sketch: SketchIndex | None = None) -> Set[int] | np.ndarray | IDSet | int:
         """Request Twitter followee IDs from user
 
         Args:
             user (str): Either User ID or screen name.
+            limit (int | None, optional): The maximum number of results to be returned. Defaults to None, thus, no limit.
+            store (IDStore | None, optional): If provided, pages are written to the store under the key 'followees_<user>' instead of being collected in memory. 'limit' is ignored. Defaults to None.
+            compressed (bool, optional): Whether to return a compressed ID set instead of a Python set. Defaults to False.
+            sketch (SketchIndex | None, optional): If provided, pages are added to the sketches of 'user' in the index instead of being collected in memory. Defaults to None.
 
         Returns:
-            Set[int]: Array containing follow IDs
+            Set[int] | np.ndarray: Array containing follow IDs. A sorted, memory-mapped array if a store was provided. A compressed ID set if requested. The number of sketched IDs if a sketch index was provided.
         """
         # check if string for user1 is convertible to int in order to check for user ID or screen name
         if (isinstance(user, int)) or (user.isdigit()):
@@ -203,10 +671,22 @@ class TwitterDataFetcher:
         else:
             params = {"screen_name": user}
 
+        # stream pages directly into the ID store if provided
+        if store is not None:
+            return store.write_pages(f"followees_{user}", self._cursor_pages(self.api.get_friend_ids, **params))
+        # stream pages into the sketches if requested
+        if sketch is not None:
+            return self._sketch_pages(self._cursor_pages(self.api.get_friend_ids, **params), sketch, user, limit=limit)
+        # collect pages in a compressed ID set if requested
+        if compressed:
+            return self._compress_pages(self._cursor_pages(self.api.get_friend_ids, **params), limit=limit)
         followee_ids = list()
-        for page in tweepy.Cursor(self.api.get_friend_ids, **params).pages():
+        for page in self._cursor_pages(self.api.get_friend_ids, **params):
             followee_ids.extend(page)
-        return set(followee_ids)
+            # if limit was reached, stop requesting further pages
+            if (limit is not None) and (len(followee_ids) >= limit):
+                break
+        return set(followee_ids[:limit])
 
     def get_latest_activity(self, user: str | int) -> dict:
         """Returns latest user's activity by fetching the top element from its timeline.
@@ -299,42 +779,82 @@ class TwitterDataFetcher:
                     relationships[(user, other_user)] = self.get_relationship(source_user=user, target_user=other_user)
         return relationships
 
-    def get_liked_tweets_ids(self, user: str | int, limit: int | None = None) -> list():
+    def get_liked_tweets_ids(self, user: str | int, limit: int | None = None, compressed: bool = False, store: TimelineStore | None = None, sketch: SketchIndex | None = None) -> list | IDSet | np.ndarray | int:
         """Get (all) liked Tweets of provided user.
 
         Args:
             user (str | int): User ID or screen name.
             limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+            compressed (bool, optional): Whether to return a compressed ID set instead of a list. Defaults to False.
+            store (TimelineStore | None, optional): If provided, only likes newer than the stored ones are requested and merged into the timeline 'liked_tweets_<user ID>'. Pagination stops at the first already stored Tweet. Cannot be combined with 'limit'. Defaults to None.
+            sketch (SketchIndex | None, optional): If provided, pages are added to the sketches of 'user' in the index instead of being collected in memory. Defaults to None.
+
+        Raises:
+            ValueError: If 'limit' and 'store' are both provided.
 
         Returns:
-            Set[int]: Tweet Objects of liked Tweets.
+            Set[int]: Tweet Objects of liked Tweets. A memory-mapped array of the merged timeline if a store was provided. The number of sketched IDs if a sketch index was provided.
         """
+        # a truncated synchronization would leave a gap behind the stored timeline that later synchronizations never fill
+        if (store is not None) and (limit is not None):
+            raise ValueError("'limit' cannot be combined with 'store'.")
         # if user ID was provided
         if (isinstance(user, int)) or (user.isdigit()):
             params = {"id": user, "max_results": 100, "pagination_token": None}
         else:
             user_obj = self.get_user_object(user)
             params = {"id": user_obj.id, "max_results": 100, "pagination_token": None}
-
+        # synchronize with the stored timeline if provided
+        if store is not None:
+            key = f"liked_tweets_{params['id']}"
+            known = store.read(key) if key in store else np.empty(0, dtype=np.int64)
+            # likes are not ordered by Tweet ID, thus, 'since_id' is not supported and pages are requested until a known Tweet occurs
+            new_ids = list()
+            for page in self._iter_pages(self.client.get_liked_tweets, params, page_attribute="id"):
+                hits = np.flatnonzero(np.isin(np.asarray(page, dtype=np.int64), known))
+                new_ids.extend(page[: hits[0]] if hits.size else page)
+                if hits.size:
+                    break
+            return store.prepend(key, new_ids)
+        # stream pages into the sketches if requested
+        if sketch is not None:
+            return self._sketch_pages(self._iter_pages(self.client.get_liked_tweets, params, page_attribute="id"), sketch, user, limit=limit)
+        # collect pages in a compressed ID set if requested
+        if compressed:
+            return self._compress_pages(self._iter_pages(self.client.get_liked_tweets, params, page_attribute="id"), limit=limit)
         page_results = self._paginate(self.client.get_liked_tweets, params, limit=limit, page_attribute="id")
         return page_results
 
-    def get_composed_tweets_ids(self, user: str | int, limit: int | None = None) -> list:
+    def get_composed_tweets_ids(self, user: str | int, limit: int | None = None, store: TimelineStore | None = None) -> list | np.ndarray:
         """Get (all) composed Tweets of provided user by pagination.
 
         Args:
             user (str | int): User ID or screen name.
             limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+            store (TimelineStore | None, optional): If provided, only Tweets newer than the newest stored Tweet are requested ('since_id') and merged into the timeline 'composed_tweets_<user ID>'. Cannot be combined with 'limit'. Defaults to None.
+
+        Raises:
+            ValueError: If 'limit' and 'store' are both provided.
 
         Returns:
-            list: Tweet Objects of composed Tweets.
+            list: Tweet Objects of composed Tweets. A memory-mapped array of the merged timeline if a store was provided.
         """
-
+        # a truncated synchronization would advance the watermark past Tweets that were never fetched
+        if (store is not None) and (limit is not None):
+            raise ValueError("'limit' cannot be combined with 'store'.")
         # user ID is required, if screen name was provided
         if (isinstance(user, str)) and (not user.isdigit()):
             user = self.get_user_object(user).id
         # set params
         params = {"id": user, "max_results": 100, "pagination_token": None}
+        # synchronize with the stored timeline if provided
+        if store is not None:
+            key = f"composed_tweets_{user}"
+            since_id = store.newest_id(key)
+            # only request Tweets newer than the watermark
+            if since_id is not None:
+                params["since_id"] = since_id
+            return store.prepend(key, self._paginate(self.client.get_users_tweets, params, page_attribute="id"))
         # get page results
         page_results = self._paginate(self.client.get_users_tweets, params, limit=limit, page_attribute="id")
         return page_results
@@ -376,9 +896,41 @@ class TwitterDataFetcher:
 
     """ Tweet Object data methods """
 
+    def _load_tweets(self, keys: List[int]) -> Dict[int, tweepy.models.Status | Exception]:
+        """Bulk function of the Tweet loader. Looks up Tweets by ID with a single request."""
+        # Tweets known to be unavailable are not requested
+        tweet_objs = {key[1]: error for key, error in self._cached_unavailable([("tweet", key) for key in keys]).items()}
+        pending = [key for key in keys if key not in tweet_objs]
+        if len(pending) > 1:
+            for tweet_obj in self.api.lookup_statuses(pending, include_entities=True, tweet_mode="extended"):
+                tweet_objs[tweet_obj.id] = tweet_obj
+            # the v2 endpoint tells why Tweets are missing in the bulk response (e.g., deleted ones) with a single request
+            missing = [str(key) for key in pending if key not in tweet_objs]
+            if missing:
+                try:
+                    statuses = self._remember_unavailable("tweet", self._manual_request("https://api.twitter.com/2/tweets", additional_fields={"ids": missing}).get("errors", list()))
+                except RequestError:
+                    statuses = dict()
+                for key in pending:
+                    if str(key) in statuses:
+                        tweet_objs[key] = Unavailable("tweet", key, statuses[str(key)]).error()
+        # single Tweets and Tweets still missing are requested individually to get the proper error
+        for key in pending:
+            if key not in tweet_objs:
+                try:
+                    tweet_objs[key] = self._request_tweet_object(key)
+                except tweepy.errors.HTTPException as e:
+                    status = self._unavailable_status(e)
+                    if status is not None:
+                        self.unavailable.add("tweet", key, status)
+                    tweet_objs[key] = e
+        return tweet_objs
+
     def get_tweet_object(self, tweet: str | int) -> tweepy.models.Status:
         """Request Twitter Tweet Object via tweepy
 
+        Concurrent calls are looked up together in a single request. Tweets known to be unavailable are not requested again and raise an UnavailableError.
+
         Args:
             tweet (int | str): Tweet ID
 
@@ -387,6 +939,29 @@ class TwitterDataFetcher:
 
         Reference: https://developer.twitter.com/en/docs/twitter-api/v1/data-dictionary/object-model/tweet
         """
+        return self._tweet_loader.load(int(tweet))
+
+    def get_tweet_objects(self, tweets: List[str | int]) -> Dict[str | int, tweepy.models.Status | Unavailable]:
+        """Request Twitter Tweet Objects of several Tweets with bulk requests of up to 100 Tweets.
+
+        Args:
+            tweets (List[str | int]): Tweet IDs.
+
+        Returns:
+            Dict[str | int, tweepy.models.Status | Unavailable]: tweepy Status Model per Tweet, or the status of deleted and protected Tweets.
+        """
+        tweet_objs = self._collect(self._tweet_loader.load_many([int(tweet) for tweet in tweets], return_exceptions=True), kind="tweet")
+        return {tweet: tweet_objs[int(tweet)] for tweet in tweets}
+
+    def _request_tweet_object(self, tweet: int) -> tweepy.models.Status:
+        """Requests a single Twitter Tweet Object.
+
+        Args:
+            tweet (int): Tweet ID
+
+        Returns:
+            tweepy.models.Status: tweepy Status Model
+        """
         try:
             tweet_obj = self.api.get_status(tweet, include_entities=True, tweet_mode="extended")
         except tweepy.errors.NotFound as e:
@@ -397,33 +972,49 @@ class TwitterDataFetcher:
             raise e
         return tweet_obj
 
-    def get_liking_users_ids(self, tweet_id: str | int, limit: int | None = None) -> list:
+    def get_liking_users_ids(self, tweet_id: str | int, limit: int | None = None, store: IDStore | None = None, compressed: bool = False) -> list | np.ndarray | IDSet:
         """Get (all) liking users of provided Tweet by pagination.
 
         Args:
             tweet (str | int): Tweet ID.
             limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+            store (IDStore | None, optional): If provided, pages are written to the store under the key 'liking_users_<tweet_id>' instead of being collected in memory. 'limit' is ignored. Defaults to None.
+            compressed (bool, optional): Whether to return a compressed ID set instead of a list. Defaults to False.
 
         Returns:
             list: User Objects as list.
         """
         # set params
         params = {"id": tweet_id, "max_results": 100, "pagination_token": None}
+        # stream pages directly into the ID store if provided
+        if store is not None:
+            return store.write_pages(f"liking_users_{tweet_id}", self._iter_pages(self.client.get_liking_users, params, page_attribute="id"))
+        # collect pages in a compressed ID set if requested
+        if compressed:
+            return self._compress_pages(self._iter_pages(self.client.get_liking_users, params, page_attribute="id"), limit=limit)
         # get page results
         page_results = self._paginate(self.client.get_liking_users, params, limit=limit, page_attribute="id")
         return page_results
 
-    def get_retweeters_ids(self, tweet_id: str | int, limit: int | None = None) -> list:
+    def get_retweeters_ids(self, tweet_id: str | int, limit: int | None = None, store: IDStore | None = None, compressed: bool = False) -> list | np.ndarray | IDSet:
         """Get (all) retweeting users of provided Tweet by pagination.
 
         Args:
             tweet (str | int): Tweet ID.
             limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+            store (IDStore | None, optional): If provided, pages are written to the store under the key 'retweeters_<tweet_id>' instead of being collected in memory. 'limit' is ignored. Defaults to None.
+            compressed (bool, optional): Whether to return a compressed ID set instead of a list. Defaults to False.
 
         Returns:
             list: User Objects of retweeting users.
         """
         params = {"id": tweet_id, "max_results": 100, "pagination_token": None}
+        # stream pages directly into the ID store if provided
+        if store is not None:
+            return store.write_pages(f"retweeters_{tweet_id}", self._iter_pages(self.client.get_retweeters, params, page_attribute="id"))
+        # collect pages in a compressed ID set if requested
+        if compressed:
+            return self._compress_pages(self._iter_pages(self.client.get_retweeters, params, page_attribute="id"), limit=limit)
         # get page results
         page_results = self._paginate(self.client.get_retweeters, params, limit=limit, page_attribute="id")
         return page_results
@@ -462,6 +1053,119 @@ class TwitterDataFetcher:
         else:
             return None
 
+    def _lookup_tweets(self, tweet_ids: List[str | int], fields: List[str]) -> List[dict]:
+        """Request many Tweets with batched requests to the v2 Tweets lookup endpoint (100 Tweets per request).
+
+        Args:
+            tweet_ids (List[str | int]): Tweet IDs.
+            fields (List[str]): Tweet fields to be requested.
+
+        Returns:
+            List[dict]: Tweet objects. Unavailable Tweets are omitted and remembered in the negative cache.
+
+        Reference: https://developer.twitter.com/en/docs/twitter-api/tweets/lookup/api-reference/get-tweets
+        """
+        url = "https://api.twitter.com/2/tweets"
+        size = self.TWEET_LOOKUP_BATCH_SIZE
+        tweets = list()
+        # Tweets known to be unavailable are not requested
+        tweet_ids = [tweet_id for tweet_id in tweet_ids if self.unavailable.get("tweet", tweet_id) is None]
+        # request up to 100 Tweets at once
+        for batch in (tweet_ids[start : start + size] for start in range(0, len(tweet_ids), size)):
+            response_json = self._manual_request(url, additional_fields={"ids": [str(tweet_id) for tweet_id in batch], "tweet.fields": fields})
+            tweets.extend(response_json.get("data", list()))
+            self._remember_unavailable("tweet", response_json.get("errors", list()))
+        return tweets
+
+    def get_tweets_entities(self, tweet_ids: List[str | int]) -> List[dict]:
+        """Get context annotations and entities of many Tweets with batched requests.
+
+        Args:
+            tweet_ids (List[str | int]): Tweet IDs.
+
+        Returns:
+            List[dict]: Tweet objects containing ID, text, context annotations, and entities. Unavailable Tweets are omitted.
+        """
+        return self._lookup_tweets(tweet_ids, ["context_annotations", "entities"])
+
+    def get_tweets_public_metrics(self, tweet_ids: List[str | int]) -> Dict[int, dict]:
+        """Get public metrics and creation dates of many Tweets with batched requests.
+
+        Args:
+            tweet_ids (List[str | int]): Tweet IDs.
+
+        Returns:
+            Dict[int, dict]: Public metrics and 'created_at' date with Tweet IDs as keys. Unavailable Tweets are omitted.
+        """
+        tweets = self._lookup_tweets(tweet_ids, ["public_metrics", "created_at"])
+        return {int(tweet["id"]): {**tweet["public_metrics"], "created_at": tweet["created_at"]} for tweet in tweets}
+
+    def get_composed_tweets_entities(self, user: str | int, limit: int | None = None) -> List[dict]:
+        """Get context annotations and entities of the composed Tweets of provided user by pagination.
+
+        Args:
+            user (str | int): User ID or screen name.
+            limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+
+        Returns:
+            List[dict]: Tweet objects containing ID, text, context annotations, and entities.
+        """
+        # user ID is required, if screen name was provided
+        if (isinstance(user, str)) and (not user.isdigit()):
+            user = self.get_user_object(user).id
+        params = {"id": user, "max_results": 100, "pagination_token": None, "tweet_fields": ["context_annotations", "entities"]}
+        page_results = self._paginate(self.client.get_users_tweets, params, limit=limit)
+        return [tweet.data for tweet in page_results]
+
+    def get_composed_tweets_texts(self, user: str | int, limit: int | None = None, store: TimelineStore | None = None) -> List[dict]:
+        """Get the full text and creation date of the composed Tweets of provided user by pagination. Retweets are excluded and long Tweets are returned with their complete text.
+
+        Args:
+            user (str | int): User ID or screen name.
+            limit (int | None): The maximum number of results to be returned. By default, each page will return the maximum number of results available.
+            store (TimelineStore | None, optional): If provided, only Tweets newer than the newest stored Tweet are requested ('since_id') and merged into the timeline 'composed_tweets_texts_<user ID>' together with their texts. Cannot be combined with 'limit'. Defaults to None.
+
+        Raises:
+            ValueError: If 'limit' and 'store' are both provided.
+
+        Returns:
+            List[dict]: Tweet objects containing ID, text, and creation date, newest first.
+        """
+        # a truncated synchronization would advance the watermark past Tweets that were never fetched
+        if (store is not None) and (limit is not None):
+            raise ValueError("'limit' cannot be combined with 'store'.")
+        # user ID is required, if screen name was provided
+        if (isinstance(user, str)) and (not user.isdigit()):
+            user = self.get_user_object(user).id
+        # Retweets only contain a truncated copy of the original text, long Tweets are truncated unless their 'note_tweet' is requested
+        params = {"id": user, "max_results": 100, "pagination_token": None, "tweet_fields": ["created_at", "note_tweet"], "exclude": ["retweets"]}
+        if store is not None:
+            key = f"composed_tweets_texts_{user}"
+            since_id = store.newest_id(key)
+            # only request Tweets newer than the watermark
+            if since_id is not None:
+                params["since_id"] = since_id
+            page_results = self._paginate(self.client.get_users_tweets, params)
+            return store.prepend_records(key, [self._full_text(tweet.data) for tweet in page_results])
+        page_results = self._paginate(self.client.get_users_tweets, params, limit=limit)
+        return [self._full_text(tweet.data) for tweet in page_results]
+
+    @staticmethod
+    def _full_text(tweet: dict) -> dict:
+        """Replaces the truncated text of a long Tweet by the complete text of its 'note_tweet'.
+
+        Args:
+            tweet (dict): Tweet object.
+
+        Returns:
+            dict: Tweet object without 'note_tweet'.
+        """
+        note_tweet = tweet.get("note_tweet")
+        tweet = {key: value for key, value in tweet.items() if key != "note_tweet"}
+        if isinstance(note_tweet, dict) and note_tweet.get("text"):
+            tweet["text"] = note_tweet["text"]
+        return tweet
+
     def get_public_metrics(self, tweet_id: str | int) -> dict:
         """Get public metrics from Tweet Object
 
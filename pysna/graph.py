@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from pysna.process import IDSet
+
+
+class FollowerGraph:
+    """Directed follower graph in compressed sparse row (CSR) format.
+
+    An edge u -> v means that user u follows user v. Nodes are stored as sorted array of user IDs, the position of an ID in this array is its node index.
+    The outgoing neighbours of node i are 'indices[indptr[i]:indptr[i + 1]]'.
+    """
+
+    def __init__(self, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, sources: Iterable[int] | np.ndarray, targets: Iterable[int] | np.ndarray) -> "FollowerGraph":
+        """Builds a graph from two aligned arrays of user IDs. Duplicated edges and self-loops are removed.
+
+        Args:
+            sources (Iterable[int] | np.ndarray): IDs of the following users.
+            targets (Iterable[int] | np.ndarray): IDs of the followed users.
+
+        Raises:
+            ValueError: If sources and targets differ in length.
+
+        Returns:
+            FollowerGraph: Graph in CSR format.
+        """
+        sources = np.asarray(sources if isinstance(sources, np.ndarray) else list(sources), dtype=np.int64)
+        targets = np.asarray(targets if isinstance(targets, np.ndarray) else list(targets), dtype=np.int64)
+        if sources.shape != targets.shape:
+            raise ValueError("'sources' and 'targets' must have the same length.")
+        # map user IDs to node indices
+        ids, inverse = np.unique(np.concatenate([sources, targets]), return_inverse=True)
+        rows, cols = np.split(inverse.astype(np.int64), 2)
+        return cls._from_index_edges(ids, rows, cols)
+
+    @classmethod
+    def _from_index_edges(cls, ids: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> "FollowerGraph":
+        """Builds the CSR arrays from node index edges."""
+        n = ids.size
+        # sort and deduplicate edges by encoding them as single integers
+        loops = rows == cols
+        keys = np.unique(rows[~loops] * n + cols[~loops])
+        rows, cols = np.divmod(keys, n) if n else (keys, keys)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(ids, indptr, cols)
+
+    @classmethod
+    def from_id_lists(cls, followers: Dict[int, Iterable[int]] | None = None, followees: Dict[int, Iterable[int]] | None = None) -> "FollowerGraph":
+        """Builds a graph from fetched follower and followee ID collections.
+
+        Args:
+            followers (Dict[int, Iterable[int]] | None, optional): Follower IDs with the followed user ID as key. Defaults to None.
+            followees (Dict[int, Iterable[int]] | None, optional): Followee IDs with the following user ID as key. Defaults to None.
+
+        Returns:
+            FollowerGraph: Graph in CSR format.
+        """
+        sources, targets = list(), list()
+        for user, ids in (followers or dict()).items():
+            ids = cls._as_array(ids)
+            sources.append(ids)
+            targets.append(np.full(ids.size, int(user), dtype=np.int64))
+        for user, ids in (followees or dict()).items():
+            ids = cls._as_array(ids)
+            sources.append(np.full(ids.size, int(user), dtype=np.int64))
+            targets.append(ids)
+        if not sources:
+            return cls.from_edges([], [])
+        return cls.from_edges(np.concatenate(sources), np.concatenate(targets))
+
+    @classmethod
+    def from_fetcher(cls, fetcher, seeds: List[str | int], followers: bool = True, followees: bool = True, limit: int | None = None) -> "FollowerGraph":
+        """Fetches the follower and/or followee IDs of seed users and builds their graph.
+
+        Args:
+            fetcher (TwitterDataFetcher): Fetcher instance used for the requests.
+            seeds (List[str | int]): User IDs or screen names.
+            followers (bool, optional): Whether to add edges from the followers of every seed. Defaults to True.
+            followees (bool, optional): Whether to add edges to the followees of every seed. Defaults to True.
+            limit (int | None, optional): Maximum number of IDs per seed and direction. Defaults to None, thus, no limit.
+
+        Returns:
+            FollowerGraph: Graph in CSR format.
+        """
+        follower_ids, followee_ids = dict(), dict()
+        for seed in seeds:
+            # screen names are resolved to user IDs, since nodes are identified by ID
+            user_id = int(seed) if (isinstance(seed, int)) or (seed.isdigit()) else fetcher.get_user_object(seed).id
+            if followers:
+                follower_ids[user_id] = fetcher.get_user_follower_ids(seed, limit=limit, compressed=True)
+            if followees:
+                followee_ids[user_id] = fetcher.get_user_followee_ids(seed, limit=limit, compressed=True)
+        return cls.from_id_lists(followers=follower_ids, followees=followee_ids)
+
+    @staticmethod
+    def _as_array(ids: Iterable[int] | np.ndarray | IDSet) -> np.ndarray:
+        """Converts an ID collection to an int64 array."""
+        if isinstance(ids, IDSet):
+            return ids.to_array()
+        if isinstance(ids, np.ndarray):
+            return ids.astype(np.int64, copy=False)
+        return np.fromiter(ids, dtype=np.int64)
+
+    @property
+    def num_nodes(self) -> int:
+        return int(self.ids.size)
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.indices.size)
+
+    def index_of(self, ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Maps user IDs to node indices.
+
+        Args:
+            ids (Iterable[int] | np.ndarray): User IDs.
+
+        Raises:
+            KeyError: If an ID is not part of the graph.
+
+        Returns:
+            np.ndarray: Node indices.
+        """
+        ids = np.atleast_1d(np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64))
+        positions = np.searchsorted(self.ids, ids)
+        found = positions < self.ids.size
+        found[found] = self.ids[positions[found]] == ids[found]
+        if not found.all():
+            raise KeyError(ids[~found].tolist())
+        return positions
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the edges as aligned arrays of source and target node indices."""
+        return np.repeat(np.arange(self.num_nodes), np.diff(self.indptr)), self.indices
+
+    def neighbours(self, nodes: np.ndarray) -> np.ndarray:
+        """Returns the concatenated outgoing neighbours of several nodes without a Python loop."""
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        # position of every neighbour in 'indices'
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.indices[offsets + np.arange(lengths.sum())]
+
+    def transpose(self) -> "FollowerGraph":
+        """Returns the graph with reversed edges, i.e. u -> v means that v follows u."""
+        rows, cols = self.edges()
+        return self._from_index_edges(self.ids, cols, rows)
+
+    def to_undirected(self) -> "FollowerGraph":
+        """Returns the graph with every edge in both directions."""
+        rows, cols = self.edges()
+        return self._from_index_edges(self.ids, np.concatenate([rows, cols]), np.concatenate([cols, rows]))
+
+    def out_degree(self) -> np.ndarray:
+        """Number of followees of every node."""
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """Number of followers of every node."""
+        return np.bincount(self.indices, minlength=self.num_nodes)
+
+    def reciprocity(self) -> float:
+        """Fraction of edges whose reverse edge exists as well, i.e. mutual follow relations."""
+        if self.num_edges == 0:
+            return 0.0
+        rows, cols = self.edges()
+        keys = rows * self.num_nodes + cols
+        reverse_keys = cols * self.num_nodes + rows
+        # keys are sorted, since edges are sorted by source and target
+        return float(np.isin(reverse_keys, keys, assume_unique=True).mean())
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+        """Computes PageRank by power iteration. Users followed by many well-followed users rank highest.
+
+        Args:
+            damping (float, optional): Damping factor. Defaults to 0.85.
+            tol (float, optional): Convergence threshold of the L1 change between iterations. Defaults to 1e-10.
+            max_iter (int, optional): Maximum number of iterations. Defaults to 100.
+
+        Returns:
+            np.ndarray: PageRank scores summing up to 1, in the order of 'ids'.
+        """
+        n = self.num_nodes
+        if n == 0:
+            return np.empty(0)
+        rows, cols = self.edges()
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            # rank of every node is split evenly among its followees
+            shares = rank / np.maximum(out_degree, 1)
+            new_rank = np.bincount(cols, weights=shares[rows], minlength=n)
+            # rank of nodes without followees is distributed among all nodes
+            new_rank = damping * (new_rank + rank[dangling].sum() / n) + (1 - damping) / n
+            converged = np.abs(new_rank - rank).sum() < tol
+            rank = new_rank
+            if converged:
+                break
+        return rank
+
+    def core_number(self) -> np.ndarray:
+        """Computes the k-core number of every node of the undirected graph by peeling all nodes of minimal degree at once.
+
+        Returns:
+            np.ndarray: Core numbers in the order of 'ids'.
+        """
+        graph = self.to_undirected()
+        degree = graph.out_degree().copy()
+        core = np.zeros(self.num_nodes, dtype=np.int64)
+        alive = np.ones(self.num_nodes, dtype=bool)
+        k = 0
+        while alive.any():
+            k = max(k, int(degree[alive].min()))
+            peel = alive & (degree <= k)
+            while peel.any():
+                core[peel] = k
+                alive[peel] = False
+                # removing nodes decreases the degree of their neighbours
+                degree -= np.bincount(graph.neighbours(np.flatnonzero(peel)), minlength=self.num_nodes)
+                peel = alive & (degree <= k)
+        return core
+
+    def communities(self, max_iter: int = 30, seed: int | None = None, workers: int | None = None) -> Dict[int, int]:
+        """Detects communities by label propagation on the undirected graph.
+
+        Every user starts with an own label and repeatedly adopts the label most of its neighbours have. Ties are broken in favour of the current label, otherwise randomly.
+        In every iteration only a random half of the users is updated, which prevents labels from oscillating between two groups.
+        The users are split into contiguous ranges that are processed by a pool of threads, as NumPy releases the GIL while sorting.
+
+        Args:
+            max_iter (int, optional): Maximum number of iterations. Defaults to 30.
+            seed (int | None, optional): Seed of the random tie-breaking. Defaults to None.
+            workers (int | None, optional): Number of threads. Defaults to None, thus, the number of CPUs.
+
+        Returns:
+            Dict[int, int]: Community labels with user IDs as keys. Labels are numbered by descending community size.
+        """
+        graph = self.to_undirected()
+        n = self.num_nodes
+        rows, cols = graph.edges()
+        labels = np.arange(n)
+        rng = np.random.default_rng(seed)
+        workers = workers or os.cpu_count() or 1
+        # ranges of users with their edges
+        ranges = [(nodes[0], nodes[-1] + 1) for nodes in np.array_split(np.arange(n), min(workers, max(n, 1))) if nodes.size]
+
+        def propagate(start: int, stop: int, noise: np.ndarray) -> np.ndarray:
+            """Returns the most frequent neighbour label of every user in a range."""
+            best = labels[start:stop].copy()
+            first, last = graph.indptr[start], graph.indptr[stop]
+            keys = np.sort(rows[first:last] * n + labels[cols[first:last]])
+            # count the neighbours per user and label
+            starts = np.flatnonzero(np.diff(keys, prepend=-1))
+            counts = np.diff(np.append(starts, keys.size))
+            users, candidates = np.divmod(keys[starts], max(n, 1))
+            # ties are broken by the current label first, then by random noise below 1
+            scores = counts + 0.5 * (candidates == labels[users]) + 0.4 * noise[candidates]
+            user_starts = np.flatnonzero(np.diff(users, prepend=-1))
+            maxima = np.repeat(np.maximum.reduceat(scores, user_starts), np.diff(np.append(user_starts, users.size)))
+            winners = scores == maxima
+            best[users[winners] - start] = candidates[winners]
+            return best
+
+        with ThreadPoolExecutor(max_workers=max(len(ranges), 1)) as executor:
+            for _ in range(max_iter):
+                noise = rng.random(n)
+                best = np.concatenate([labels[:0]] + list(executor.map(lambda bounds: propagate(*bounds, noise), ranges)))
+                changed = best != labels
+                if not changed.any():
+                    break
+                # semi-synchronous update
+                update = changed & (rng.random(n) < 0.5)
+                labels[update] = best[update]
+        # number communities by descending size
+        _, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        ranks = np.empty(sizes.size, dtype=np.int64)
+        ranks[np.argsort(-sizes, kind="stable")] = np.arange(sizes.size)
+        return dict(zip(self.ids.tolist(), ranks[inverse].tolist()))
+
+    def metrics(self) -> Dict[int, dict]:
+        """Computes in-degree, out-degree, PageRank and core number of every user.
+
+        Returns:
+            Dict[int, dict]: Metrics with user IDs as keys.
+        """
+        in_degree, out_degree, pagerank, core = self.in_degree(), self.out_degree(), self.pagerank(), self.core_number()
+        return {user: {"in_degree": int(in_degree[idx]), "out_degree": int(out_degree[idx]), "pagerank": float(pagerank[idx]), "core_number": int(core[idx])} for idx, user in enumerate(self.ids.tolist())}
+
+    def __repr__(self) -> str:
+        return f"FollowerGraph(nodes={self.num_nodes}, edges={self.num_edges})"
+
+
+class EngagementGraph:
+    """Append-only bipartite graph of user-tweet engagements (likes, retweets, and quotes).
+
+    Edges are stored as (user ID, tweet ID, interaction type) rows. If a path is provided, every appended edge is written to this binary file as well, and existing edges are loaded from it.
+    User-user projections, such as the number of tweets two users both engaged with, are computed from CSR indices that are built once and cached until new edges are appended.
+    """
+
+    INTERACTIONS = {"like": 0, "retweet": 1, "quote": 2}
+    # maximum number of user pairs generated at once when projecting
+    PAIRS_CHUNK_SIZE = 1 << 24
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._chunks = list()
+        self._cache = dict()
+        if (path is not None) and os.path.exists(path):
+            self._chunks.append(np.fromfile(path, dtype=np.int64).reshape(-1, 3))
+
+    def add(self, tweet_id: str | int, user_ids: Iterable[int] | np.ndarray | IDSet, interaction: str):
+        """Appends the engagements of users with a tweet.
+
+        Args:
+            tweet_id (str | int): Tweet ID.
+            user_ids (Iterable[int] | np.ndarray | IDSet): IDs of engaging users.
+            interaction (str): Interaction type, one of 'like', 'retweet', or 'quote'.
+
+        Raises:
+            ValueError: If interaction type is unknown.
+        """
+        if interaction not in self.INTERACTIONS:
+            raise ValueError("Invalid interaction '{}'. Must be one of {}.".format(interaction, list(self.INTERACTIONS.keys())))
+        users = FollowerGraph._as_array(user_ids)
+        chunk = np.column_stack([users, np.full(users.size, int(tweet_id), dtype=np.int64), np.full(users.size, self.INTERACTIONS[interaction], dtype=np.int64)])
+        self._chunks.append(chunk)
+        if self.path is not None:
+            with open(self.path, "ab") as handle:
+                chunk.tofile(handle)
+        # projections have to be rebuilt
+        self._cache.clear()
+
+    def ingest(self, fetcher, tweet_ids: List[str | int], interactions: Iterable[str] = ("like", "retweet", "quote"), limit: int | None = None):
+        """Fetches the engaging users of tweets and appends them.
+
+        Args:
+            fetcher (TwitterDataFetcher): Fetcher instance used for the requests.
+            tweet_ids (List[str | int]): Tweet IDs.
+            interactions (Iterable[str], optional): Interaction types to be fetched. Defaults to all.
+            limit (int | None, optional): Maximum number of users per tweet and interaction type. Defaults to None, thus, no limit.
+        """
+        methods = {"like": fetcher.get_liking_users_ids, "retweet": fetcher.get_retweeters_ids, "quote": fetcher.get_quoting_users_ids}
+        for tweet_id in tweet_ids:
+            for interaction in interactions:
+                self.add(tweet_id, methods[interaction](tweet_id, limit=limit), interaction)
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Deduplicated edges as array of shape (n, 3) with user ID, tweet ID, and interaction type."""
+        if len(self._chunks) != 1:
+            chunks = [chunk for chunk in self._chunks if chunk.size] or [np.empty((0, 3), dtype=np.int64)]
+            self._chunks = [np.concatenate(chunks)]
+        if "edges" not in self._cache:
+            self._cache["edges"] = np.unique(self._chunks[0], axis=0)
+        return self._cache["edges"]
+
+    def _bipartite(self, interactions: Iterable[str] | None = None) -> dict:
+        """Builds (and caches) CSR indices of tweets per user and users per tweet for the selected interaction types."""
+        types = tuple(sorted(self.INTERACTIONS[interaction] for interaction in (interactions or self.INTERACTIONS.keys())))
+        if types not in self._cache:
+            edges = self.edges
+            edges = edges[np.isin(edges[:, 2], types)]
+            user_ids, users = np.unique(edges[:, 0], return_inverse=True)
+            tweet_ids, tweets = np.unique(edges[:, 1], return_inverse=True)
+            # a user engaging with a tweet in several ways counts once
+            keys = np.unique(users.astype(np.int64) * tweet_ids.size + tweets)
+            users, tweets = np.divmod(keys, max(tweet_ids.size, 1))
+            # keys are sorted by user, thus, only the users per tweet have to be reordered
+            order = np.argsort(tweets, kind="stable")
+            self._cache[types] = {
+                "user_ids": user_ids,
+                "tweet_ids": tweet_ids,
+                "by_user": FollowerGraph(user_ids, self._indptr(users, user_ids.size), tweets),
+                "by_tweet": FollowerGraph(tweet_ids, self._indptr(tweets, tweet_ids.size), users[order]),
+            }
+        return self._cache[types]
+
+    @staticmethod
+    def _indptr(rows: np.ndarray, n: int) -> np.ndarray:
+        """Returns the CSR row pointers of sorted row indices."""
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr
+
+    def co_engagement(self, interactions: Iterable[str] | None = None, min_count: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Counts the tweets every pair of users both engaged with, i.e. the user-user projection B * B^T of the user-tweet matrix B.
+
+        The number of generated pairs grows quadratically with the number of engaging users per tweet, so tweets with very many engagements are expensive. Use 'top_co_engagers' for single users.
+
+        Args:
+            interactions (Iterable[str] | None, optional): Interaction types to be considered. Defaults to None, thus, all.
+            min_count (int, optional): Minimum number of common tweets of a pair. Defaults to 1.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: IDs of the first and second user of every pair (first < second) and their number of common tweets.
+        """
+        bipartite = self._bipartite(interactions)
+        by_tweet, n = bipartite["by_tweet"], bipartite["user_ids"].size
+        degree = np.diff(by_tweet.indptr)
+        # process tweets in chunks to bound the number of pairs in memory
+        chunks = np.cumsum(degree**2) // self.PAIRS_CHUNK_SIZE
+        keys, counts = list(), list()
+        for tweets in np.split(np.arange(by_tweet.num_nodes), np.flatnonzero(np.diff(chunks)) + 1):
+            if tweets.size == 0:
+                continue
+            lengths = degree[tweets]
+            users = by_tweet.neighbours(tweets)
+            # pair every user with every user of the same tweet
+            left = np.repeat(users, np.repeat(lengths, lengths))
+            right = by_tweet.neighbours(np.repeat(tweets, lengths))
+            mask = left < right
+            chunk_keys, chunk_counts = np.unique(left[mask] * n + right[mask], return_counts=True)
+            keys.append(chunk_keys)
+            counts.append(chunk_counts)
+        if not keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # merge the counts of all chunks
+        keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+        keep = counts >= min_count
+        first, second = np.divmod(keys[keep], n)
+        return bipartite["user_ids"][first], bipartite["user_ids"][second], counts[keep]
+
+    def top_co_engagers(self, user_id: int, n: int = 10, interactions: Iterable[str] | None = None) -> List[Tuple[int, int]]:
+        """Returns the users who engaged with the most tweets the given user engaged with as well.
+
+        Args:
+            user_id (int): User ID.
+            n (int, optional): Number of users to be returned. Defaults to 10.
+            interactions (Iterable[str] | None, optional): Interaction types to be considered. Defaults to None, thus, all.
+
+        Raises:
+            KeyError: If the user did not engage with any tweet.
+
+        Returns:
+            List[Tuple[int, int]]: User IDs and numbers of common tweets, ordered by the number of common tweets.
+        """
+        bipartite = self._bipartite(interactions)
+        user = bipartite["by_user"].index_of([user_id])
+        tweets = bipartite["by_user"].neighbours(user)
+        counts = np.bincount(bipartite["by_tweet"].neighbours(tweets), minlength=bipartite["user_ids"].size)
+        counts[user] = 0
+        top = np.flatnonzero(counts)
+        # stable sort keeps lower user IDs first on ties
+        top = top[np.argsort(-counts[top], kind="stable")][:n]
+        return list(zip(bipartite["user_ids"][top].tolist(), counts[top].tolist()))
+
+    def __len__(self) -> int:
+        return int(self.edges.shape[0])
+
+    def __repr__(self) -> str:
+        return f"EngagementGraph(edges={len(self)})"
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import time
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+
+from pysna.store import MetricsStore
+
+
+class PublicMetricsPoller:
+    """Polls the public metrics of tracked Tweets with batched lookups and adaptive intervals.
+
+    The poll interval of a Tweet grows with its age ('age_factor' times the age, clipped to 'min_interval' and 'max_interval').
+    It is halved if the engagement (likes, retweets, quotes, and replies) grew faster than 'velocity_threshold' per minute since the last poll, and doubled if the engagement did not change.
+    Due Tweets are requested in batches of 100. Free slots of the last batch are filled with Tweets that will be due within 'min_interval'.
+    """
+
+    def __init__(self, fetcher, store: MetricsStore, min_interval: float = 60.0, max_interval: float = 3600.0, age_factor: float = 0.05, velocity_threshold: float = 10.0):
+        if min_interval > max_interval:
+            raise ValueError("'min_interval' must not be greater than 'max_interval'.")
+        self.fetcher = fetcher
+        self.store = store
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_factor = age_factor
+        self.velocity_threshold = velocity_threshold
+        # schedule of the tracked Tweets as aligned arrays
+        self.tweet_ids = np.empty(0, dtype=np.int64)
+        self._due = np.empty(0, dtype=np.float64)
+        self._interval = np.empty(0, dtype=np.float64)
+        self._last_poll = np.empty(0, dtype=np.float64)
+        self._engagement = np.empty(0, dtype=np.int64)
+
+    def track(self, tweet_ids: Iterable[str | int]):
+        """Adds Tweets to the schedule. They are due immediately.
+
+        Args:
+            tweet_ids (Iterable[str | int]): Tweet IDs.
+        """
+        new = np.setdiff1d(np.fromiter((int(tweet_id) for tweet_id in tweet_ids), dtype=np.int64), self.tweet_ids)
+        self.tweet_ids = np.concatenate([self.tweet_ids, new])
+        self._due = np.concatenate([self._due, np.zeros(new.size)])
+        self._interval = np.concatenate([self._interval, np.full(new.size, self.min_interval)])
+        self._last_poll = np.concatenate([self._last_poll, np.full(new.size, np.nan)])
+        # -1 marks Tweets that were not polled yet
+        self._engagement = np.concatenate([self._engagement, np.full(new.size, -1, dtype=np.int64)])
+
+    def untrack(self, tweet_ids: Iterable[str | int]):
+        """Removes Tweets from the schedule.
+
+        Args:
+            tweet_ids (Iterable[str | int]): Tweet IDs.
+        """
+        keep = ~np.isin(self.tweet_ids, np.fromiter((int(tweet_id) for tweet_id in tweet_ids), dtype=np.int64))
+        self.tweet_ids, self._due, self._interval, self._last_poll, self._engagement = (array[keep] for array in (self.tweet_ids, self._due, self._interval, self._last_poll, self._engagement))
+
+    def _select(self, now: float) -> np.ndarray:
+        """Returns the positions of the Tweets to be polled, filling up the last batch with Tweets that are due soon."""
+        size = self.fetcher.TWEET_LOOKUP_BATCH_SIZE
+        due = np.flatnonzero(self._due <= now)
+        if due.size == 0:
+            return due
+        capacity = -(-due.size // size) * size
+        soon = np.flatnonzero((self._due > now) & (self._due <= now + self.min_interval))
+        soon = soon[np.argsort(self._due[soon], kind="stable")][: capacity - due.size]
+        return np.concatenate([due, soon])
+
+    def poll(self, now: float | None = None) -> int:
+        """Polls all due Tweets once and appends the samples to the store. Unavailable Tweets (e.g., deleted ones) are no longer tracked.
+
+        Args:
+            now (float | None, optional): Unix timestamp of the poll. Defaults to None, thus, the current time.
+
+        Returns:
+            int: Number of sampled Tweets.
+        """
+        now = time.time() if now is None else now
+        positions = self._select(now)
+        if positions.size == 0:
+            return 0
+        samples = self.fetcher.get_tweets_public_metrics(self.tweet_ids[positions].tolist())
+        self.store.append(samples, now)
+        # stop tracking unavailable Tweets
+        available = np.isin(self.tweet_ids[positions], np.fromiter(samples.keys(), dtype=np.int64, count=len(samples)))
+        missing = self.tweet_ids[positions[~available]]
+        positions = positions[available]
+        # reschedule the sampled Tweets
+        metrics = [samples[tweet_id] for tweet_id in self.tweet_ids[positions].tolist()]
+        engagement = np.array([sum(sample.get(key, 0) for key in ("like_count", "retweet_count", "quote_count", "reply_count")) for sample in metrics], dtype=np.int64)
+        created = np.array([datetime.fromisoformat(sample["created_at"].replace("Z", "+00:00")).timestamp() for sample in metrics], dtype=np.float64)
+        interval = np.clip((now - created) * self.age_factor, self.min_interval, self.max_interval)
+        polled = self._engagement[positions] >= 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocity = (engagement - self._engagement[positions]) / ((now - self._last_poll[positions]) / 60)
+        # poll fast growing Tweets more often and unchanged Tweets less often
+        interval = np.where(polled & (velocity > self.velocity_threshold), interval / 2, interval)
+        interval = np.where(polled & (engagement == self._engagement[positions]), np.maximum(interval, 2 * self._interval[positions]), interval)
+        interval = np.clip(interval, self.min_interval, self.max_interval)
+        self._interval[positions] = interval
+        self._due[positions] = now + interval
+        self._last_poll[positions] = now
+        self._engagement[positions] = engagement
+        self.untrack(missing.tolist())
+        return len(samples)
+
+    def next_due(self) -> float | None:
+        """Returns the Unix timestamp of the next due Tweet or None if no Tweet is tracked."""
+        return float(self._due.min()) if self._due.size else None
+
+    def run(self, duration: float | None = None):
+        """Polls until no Tweet is tracked anymore or the duration has passed. Sleeps between polls.
+
+        Args:
+            duration (float | None, optional): Duration in seconds. Defaults to None, thus, unlimited.
+        """
+        end = None if duration is None else time.time() + duration
+        while self.tweet_ids.size and ((end is None) or (time.time() < end)):
+            self.poll()
+            next_due = self.next_due()
+            if next_due is None:
+                break
+            wake_up = next_due if end is None else min(next_due, end)
+            time.sleep(max(0.0, wake_up - time.time()))
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import functools
+import hashlib
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+import requests
+import tweepy
+
+from pysna.coalesce import SingleFlight, flight_key
+from pysna.retry import DeadlineExceeded, RateLimitError, RetryPolicy, raise_for_status
+from pysna.store import RateLimitStore
+
+# create logger instance
+log = logging.getLogger(__name__)
+# log to stdout
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.ERROR)
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+log.addHandler(handler)
+
+
+def endpoint_of(url: str) -> str:
+    """Returns the rate limit endpoint of a request URL, e.g. '2/users/:id/liked_tweets' for 'https://api.twitter.com/2/users/44196397/liked_tweets?max_results=100'."""
+    segments = urlparse(url).path.strip("/").removesuffix(".json").split("/")
+    # IDs and screen names in the path belong to the same endpoint, the first segment is the API version
+    return "/".join(segment if idx == 0 else ":id" if segment.isdigit() else ":username" if segments[idx - 1] == "username" else segment for idx, segment in enumerate(segments))
+
+
+class Credential:
+    """One set of Twitter API tokens with its own tweepy.API, tweepy.Client, and session for manual requests.
+
+    The rate limit headers of every response are recorded in 'limits' with the endpoints as keys.
+    """
+
+    def __init__(
+        self,
+        bearer_token: Any | None = None,
+        consumer_key: Any | None = None,
+        consumer_secret: Any | None = None,
+        access_token: Any | None = None,
+        access_token_secret: Any | None = None,
+    ):
+        self.bearer_token = bearer_token
+        # identifies the credential in shared rate limit states without revealing its tokens
+        self.key = hashlib.sha256("|".join(str(token) for token in (bearer_token, consumer_key, consumer_secret, access_token, access_token_secret)).encode("utf-8")).hexdigest()[:16]
+        # app authentication requires a consumer key and secret, otherwise the bearer token is used
+        if (consumer_key is not None) and (consumer_secret is not None):
+            auth = tweepy.AppAuthHandler(consumer_key=consumer_key, consumer_secret=consumer_secret)
+        else:
+            auth = tweepy.OAuth2BearerHandler(bearer_token)
+        # rate limits are handled by the pool
+        self.api = tweepy.API(auth, wait_on_rate_limit=False)
+        self.client = tweepy.Client(bearer_token=bearer_token, consumer_key=consumer_key, consumer_secret=consumer_secret, access_token=access_token, access_token_secret=access_token_secret, wait_on_rate_limit=False)
+        self.session = requests.Session()
+        # rate limit state as {"limit": ..., "remaining": ..., "reset": ...} per endpoint
+        self.limits = dict()
+
+    @property
+    def sessions(self) -> List[requests.Session]:
+        return [self.api.session, self.client.session, self.session]
+
+    def request(self, method: str, url: str, payload: dict | None = None) -> requests.Response:
+        """Performs a manual request with the bearer token of the credential.
+
+        Raises:
+            RequestError: If status code != 200. The subclass classifies the error.
+        """
+        response = self.session.request(method=method, url=url, headers={"Authorization": f"Bearer {self.bearer_token}"}, json=payload)
+        raise_for_status(response)
+        return response
+
+    def remaining(self, endpoint: str | None, now: float) -> float:
+        """Returns the number of remaining requests of an endpoint. Unknown endpoints and endpoints whose window was reset count as unlimited until the next response."""
+        state = self.limits.get(endpoint)
+        if (state is None) or (state["reset"] <= now):
+            return float("inf")
+        return state["remaining"]
+
+
+class _Router:
+    """Stands in for tweepy.API or tweepy.Client and routes every method call through the pool."""
+
+    def __init__(self, pool, kind: str):
+        self._pool = pool
+        self._kind = kind
+
+    def __getattr__(self, name: str):
+        template = getattr(getattr(self._pool.credentials[0], self._kind), name)
+        if not callable(template):
+            return template
+
+        # keep attributes of tweepy methods (e.g., the pagination mode used by tweepy.Cursor)
+        @functools.wraps(template)
+        def route(*args, **kwargs):
+            key = (self._kind, name)
+            call = functools.partial(self._pool.call, key, lambda credential: getattr(getattr(credential, self._kind), name), *args, **kwargs)
+            # identical concurrent reads of the same priority share one request
+            if name.startswith(self._pool.COALESCED_PREFIXES):
+                return self._pool.flight.do(flight_key(key, self._pool.current_priority(), args, kwargs), call)
+            return call()
+
+        return route
+
+
+class CredentialPool:
+    """Pool of several Twitter API credentials that spreads requests across their rate limits.
+
+    Every request is routed to the credential with the most remaining requests for the requested endpoint, as observed from the 'x-rate-limit-*' headers of previous responses.
+    If a credential is rate limited, the request is repeated with the next credential. Only if every credential is exhausted, the pool sleeps until the first window is reset ('wait_on_rate_limit=True') or raises a RateLimitError without making a request.
+
+    Transient failures of single requests (e.g., 503 responses) are retried by the retry policy before another credential is selected.
+    If a RateLimitStore is provided, the observed states are shared with other processes using the same store, and every request is reserved in the store before it is made.
+
+    Concurrent identical reads of the same priority (tweepy methods starting with 'get_', 'lookup_', or 'search_', and manual GET requests) share one in-flight request.
+    Deadline and rate limit errors of the shared request are not passed on: the waiting calls repeat the request with their own deadline and priority.
+
+    Every call has a priority ('high', 'normal', or 'background'), set per thread with 'prioritized' or for the whole pool with 'priority'.
+    Background calls only use 'background_share' of the limit of every window per credential and endpoint, so the rest is left to other calls (also of other processes sharing the RateLimitStore).
+    High-priority calls waiting for the reset of an endpoint are served first: calls of lower priority do not take the requests of the endpoint until the waiting calls were served.
+
+    'api' and 'client' can be used like tweepy.API and tweepy.Client.
+    """
+
+    # tweepy methods that only read and can be coalesced
+    COALESCED_PREFIXES = ("get_", "lookup_", "search_", "user_timeline")
+    # priorities of calls from highest to lowest
+    PRIORITIES = ("high", "normal", "background")
+
+    def __init__(
+        self,
+        credentials: List[Dict[str, Any]],
+        wait_on_rate_limit: bool = True,
+        state: RateLimitStore | None = None,
+        retry: RetryPolicy | None = None,
+        priority: str = "normal",
+        background_share: float = 0.5,
+    ):
+        if not credentials:
+            raise ValueError("At least one credential must be provided.")
+        self._check_priority(priority)
+        if not 0 < background_share <= 1:
+            raise ValueError("'background_share' must be greater than 0 and at most 1.")
+        self.credentials = [Credential(**credential) for credential in credentials]
+        self.wait_on_rate_limit = wait_on_rate_limit
+        self.state = state
+        self.retry = retry or RetryPolicy()
+        # errors caused by the deadline or the priority of a call are not shared with coalesced calls
+        self.flight = SingleFlight(private_errors=(DeadlineExceeded, RateLimitError))
+        # priority of calls of threads without a priority of their own
+        self.priority = priority
+        self.background_share = background_share
+        for credential in self.credentials:
+            for session in credential.sessions:
+                session.hooks["response"].append(functools.partial(self._observe, credential))
+        # endpoints of tweepy methods, learned from their responses
+        self._endpoints = dict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counter = 0
+        # high-priority calls waiting for the reset of an endpoint
+        self._waiting = Counter()
+        # notified when waiting high-priority calls were served
+        self._served = threading.Condition(self._lock)
+        self.api = _Router(self, "api")
+        self.client = _Router(self, "client")
+        # restore the states of previous runs and other processes
+        if self.state is not None:
+            self._refresh()
+
+    def _check_priority(self, priority: str):
+        if priority not in self.PRIORITIES:
+            raise ValueError("Invalid priority '{}'. Must be one of {}.".format(priority, list(self.PRIORITIES)))
+
+    @contextlib.contextmanager
+    def prioritized(self, priority: str | None):
+        """Sets the priority of all calls of the current thread within the context.
+
+        Args:
+            priority (str | None): Priority from 'PRIORITIES'. None keeps the current priority.
+        """
+        outer = getattr(self._local, "priority", None)
+        if priority is not None:
+            self._check_priority(priority)
+            self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = outer
+
+    def current_priority(self) -> str:
+        """Returns the priority of calls of the current thread."""
+        return getattr(self._local, "priority", None) or self.priority
+
+    def available(self, credential: Credential, endpoint: str | None, now: float, priority: str = "normal") -> float:
+        """Returns the remaining requests of an endpoint that calls of a priority may make with a credential. Background calls leave the share of other calls of the current window."""
+        remaining = credential.remaining(endpoint, now)
+        state = credential.limits.get(endpoint)
+        if (priority == "background") and (state is not None) and (state["limit"] is not None) and (state["reset"] > now):
+            remaining -= state["limit"] * (1 - self.background_share)
+        return remaining
+
+    def _refresh(self, endpoint: str | None = None):
+        """Loads the shared rate limit states of the credentials."""
+        states = self.state.read(endpoint)
+        with self._lock:
+            for credential in self.credentials:
+                credential.limits.update(states.get(credential.key, dict()))
+
+    def _observe(self, credential: Credential, response: requests.Response, *args, **kwargs):
+        """Response hook that records the rate limit headers of a credential."""
+        endpoint = endpoint_of(response.url)
+        self._local.endpoint = endpoint
+        headers = response.headers
+        with self._lock:
+            state = credential.limits.get(endpoint, {"limit": None, "remaining": None, "reset": 0.0})
+            if "x-rate-limit-remaining" in headers:
+                state["limit"] = int(headers.get("x-rate-limit-limit", headers["x-rate-limit-remaining"]))
+                state["remaining"] = int(headers["x-rate-limit-remaining"])
+                state["reset"] = float(headers.get("x-rate-limit-reset", time.time() + 15 * 60))
+            elif response.status_code == 429:
+                state["remaining"] = 0
+                state["reset"] = float(headers.get("retry-after", 60)) + time.time()
+            else:
+                return
+            if response.status_code == 429:
+                state["remaining"] = 0
+            credential.limits[endpoint] = state
+            observed = dict(state)
+        if self.state is not None:
+            self.state.update(credential.key, endpoint, observed)
+
+    def select(self, endpoint: str | None, priority: str = "normal") -> Credential | None:
+        """Returns the credential with the most remaining requests for an endpoint or None if every credential is exhausted for calls of the priority.
+
+        Credentials with equal remaining requests are selected in turn. The remaining requests of the selected credential are decremented in advance, so concurrent requests are spread, too.
+        With a shared state, the request is reserved in the store. If another process took the last request meanwhile, the next credential is selected.
+        """
+        while True:
+            if (self.state is not None) and (endpoint is not None):
+                self._refresh(endpoint)
+            now = time.time()
+            with self._lock:
+                # requests of an endpoint are left to waiting high-priority calls
+                if (priority != "high") and (self._waiting[endpoint] > 0):
+                    return None
+                size = len(self.credentials)
+                order = [self.credentials[(self._counter + idx) % size] for idx in range(size)]
+                self._counter += 1
+                credential = max(order, key=lambda item: self.available(item, endpoint, now, priority))
+                if self.available(credential, endpoint, now, priority) <= 0:
+                    return None
+                if endpoint in credential.limits and credential.limits[endpoint]["reset"] > now:
+                    credential.limits[endpoint]["remaining"] -= 1
+            if (self.state is None) or (endpoint is None) or self.state.reserve(credential.key, endpoint, now):
+                return credential
+
+    def reset_time(self, endpoint: str | None) -> float:
+        """Returns the Unix timestamp when the first credential can request an endpoint again."""
+        with self._lock:
+            return min((credential.limits[endpoint]["reset"] if endpoint in credential.limits else 0.0) for credential in self.credentials)
+
+    def call(self, key, func, *args, host: str = "api.twitter.com", **kwargs):
+        """Calls a function with the best credential and repeats rate limited calls with the other credentials.
+
+        Args:
+            key: Identifier of the called method. Its endpoint is learned from the first response.
+            func: Function that returns the callable of a credential.
+            host (str, optional): Host of the request for the retry policy. Defaults to "api.twitter.com".
+
+        Raises:
+            RateLimitError: If every credential is exhausted for calls of the current priority and the pool does not wait on rate limits.
+            DeadlineExceeded: If the deadline of the retry policy ends before the first credential is reset.
+
+        Returns:
+            Result of the call.
+        """
+        priority = self.current_priority()
+        waiting = None
+        try:
+            while True:
+                endpoint = self._endpoints.get(key)
+                credential = self.select(endpoint, priority)
+                if credential is None:
+                    if self.wait_on_rate_limit:
+                        sleep_time = self.reset_time(endpoint) - time.time() + 1
+                        remaining_time = self.retry.remaining_time()
+                        with self._served:
+                            # calls held back by waiting high-priority calls resume once these were served
+                            if (priority != "high") and (self._waiting[endpoint] > 0):
+                                if (remaining_time is not None) and (remaining_time <= 0):
+                                    raise DeadlineExceeded("Requests of {} are left to calls of higher priority until the deadline.".format(endpoint))
+                                self._served.wait_for(lambda: self._waiting[endpoint] <= 0, timeout=remaining_time)
+                                continue
+                        if (remaining_time is not None) and (sleep_time > remaining_time):
+                            raise DeadlineExceeded("Rate limit of {} is reset after the deadline.".format(endpoint))
+                        # calls of lower priority wait until this call was served
+                        if (priority == "high") and (waiting is None):
+                            waiting = endpoint
+                            self._count_waiting(waiting, 1)
+                        log.warning("Rate limit reached for all credentials. Sleeping for: {:.0f}".format(sleep_time))
+                        # the reset time may already have passed, e.g. if the limit of an endpoint is unknown
+                        time.sleep(max(1.0, sleep_time))
+                        continue
+                    # the remaining requests are left to calls of higher priority
+                    if any(item.remaining(endpoint, time.time()) > 0 for item in self.credentials):
+                        raise RateLimitError("Remaining requests of {} are left to calls of higher priority than '{}'.".format(endpoint, priority))
+                    # the API would reject the request, too
+                    raise RateLimitError("Rate limit of {} reached for all credentials. Reset in: {:.0f}".format(endpoint, max(0.0, self.reset_time(endpoint) - time.time())))
+                if waiting is not None:
+                    self._count_waiting(waiting, -1)
+                    waiting = None
+                self._local.endpoint = None
+                try:
+                    # rate limits are handled by switching credentials
+                    result = self.retry.call(host, func(credential), *args, retry_rate_limits=False, **kwargs)
+                except (tweepy.errors.TooManyRequests, RateLimitError):
+                    if self._local.endpoint is not None:
+                        self._endpoints[key] = self._local.endpoint
+                    continue
+                if self._local.endpoint is not None:
+                    self._endpoints[key] = self._local.endpoint
+                return result
+        finally:
+            if waiting is not None:
+                self._count_waiting(waiting, -1)
+
+    def _count_waiting(self, endpoint: str, count: int):
+        """Registers (count=1) or unregisters (count=-1) a high-priority call waiting for the reset of an endpoint."""
+        with self._lock:
+            self._waiting[endpoint] += count
+            if self._waiting[endpoint] <= 0:
+                del self._waiting[endpoint]
+                self._served.notify_all()
+
+    def request(self, method: str, url: str, payload: dict | None = None) -> requests.Response:
+        """Performs a manual request with the bearer token of the best credential.
+
+        Args:
+            method (str): Request method according to REST.
+            url (str): API URL including fields.
+            payload (dict | None, optional): JSON data for HTTP requests. Defaults to None.
+
+        Returns:
+            requests.Response: Response of the request.
+        """
+        key = ("manual", endpoint_of(url))
+        self._endpoints[key] = key[1]
+        call = functools.partial(self.call, key, lambda credential: credential.request, method, url, payload=payload, host=urlparse(url).netloc)
+        if method.upper() == "GET":
+            return self.flight.do(flight_key("manual", self.current_priority(), url), call)
+        return call()
+
+    def limits(self) -> List[Dict[str, dict]]:
+        """Returns the observed rate limit state of every credential with the endpoints as keys."""
+        with self._lock:
+            return [{endpoint: dict(state) for endpoint, state in credential.limits.items()} for credential in self.credentials]
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import functools
+import json
 import operator
 import re
 from datetime import datetime, timezone
 from numbers import Number
-from typing import Dict, List
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Tuple
 
 import numpy as np
 import tweepy
@@ -38,32 +41,58 @@ class BaseDataProcessor:
         """
         if not any(isinstance(value, Number) for value in data.values()):
             raise ValueError("Only numeric values are allowed.")
-        # extract numeric values by iterating over data dict with iterable items
-        numerics = list(data.values())
-        # init empty dict to store descriptive metrics
-        metrics = dict()
-        # calc max
-        metrics["max"] = max(numerics)
-        # calc min
-        metrics["min"] = min(numerics)
-        # calc mean
-        metrics["mean"] = np.array(numerics).mean()
-        # calc median
-        metrics["median"] = np.median(numerics)
-        # calc standard deviation
-        metrics["std"] = np.std(numerics)
-        # calc variance
-        metrics["var"] = np.var(numerics)
-        # calc range
-        metrics["range"] = max(numerics) - min(numerics)
-        # calc interquarile range
-        metrics["IQR"] = np.subtract(*np.percentile(numerics, [75, 25]))
-        # calc absolute mean deviation
-        metrics["mad"] = np.mean(np.absolute(numerics - np.mean(numerics)))
+        # compute all metrics in a single pass over a one-column matrix
+        metrics = self.calc_descriptive_metrics_matrix(np.array(list(data.values()))[:, np.newaxis])[0]
         # add metrics
         data["metrics"] = metrics
         return data
 
+    def calc_descriptive_metrics_matrix(self, matrix: np.ndarray | List[List[Number]], columns: List[str | int] | None = None) -> Dict[str | int, dict]:
+        """Calculates descriptive metrics for every column of an observations x variables matrix in one vectorized pass.
+
+        Args:
+            matrix (np.ndarray | List[List[Number]]): Numeric matrix, e.g. users x metrics. Each column is treated as one data set.
+            columns (List[str | int] | None, optional): Identifiers of the columns. Defaults to None, thus, column indices are used.
+
+        Raises:
+            ValueError: If the matrix is not two-dimensional, is empty, or contains non-numeric values.
+            ValueError: If the number of column identifiers does not match the number of columns.
+
+        Returns:
+            Dict[str | int, dict]: Descriptive metrics for each column. Metrics are the same as in calc_descriptive_metrics.
+        """
+        values = np.asarray(matrix)
+        if (values.ndim != 2) or (values.size == 0):
+            raise ValueError("'matrix' must be a non-empty two-dimensional array.")
+        if not (np.issubdtype(values.dtype, np.number) or np.issubdtype(values.dtype, np.bool_)):
+            raise ValueError("Only numeric values are allowed.")
+        if columns is None:
+            columns = list(range(values.shape[1]))
+        elif len(columns) != values.shape[1]:
+            raise ValueError("Got {} column identifiers for {} columns.".format(len(columns), values.shape[1]))
+        # extrema are converted to Python numbers in order to keep them JSON serializable
+        max_values, min_values = values.max(axis=0), values.min(axis=0)
+        ranges = (max_values - min_values).tolist()
+        mean = values.mean(axis=0)
+        var = values.var(axis=0)
+        # compute all quantiles with one partition of the matrix
+        upper_quartile, median, lower_quartile = np.percentile(values, [75, 50, 25], axis=0)
+        mad = np.absolute(values - mean).mean(axis=0)
+        metrics = dict()
+        for idx, column in enumerate(columns):
+            metrics[column] = {
+                "max": max_values[idx].item(),
+                "min": min_values[idx].item(),
+                "mean": mean[idx],
+                "median": median[idx],
+                "std": np.sqrt(var[idx]),
+                "var": var[idx],
+                "range": ranges[idx],
+                "IQR": upper_quartile[idx] - lower_quartile[idx],
+                "mad": mad[idx],
+            }
+        return metrics
+
     def calc_datetime_metrics(self, dates: Dict[str, datetime]) -> dict():
         """Calculates descriptive metrics on datetime objects.
 
@@ -119,29 +148,59 @@ class BaseDataProcessor:
         dates["metrics"]["min"] = min_date.isoformat()
         return dates
 
-    def intersection(self, iterable: List[set]) -> list:
+    def intersection(self, iterable: List["set | np.ndarray | IDSet"]) -> list:
         """Calculates the intersection of multiple sets.
 
+        If all collections are sorted NumPy arrays (e.g., memory maps from pysna.store.IDStore), the intersection is computed directly on the array buffers.
+        If all collections are compressed ID sets, the intersection is computed on their containers.
+
         Args:
-            iterable (List[set]): List containing sets.
+            iterable (List[set | np.ndarray | IDSet]): List containing sets, sorted, duplicate-free arrays, or compressed ID sets.
 
         Returns:
             list: intersection set casted to list.
         """
+        iterable = list(iterable)
+        # compressed ID sets are intersected chunk by chunk, starting with the smallest set
+        if iterable and all(isinstance(values, IDSet) for values in iterable):
+            arrays = sorted(iterable, key=len)
+            return arrays[0].intersection(*arrays[1:]).to_list()
+        if iterable and all(isinstance(values, np.ndarray) for values in iterable):
+            # start with the smallest array to keep intermediate results small
+            arrays = sorted(iterable, key=len)
+            intersection = arrays[0]
+            for values in arrays[1:]:
+                intersection = np.intersect1d(intersection, values, assume_unique=True)
+            return intersection.tolist()
         intersection = set.intersection(*map(set, iterable))
         return list(intersection)
 
-    def difference(self, sets: Dict[int | str, set]) -> dict:
+    def difference(self, sets: Dict[int | str, "set | np.ndarray | IDSet"]) -> dict:
         """Calculates the difference of multiple sets.
 
+        If all collections are sorted NumPy arrays (e.g., memory maps from pysna.store.IDStore), the differences are computed directly on the array buffers.
+        If all collections are compressed ID sets, the differences are computed on their containers.
+
         Args:
-            sets (Dict[set]): Dictionary containing sets where keys are identifiers.
+            sets (Dict[set | np.ndarray | IDSet]): Dictionary containing sets, sorted, duplicate-free arrays, or compressed ID sets where keys are identifiers.
 
         Returns:
             dict: Individual difference of each set that was provided.
         """
         # init empty dict to store individual differences for each set
         differences = dict()
+        if sets and all(isinstance(values, IDSet) for values in sets.values()):
+            for key, values in sets.items():
+                differences[key] = values.difference(*[other_values for other_key, other_values in sets.items() if other_key != key]).to_list()
+            return differences
+        if sets and all(isinstance(values, np.ndarray) for values in sets.values()):
+            for key, values in sets.items():
+                # IDs of every other collection
+                others = [other_values for other_key, other_values in sets.items() if other_key != key]
+                if others:
+                    values = values[~np.isin(values, np.concatenate(others))]
+                differences[key] = values.tolist()
+            return differences
         for key, values in sets.items():
             differences[key] = list(set(values))
             for other_key, other_values in sets.items():
@@ -149,10 +208,59 @@ class BaseDataProcessor:
                     differences[key] = list(set(differences[key]) - set(other_values))
         return differences
 
+    def estimate_overlap(self, samples: Dict[str | int, set], totals: Dict[str | int, int]) -> dict:
+        """Estimates the size of the intersection and the Jaccard similarity of multiple sets from bounded samples of them.
+
+        The intersection of the samples is scaled by the inverse of their joint sampling rate (len(sample) / total per set). The union is a Horvitz-Thompson estimate over the sampled items, each weighted by the inverse probability of being sampled in at least one of the sets it was observed in.
+        Samples of the first pages of the API are the most recent items, not random ones. Thus, the estimates are point estimates without error bounds and biased if the overlap of recent items differs from the overlap of older ones.
+
+        Args:
+            samples (Dict[str | int, set]): Samples of each set with identifiers as keys.
+            totals (Dict[str | int, int]): Total size of each set with the same identifiers as keys.
+
+        Raises:
+            ValueError: If less than two samples were provided or the identifiers of samples and totals differ.
+
+        Returns:
+            dict: Estimated intersection size and Jaccard similarity, the commonly sampled items, and the sampling rates.
+        """
+        if len(samples) < 2:
+            raise ValueError("At least two samples are required.")
+        if set(samples.keys()) != set(totals.keys()):
+            raise ValueError("'samples' and 'totals' must have the same keys.")
+        keys = list(samples.keys())
+        sample_arrays = {key: np.unique(np.fromiter(samples[key], dtype=np.int64)) for key in keys}
+        # totals cannot be smaller than the samples, e.g. due to outdated counts
+        sizes = {key: max(totals[key], sample_arrays[key].size) for key in keys}
+        rates = {key: (sample_arrays[key].size / sizes[key]) if sizes[key] > 0 else 1.0 for key in keys}
+        common = functools.reduce(np.intersect1d, sample_arrays.values())
+        joint_rate = float(np.prod([rates[key] for key in keys]))
+        intersection = min(common.size / joint_rate if common.size else 0.0, min(sizes.values()))
+        # probability of every sampled item to be missed by all samples it was observed in
+        items = np.concatenate(list(sample_arrays.values()))
+        with np.errstate(divide="ignore"):
+            log_misses = np.concatenate([np.full(sample_arrays[key].size, np.log1p(-rates[key])) for key in keys])
+        distinct, inverse = np.unique(items, return_inverse=True)
+        log_missed = np.zeros(distinct.size)
+        np.add.at(log_missed, inverse, log_misses)
+        union = float(np.sum(1.0 / (1.0 - np.exp(log_missed)))) if distinct.size else 0.0
+        union = float(np.clip(union, max(max(sizes.values()), intersection), sum(sizes.values())))
+        return {
+            "common_count": {"estimate": intersection},
+            "jaccard": {"estimate": intersection / union if union > 0 else 0.0},
+            "sampled_common": common.tolist(),
+            "sampling_rates": rates,
+            "exact": joint_rate == 1.0,
+        }
+
 
 class TwitterDataProcessor(BaseDataProcessor):
     """Component class in order to process Twitter data."""
 
+    # removes mentions, special characters, and links
+    CLEANING_PATTERN = re.compile(r"(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)")
+    _analyzer = None
+
     def extract_followers(self, user_object: tweepy.User) -> Dict[str, str | int]:
         """Extract IDs, names, and screen names from a user's followers.
 
@@ -197,7 +305,23 @@ class TwitterDataProcessor(BaseDataProcessor):
         Returns:
             str: Cleaned Tweet
         """
-        return " ".join(re.sub(r"(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)", " ", tweet).split())
+        return " ".join(self.CLEANING_PATTERN.sub(" ", tweet).split())
+
+    @property
+    def analyzer(self) -> SentimentIntensityAnalyzer:
+        """VADER sentiment analyzer shared by all instances, since loading the lexicon is expensive."""
+        if TwitterDataProcessor._analyzer is None:
+            TwitterDataProcessor._analyzer = SentimentIntensityAnalyzer()
+        return TwitterDataProcessor._analyzer
+
+    @staticmethod
+    def _sentiment_label(compound: float) -> str:
+        """Returns the sentiment label of a compound polarity score."""
+        if compound >= 0.05:
+            return "positive"
+        elif compound <= -0.05:
+            return "negative"
+        return "neutral"
 
     def detect_tweet_sentiment(self, tweet: str) -> dict:
         """Utility function to classify sentiment of passed tweet using vader sentiment analyzer. English Tweets only.
@@ -208,19 +332,69 @@ class TwitterDataProcessor(BaseDataProcessor):
         Returns:
             str: the sentiment of the Tweet (either positive, neutral, or negative) and the polarity scores.
         """
-        # create VADER instance
-        analyser = SentimentIntensityAnalyzer()
         # get polarity scores from cleaned tweet
-        polarity_scores = analyser.polarity_scores(self.clean_tweet(tweet))
-        # define label
-        if polarity_scores["compound"] >= 0.05:
-            label = "positive"
-        elif polarity_scores["compound"] <= -0.05:
-            label = "negative"
-        else:
-            label = "neutral"
+        polarity_scores = self.analyzer.polarity_scores(self.clean_tweet(tweet))
         # return label and polarity scores
-        return {"label": label, "polarity_scores": polarity_scores}
+        return {"label": self._sentiment_label(polarity_scores["compound"]), "polarity_scores": polarity_scores}
+
+    def detect_tweets_sentiment(self, tweets: Iterable[str]) -> List[dict]:
+        """Classifies the sentiment of many tweets with a single analyzer. English Tweets only.
+
+        Args:
+            tweets (Iterable[str]): The raw texts of the Tweets.
+
+        Returns:
+            List[dict]: Label and polarity scores of every Tweet, in input order.
+        """
+        polarity_scores = [self.analyzer.polarity_scores(self.clean_tweet(tweet)) for tweet in tweets]
+        return [{"label": self._sentiment_label(scores["compound"]), "polarity_scores": scores} for scores in polarity_scores]
+
+    def calc_sentiment_profile(self, tweets: List[dict], frequency: str = "week", cache: Dict[int, dict] | None = None) -> dict:
+        """Calculates the sentiment distribution and a time-binned sentiment series of many tweets.
+
+        All tweets that are not in the cache are scored in one batched pass and added to the cache afterwards, so profiling the same tweets again only scores new ones.
+
+        Args:
+            tweets (List[dict]): Twitter API v2 tweet objects with 'id', 'text', and 'created_at' fields.
+            frequency (str, optional): Bin size of the series. Must be from: day, week, month. Weeks start on Monday. Defaults to "week".
+            cache (Dict[int, dict] | None, optional): Sentiment labels and compound scores with tweet IDs as keys. Updated in place. Defaults to None.
+
+        Raises:
+            ValueError: If frequency is invalid.
+
+        Returns:
+            dict: Number of tweets, distribution of sentiment labels, descriptive metrics of the compound scores, and the series with the start date of every bin as keys.
+        """
+        if frequency not in ("day", "week", "month"):
+            raise ValueError("Invalid frequency '{}'. Must be one of ['day', 'week', 'month'].".format(frequency))
+        cache = dict() if cache is None else cache
+        # score uncached tweets at once
+        uncached = [tweet for tweet in tweets if int(tweet["id"]) not in cache]
+        for tweet, sentiment in zip(uncached, self.detect_tweets_sentiment([tweet["text"] for tweet in uncached])):
+            cache[int(tweet["id"])] = {"label": sentiment["label"], "compound": sentiment["polarity_scores"]["compound"]}
+        labels = ("positive", "neutral", "negative")
+        profile = {"tweets": len(tweets), "distribution": {label: 0 for label in labels}, "compound": None, "series": dict()}
+        if not tweets:
+            return profile
+        sentiments = [cache[int(tweet["id"])] for tweet in tweets]
+        compound = np.array([sentiment["compound"] for sentiment in sentiments])
+        label_codes = np.array([labels.index(sentiment["label"]) for sentiment in sentiments])
+        profile["distribution"] = dict(zip(labels, np.bincount(label_codes, minlength=3).tolist()))
+        profile["compound"] = self.calc_descriptive_metrics_matrix(compound[:, np.newaxis], columns=["compound"])["compound"]
+        # bin tweets by their creation date
+        days = np.array([tweet["created_at"].replace("Z", "") for tweet in tweets], dtype="datetime64[s]").astype("datetime64[D]")
+        if frequency == "week":
+            # 1970-01-01 was a Thursday
+            days = days - (days.astype(np.int64) + 3) % 7
+        elif frequency == "month":
+            days = days.astype("datetime64[M]").astype("datetime64[D]")
+        bins, inverse, counts = np.unique(days, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=compound, minlength=bins.size)
+        label_counts = np.zeros((bins.size, 3), dtype=np.int64)
+        np.add.at(label_counts, (inverse, label_codes), 1)
+        for idx, day in enumerate(bins.astype(str).tolist()):
+            profile["series"][day] = {"count": int(counts[idx]), "mean_compound": float(sums[idx] / counts[idx]), **dict(zip(labels, label_counts[idx].tolist()))}
+        return profile
 
     def calc_similarity(self, user_objs: List[dict] | None = None, tweet_metrics: List[Dict[int, dict]] | None = None, *, features: List[str]) -> dict:
         """Calculates the euclidean distance of users/tweets based on a feature vector. Either user objects or Tweet objects must be specified, not both.
@@ -279,3 +453,703 @@ class TwitterDataProcessor(BaseDataProcessor):
         # sort dict in ascendin order
         sorted_values = dict(sorted(distances.items(), key=operator.itemgetter(1)))
         return sorted_values
+
+
+class StreamingDescriptiveMetrics:
+    """Incremental descriptive metrics for data sets that are too large to be held in memory.
+
+    Count, extrema, mean and variance are exact (Welford/Chan updates). Quantiles, the median, the IQR, and the mean absolute deviation are approximated from a uniform reservoir sample of fixed size.
+    """
+
+    def __init__(self, columns: List[str | int], sample_size: int = 10000, seed: int | None = None):
+        if sample_size < 1:
+            raise ValueError("'sample_size' must be positive.")
+        self.columns = list(columns)
+        self.sample_size = sample_size
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+        n_columns = len(self.columns)
+        self._mean = np.zeros(n_columns)
+        self._m2 = np.zeros(n_columns)
+        self._max = np.full(n_columns, -np.inf)
+        self._min = np.full(n_columns, np.inf)
+        self._reservoir = np.empty((sample_size, n_columns))
+
+    def update(self, rows: np.ndarray | List[List[Number]] | List[Number]):
+        """Adds a batch of observations.
+
+        Args:
+            rows (np.ndarray | List[List[Number]] | List[Number]): Either a single observation or a matrix of observations with one column per metric.
+
+        Raises:
+            ValueError: If the number of columns does not match.
+        """
+        batch = np.atleast_2d(np.asarray(rows, dtype=float))
+        if batch.shape[1] != len(self.columns):
+            raise ValueError("Expected {} columns, got {}.".format(len(self.columns), batch.shape[1]))
+        n_batch = batch.shape[0]
+        if n_batch == 0:
+            return
+        # merge batch moments into running moments (Chan et al.)
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n_batch
+        delta = batch_mean - self._mean
+        self._mean = self._mean + delta * n_batch / total
+        self._m2 = self._m2 + batch_m2 + delta**2 * self.count * n_batch / total
+        self._max = np.maximum(self._max, batch.max(axis=0))
+        self._min = np.minimum(self._min, batch.min(axis=0))
+        self._update_reservoir(batch)
+        self.count = total
+
+    def _update_reservoir(self, batch: np.ndarray):
+        """Vectorized reservoir sampling (Algorithm R) over a batch of observations."""
+        # fill free reservoir slots first
+        n_free = max(self.sample_size - self.count, 0)
+        n_fill = min(n_free, batch.shape[0])
+        self._reservoir[self.count : self.count + n_fill] = batch[:n_fill]
+        rest = batch[n_fill:]
+        if rest.shape[0] == 0:
+            return
+        # the i-th observation of the stream replaces a random slot with probability sample_size / (i + 1)
+        positions = np.arange(self.count + n_fill, self.count + batch.shape[0])
+        slots = self._rng.integers(0, positions + 1)
+        hits = np.flatnonzero(slots < self.sample_size)
+        # if several observations hit the same slot, the latest one wins
+        _, last = np.unique(slots[hits][::-1], return_index=True)
+        hits = hits[::-1][last]
+        self._reservoir[slots[hits]] = rest[hits]
+
+    def metrics(self) -> Dict[str | int, dict]:
+        """Returns the current descriptive metrics for every column.
+
+        Raises:
+            ValueError: If no observations were added yet.
+
+        Returns:
+            Dict[str | int, dict]: Descriptive metrics for each column. Same keys as calc_descriptive_metrics.
+        """
+        if self.count == 0:
+            raise ValueError("No observations were added yet.")
+        sample = self._reservoir[: min(self.count, self.sample_size)]
+        var = self._m2 / self.count
+        upper_quartile, median, lower_quartile = np.percentile(sample, [75, 50, 25], axis=0)
+        mad = np.absolute(sample - self._mean).mean(axis=0)
+        metrics = dict()
+        for idx, column in enumerate(self.columns):
+            metrics[column] = {
+                "max": self._max[idx],
+                "min": self._min[idx],
+                "mean": self._mean[idx],
+                "median": median[idx],
+                "std": np.sqrt(var[idx]),
+                "var": var[idx],
+                "range": self._max[idx] - self._min[idx],
+                "IQR": upper_quartile[idx] - lower_quartile[idx],
+                "mad": mad[idx],
+            }
+        return metrics
+
+
+class IDSet:
+    """Compressed set of non-negative 64-bit IDs in the style of roaring bitmaps.
+
+    The ID space is split into chunks of 2^16 consecutive IDs. Sparse chunks are stored as sorted uint16 arrays, dense chunks (more than 4096 IDs) as packed bitmaps of 8 KiB.
+    Supports fast union, intersection, difference, and cardinality. Large Twitter ID collections typically need only a fraction of the memory of a Python set.
+    """
+
+    # chunks with more IDs than this limit are stored as bitmaps
+    ARRAY_LIMIT = 4096
+    CHUNK_BITS = 16
+    # number of ones for every byte value
+    _POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+    def __init__(self, ids: Iterable[int] | np.ndarray | None = None):
+        # maps the high bits of IDs to a container for the low 16 bits
+        self._containers = dict()
+        if ids is not None:
+            self.update(ids)
+
+    @classmethod
+    def _from_containers(cls, containers: Dict[int, np.ndarray]) -> "IDSet":
+        """Creates an ID set from existing containers without copying them."""
+        id_set = cls()
+        id_set._containers = containers
+        return id_set
+
+    @classmethod
+    def _normalize(cls, values: np.ndarray) -> np.ndarray | None:
+        """Chooses the container type for sorted low bits. Returns None for empty containers."""
+        if values.size == 0:
+            return None
+        if values.size <= cls.ARRAY_LIMIT:
+            return values.astype(np.uint16, copy=False)
+        dense = np.zeros(1 << cls.CHUNK_BITS, dtype=bool)
+        dense[values] = True
+        return np.packbits(dense, bitorder="little")
+
+    @staticmethod
+    def _is_bitmap(container: np.ndarray) -> bool:
+        """Bitmap containers are packed uint8 arrays, array containers are uint16 arrays."""
+        return container.dtype == np.uint8
+
+    @staticmethod
+    def _values(container: np.ndarray) -> np.ndarray:
+        """Returns the sorted low bits of a container."""
+        if IDSet._is_bitmap(container):
+            return np.flatnonzero(np.unpackbits(container, bitorder="little")).astype(np.uint16)
+        return container
+
+    @classmethod
+    def _cardinality(cls, container: np.ndarray) -> int:
+        """Returns the number of IDs in a container."""
+        if cls._is_bitmap(container):
+            return int(cls._POPCOUNT[container].sum())
+        return int(container.size)
+
+    @classmethod
+    def _combine(cls, left: np.ndarray, right: np.ndarray, operation: str) -> np.ndarray | None:
+        """Combines two containers of the same chunk.
+
+        Args:
+            left (np.ndarray): Left container.
+            right (np.ndarray): Right container.
+            operation (str): One of 'or', 'and', 'andnot'.
+
+        Returns:
+            np.ndarray | None: Resulting container or None if empty.
+        """
+        # bitmap with bitmap: word-wise operations on packed bits
+        if cls._is_bitmap(left) and cls._is_bitmap(right):
+            if operation == "or":
+                return np.bitwise_or(left, right)
+            bits = np.bitwise_and(left, right) if operation == "and" else np.bitwise_and(left, np.invert(right))
+            return cls._normalize(np.flatnonzero(np.unpackbits(bits, bitorder="little")))
+        # array with bitmap: look up array values in the unpacked bitmap
+        if cls._is_bitmap(left) != cls._is_bitmap(right) and operation != "or":
+            if cls._is_bitmap(left):
+                if operation == "and":
+                    left, right = right, left
+                else:
+                    # remove array values from the bitmap
+                    dense = np.unpackbits(left, bitorder="little").astype(bool)
+                    dense[right] = False
+                    return cls._normalize(np.flatnonzero(dense))
+            dense = np.unpackbits(right, bitorder="little").astype(bool)
+            mask = dense[left] if operation == "and" else ~dense[left]
+            return cls._normalize(left[mask])
+        # array with array, or union with a bitmap
+        left_values, right_values = cls._values(left), cls._values(right)
+        if operation == "or":
+            return cls._normalize(np.union1d(left_values, right_values))
+        if operation == "and":
+            return cls._normalize(np.intersect1d(left_values, right_values, assume_unique=True))
+        return cls._normalize(np.setdiff1d(left_values, right_values, assume_unique=True))
+
+    def update(self, ids: Iterable[int] | np.ndarray):
+        """Adds IDs to the set.
+
+        Args:
+            ids (Iterable[int] | np.ndarray): IDs to be added.
+
+        Raises:
+            ValueError: If negative IDs were provided.
+        """
+        if isinstance(ids, IDSet):
+            self._containers = (self | ids)._containers
+            return
+        values = ids if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        if values.size == 0:
+            return
+        if np.issubdtype(values.dtype, np.signedinteger) and (values.min() < 0):
+            raise ValueError("Only non-negative IDs are supported.")
+        values = np.unique(values.astype(np.uint64, copy=False))
+        high = values >> np.uint64(self.CHUNK_BITS)
+        low = (values & np.uint64((1 << self.CHUNK_BITS) - 1)).astype(np.uint16)
+        # split sorted values into chunks
+        keys, starts = np.unique(high, return_index=True)
+        ends = np.append(starts[1:], values.size)
+        for key, start, end in zip(keys.tolist(), starts.tolist(), ends.tolist()):
+            container = self._normalize(low[start:end])
+            if key in self._containers:
+                container = self._combine(self._containers[key], container, "or")
+            self._containers[key] = container
+
+    def _apply(self, other: "IDSet", operation: str) -> "IDSet":
+        """Applies a set operation chunk by chunk."""
+        if not isinstance(other, IDSet):
+            other = IDSet(other)
+        containers = dict()
+        if operation == "or":
+            keys = self._containers.keys() | other._containers.keys()
+        elif operation == "and":
+            keys = self._containers.keys() & other._containers.keys()
+        else:
+            keys = self._containers.keys()
+        for key in keys:
+            if key not in other._containers:
+                containers[key] = self._containers[key]
+            elif key not in self._containers:
+                containers[key] = other._containers[key]
+            else:
+                container = self._combine(self._containers[key], other._containers[key], operation)
+                if container is not None:
+                    containers[key] = container
+        return IDSet._from_containers(containers)
+
+    def union(self, *others: "IDSet") -> "IDSet":
+        """Returns the union with one or more other ID sets."""
+        result = self
+        for other in others:
+            result = result._apply(other, "or")
+        return result
+
+    def intersection(self, *others: "IDSet") -> "IDSet":
+        """Returns the intersection with one or more other ID sets."""
+        result = self
+        for other in others:
+            result = result._apply(other, "and")
+        return result
+
+    def difference(self, *others: "IDSet") -> "IDSet":
+        """Returns the difference with one or more other ID sets."""
+        result = self
+        for other in others:
+            result = result._apply(other, "andnot")
+        return result
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def to_array(self) -> np.ndarray:
+        """Returns all IDs as sorted int64 array.
+
+        Returns:
+            np.ndarray: Sorted IDs.
+        """
+        if not self._containers:
+            return np.empty(0, dtype=np.int64)
+        chunks = [(np.uint64(key) << np.uint64(self.CHUNK_BITS)) | self._values(self._containers[key]).astype(np.uint64) for key in sorted(self._containers)]
+        return np.concatenate(chunks).astype(np.int64)
+
+    def to_list(self) -> List[int]:
+        """Returns all IDs as sorted list of Python integers."""
+        return self.to_array().tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the containers."""
+        return sum(container.nbytes for container in self._containers.values())
+
+    def __len__(self) -> int:
+        return sum(self._cardinality(container) for container in self._containers.values())
+
+    def __contains__(self, value: int) -> bool:
+        if value < 0:
+            return False
+        container = self._containers.get(value >> self.CHUNK_BITS)
+        if container is None:
+            return False
+        low = value & ((1 << self.CHUNK_BITS) - 1)
+        if self._is_bitmap(container):
+            return bool((container[low >> 3] >> (low & 7)) & 1)
+        position = np.searchsorted(container, low)
+        return bool((position < container.size) and (container[position] == low))
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, IDSet):
+            return np.array_equal(self.to_array(), other.to_array())
+        if isinstance(other, (set, frozenset)):
+            return set(self.to_list()) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "IDSet(size={}, chunks={}, nbytes={})".format(len(self), len(self._containers), self.nbytes)
+
+
+class SketchIndex:
+    """Index of MinHash signatures and HyperLogLog cardinality sketches of ID collections (e.g., the followers of many accounts).
+
+    Sketches have a fixed size per collection, can be updated incrementally with newly synced IDs, and allow to estimate the Jaccard similarity and overlap of all pairs of collections at once.
+    """
+
+    # IDs are hashed in chunks to bound the memory of the IDs x permutations hash matrix
+    CHUNK_SIZE = 8192
+    _MAX_HASH = np.iinfo(np.uint64).max
+
+    def __init__(self, num_perm: int = 128, hll_precision: int = 12, seed: int = 0):
+        if not 4 <= hll_precision <= 18:
+            raise ValueError("'hll_precision' must be between 4 and 18.")
+        self.num_perm = num_perm
+        self.hll_precision = hll_precision
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # one seed per MinHash permutation and one seed for HyperLogLog
+        self._perm_seeds = rng.integers(0, self._MAX_HASH, size=num_perm, dtype=np.uint64, endpoint=True)
+        self._hll_seed = rng.integers(0, self._MAX_HASH, dtype=np.uint64, endpoint=True)
+        self.keys = list()
+        self._positions = dict()
+        self.signatures = np.empty((0, num_perm), dtype=np.uint64)
+        self.registers = np.empty((0, 1 << hll_precision), dtype=np.uint8)
+
+    @staticmethod
+    def _hash(values: np.ndarray) -> np.ndarray:
+        """SplitMix64 finalizer as vectorized 64-bit hash function."""
+        with np.errstate(over="ignore"):
+            values = values.astype(np.uint64, copy=True)
+            values ^= values >> np.uint64(30)
+            values *= np.uint64(0xBF58476D1CE4E5B9)
+            values ^= values >> np.uint64(27)
+            values *= np.uint64(0x94D049BB133111EB)
+            values ^= values >> np.uint64(31)
+        return values
+
+    @staticmethod
+    def _bit_length(values: np.ndarray) -> np.ndarray:
+        """Number of significant bits of unsigned 64-bit integers."""
+        values = values.copy()
+        lengths = np.zeros(values.shape, dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            mask = values >= np.uint64(1 << shift)
+            lengths[mask] += shift
+            values[mask] >>= np.uint64(shift)
+        lengths += (values > 0).astype(np.uint8)
+        return lengths
+
+    def _position(self, key: str | int) -> int:
+        """Returns the row of a collection, adding empty sketches for unknown keys."""
+        if key not in self._positions:
+            self._positions[key] = len(self.keys)
+            self.keys.append(key)
+            self.signatures = np.vstack([self.signatures, np.full((1, self.num_perm), self._MAX_HASH, dtype=np.uint64)])
+            self.registers = np.vstack([self.registers, np.zeros((1, 1 << self.hll_precision), dtype=np.uint8)])
+        return self._positions[key]
+
+    def update(self, key: str | int, ids: Iterable[int] | np.ndarray):
+        """Adds IDs to the sketches of a collection, e.g. a page of newly synced follower IDs.
+
+        Args:
+            key (str | int): Collection identifier, e.g. a user ID.
+            ids (Iterable[int] | np.ndarray): IDs to be added.
+        """
+        position = self._position(key)
+        values = ids if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        values = np.unique(values.astype(np.uint64, copy=False))
+        if values.size == 0:
+            return
+        for chunk in np.array_split(values, -(-values.size // self.CHUNK_SIZE)):
+            # MinHash: minimum of every permutation
+            hashes = self._hash(chunk[:, np.newaxis] ^ self._perm_seeds[np.newaxis, :])
+            self.signatures[position] = np.minimum(self.signatures[position], hashes.min(axis=0))
+            # HyperLogLog: the first bits select the register, the rank of the first set bit of the rest is stored
+            hashes = self._hash(chunk ^ self._hll_seed)
+            index = (hashes >> np.uint64(64 - self.hll_precision)).astype(np.int64)
+            rest = hashes & np.uint64((1 << (64 - self.hll_precision)) - 1)
+            rank = (64 - self.hll_precision) - self._bit_length(rest).astype(np.int64) + 1
+            np.maximum.at(self.registers[position], index, rank.astype(np.uint8))
+
+    def cardinalities(self) -> np.ndarray:
+        """Estimates the number of distinct IDs of every collection from its HyperLogLog sketch.
+
+        Returns:
+            np.ndarray: Estimated cardinalities in the order of 'keys'.
+        """
+        return self._estimate_cardinalities(self.registers)
+
+    def _estimate_cardinalities(self, registers: np.ndarray) -> np.ndarray:
+        """Estimates the cardinalities of rows of HyperLogLog registers."""
+        m = 1 << self.hll_precision
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m**2 / np.sum(np.power(2.0, -registers.astype(np.float64)), axis=1)
+        zeros = np.count_nonzero(registers == 0, axis=1)
+        # linear counting for small cardinalities
+        with np.errstate(divide="ignore"):
+            linear = m * np.log(m / np.maximum(zeros, 1))
+        return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+    def cardinality(self, key: str | int) -> float:
+        """Estimates the number of distinct IDs of a collection."""
+        return float(self.cardinalities()[self._positions[key]])
+
+    def jaccard_matrix(self) -> np.ndarray:
+        """Estimates the Jaccard similarity of every pair of collections from their MinHash signatures.
+
+        Returns:
+            np.ndarray: Symmetric n x n matrix in the order of 'keys'.
+        """
+        n = len(self.keys)
+        matrix = np.empty((n, n), dtype=np.float64)
+        # compare signatures in row blocks to bound memory
+        block = max(1, (1 << 24) // max(n * self.num_perm, 1))
+        for rows in np.array_split(np.arange(n), max(1, -(-n // block))):
+            matrix[rows] = (self.signatures[rows, np.newaxis, :] == self.signatures[np.newaxis, :, :]).mean(axis=2)
+        # empty collections do not overlap with anything
+        empty = np.all(self.signatures == self._MAX_HASH, axis=1)
+        matrix[empty, :] = 0.0
+        matrix[:, empty] = 0.0
+        return matrix
+
+    def overlap_matrix(self) -> np.ndarray:
+        """Estimates the number of common IDs of every pair of collections.
+
+        Uses |A ∩ B| = J / (1 + J) * (|A| + |B|) with MinHash Jaccard estimates J and HyperLogLog cardinalities.
+
+        Returns:
+            np.ndarray: Symmetric n x n matrix in the order of 'keys'.
+        """
+        jaccard = self.jaccard_matrix()
+        cardinalities = self.cardinalities()
+        return jaccard / (1 + jaccard) * (cardinalities[:, np.newaxis] + cardinalities[np.newaxis, :])
+
+    def estimate_overlap(self, keys: List[str | int] | None = None, confidence: float = 0.95) -> dict:
+        """Estimates the number of common IDs and the Jaccard similarity of two or more collections with confidence intervals.
+
+        The MinHash signatures of all collections agree in a permutation with probability J = |A ∩ B ∩ ...| / |A ∪ B ∪ ...|. Thus, the number of agreeing permutations is binomially distributed and its Wilson score interval is a confidence interval of J.
+        The union is estimated from the merged HyperLogLog registers with a relative standard error of 1.04 / sqrt(2 ** hll_precision). The interval of the common count J * |A ∪ B ∪ ...| combines both intervals, each at half the error rate.
+
+        Args:
+            keys (List[str | int] | None, optional): Collection identifiers. Defaults to None, thus, all collections of the index.
+            confidence (float, optional): Confidence level of the intervals. Defaults to 0.95.
+
+        Raises:
+            ValueError: If less than two collections were provided or 'confidence' is not between 0 and 1.
+            KeyError: If a collection is not part of the index.
+
+        Returns:
+            dict: Estimated number of common IDs and Jaccard similarity with lower and upper bounds, the estimated union size, and the confidence level.
+        """
+        keys = self.keys if keys is None else keys
+        if len(keys) < 2:
+            raise ValueError("At least two collections are required.")
+        if not 0 < confidence < 1:
+            raise ValueError("'confidence' must be between 0 and 1.")
+        positions = [self._positions[key] for key in keys]
+        signatures = self.signatures[positions]
+        union = float(self._estimate_cardinalities(self.registers[positions].max(axis=0)[np.newaxis, :])[0])
+        smallest = float(self.cardinalities()[positions].min())
+        # empty collections do not overlap with anything
+        if np.any(np.all(signatures == self._MAX_HASH, axis=1)):
+            zero = {"estimate": 0.0, "lower": 0.0, "upper": 0.0}
+            return {"common_count": dict(zero), "jaccard": dict(zero), "union": union, "confidence": confidence}
+
+        def wilson(matches: int, level: float) -> Tuple[float, float]:
+            z = NormalDist().inv_cdf((1 + level) / 2)
+            center = (matches + z**2 / 2) / (self.num_perm + z**2)
+            spread = z * np.sqrt(matches * (1 - matches / self.num_perm) + z**2 / 4) / (self.num_perm + z**2)
+            return max(0.0, center - spread), min(1.0, center + spread)
+
+        matches = int(np.count_nonzero(np.all(signatures == signatures[0], axis=0)))
+        jaccard = matches / self.num_perm
+        jaccard_lower, jaccard_upper = wilson(matches, confidence)
+        # Bonferroni: both intervals at half the error rate cover jointly with at least the requested confidence
+        level = 1 - (1 - confidence) / 2
+        count_lower, count_upper = wilson(matches, level)
+        relative_error = NormalDist().inv_cdf((1 + level) / 2) * 1.04 / np.sqrt(1 << self.hll_precision)
+        return {
+            "common_count": {
+                "estimate": min(jaccard * union, smallest),
+                "lower": count_lower * union * max(0.0, 1 - relative_error),
+                "upper": min(count_upper * union * (1 + relative_error), smallest * (1 + relative_error)),
+            },
+            "jaccard": {"estimate": jaccard, "lower": jaccard_lower, "upper": jaccard_upper},
+            "union": union,
+            "confidence": confidence,
+        }
+
+    def save(self, path: str):
+        """Stores the index in a compressed NumPy archive.
+
+        Args:
+            path (str): File path, should end with '.npz'.
+        """
+        np.savez_compressed(
+            path,
+            keys=np.array(json.dumps(self.keys)),
+            params=np.array([self.num_perm, self.hll_precision, self.seed]),
+            signatures=self.signatures,
+            registers=self.registers,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SketchIndex":
+        """Loads an index stored with 'save'.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            SketchIndex: Loaded index.
+        """
+        with np.load(path) as archive:
+            num_perm, hll_precision, seed = archive["params"].tolist()
+            index = cls(num_perm=num_perm, hll_precision=hll_precision, seed=seed)
+            index.keys = json.loads(archive["keys"].item())
+            index.signatures = archive["signatures"]
+            index.registers = archive["registers"]
+        index._positions = {key: position for position, key in enumerate(index.keys)}
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class EntityCooccurrence:
+    """Incremental frequency and co-occurrence counts of the entities of tweets.
+
+    Hashtags, mentions, URLs, context annotation domains, and context annotation entities (topics) are extracted from Twitter API v2 tweet objects and identified by labels of the form '<kind>:<value>', e.g. 'hashtag:python'.
+    Every pair of distinct entities within the same tweet is counted once per tweet. Pair counts are kept as sparse (key, count) arrays, so updates only touch the entities of the new tweets.
+    """
+
+    KINDS = ("hashtag", "mention", "url", "domain", "topic")
+
+    def __init__(self):
+        self.labels = list()
+        self._indices = dict()
+        self._counts = np.zeros(0, dtype=np.int64)
+        # pair counts of every update, merged lazily; keys encode the token pair as (first << 32) | second
+        self._pairs = list()
+        self.num_tweets = 0
+
+    @staticmethod
+    def extract(tweet: dict) -> List[str]:
+        """Extracts the entity labels of a tweet.
+
+        Args:
+            tweet (dict): Twitter API v2 tweet object with 'entities' and/or 'context_annotations' fields.
+
+        Returns:
+            List[str]: Sorted, distinct entity labels.
+        """
+        entities = tweet.get("entities") or dict()
+        labels = set()
+        labels.update("hashtag:" + hashtag["tag"].lower() for hashtag in entities.get("hashtags", list()))
+        labels.update("mention:" + mention["username"].lower() for mention in entities.get("mentions", list()))
+        labels.update("url:" + url.get("expanded_url", url.get("url")) for url in entities.get("urls", list()))
+        for annotation in tweet.get("context_annotations", list()):
+            labels.add("domain:" + annotation["domain"]["name"])
+            labels.add("topic:" + annotation["entity"]["name"])
+        return sorted(labels)
+
+    def _index(self, label: str) -> int:
+        """Returns the index of a label, adding unknown labels to the vocabulary."""
+        if label not in self._indices:
+            self._indices[label] = len(self.labels)
+            self.labels.append(label)
+        return self._indices[label]
+
+    def update(self, tweets: Iterable[dict]):
+        """Adds the entities of tweets to the counts.
+
+        Args:
+            tweets (Iterable[dict]): Twitter API v2 tweet objects.
+        """
+        indices, lengths = list(), list()
+        for tweet in tweets:
+            labels = self.extract(tweet)
+            indices.extend(self._index(label) for label in labels)
+            lengths.append(len(labels))
+            self.num_tweets += 1
+        indices, lengths = np.asarray(indices, dtype=np.int64), np.asarray(lengths, dtype=np.int64)
+        # entity frequencies
+        self._counts = np.concatenate([self._counts, np.zeros(len(self.labels) - self._counts.size, dtype=np.int64)])
+        self._counts += np.bincount(indices, minlength=len(self.labels))
+        # pair every entity with every entity of the same tweet
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        partners = np.repeat(lengths, lengths)
+        left = np.repeat(indices, partners)
+        offsets = np.arange(int(partners.sum())) - np.repeat(np.cumsum(partners) - partners, partners)
+        right = indices[np.repeat(starts, partners) + offsets]
+        mask = left < right
+        keys, counts = np.unique((left[mask] << 32) | right[mask], return_counts=True)
+        self._pairs.append((keys, counts))
+
+    def _merge(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Merges the pair counts of all updates."""
+        if len(self._pairs) != 1:
+            keys = np.concatenate([keys for keys, _ in self._pairs] or [np.empty(0, dtype=np.int64)])
+            counts = np.concatenate([counts for _, counts in self._pairs] or [np.empty(0, dtype=np.int64)])
+            keys, inverse = np.unique(keys, return_inverse=True)
+            self._pairs = [(keys, np.bincount(inverse, weights=counts, minlength=keys.size).astype(np.int64))]
+        return self._pairs[0]
+
+    def _mask(self, kind: str | None) -> np.ndarray:
+        """Returns which labels are of the given kind."""
+        if kind is None:
+            return np.ones(len(self.labels), dtype=bool)
+        if kind not in self.KINDS:
+            raise ValueError("Invalid kind '{}'. Must be one of {}.".format(kind, list(self.KINDS)))
+        return np.array([label.startswith(kind + ":") for label in self.labels], dtype=bool)
+
+    def frequencies(self, kind: str | None = None, top: int | None = None) -> Dict[str, int]:
+        """Returns the number of tweets containing every entity.
+
+        Args:
+            kind (str | None, optional): Only entities of this kind. Must be from: hashtag, mention, url, domain, topic. Defaults to None, thus, all kinds.
+            top (int | None, optional): Maximum number of entities. Defaults to None, thus, all.
+
+        Raises:
+            ValueError: If kind is invalid.
+
+        Returns:
+            Dict[str, int]: Entity labels and counts, ordered by descending count.
+        """
+        indices = np.flatnonzero(self._mask(kind))
+        indices = indices[np.argsort(-self._counts[indices], kind="stable")][:top]
+        return {self.labels[idx]: int(self._counts[idx]) for idx in indices}
+
+    def matrix(self, kind: str | None = None, min_count: int = 1) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the co-occurrence matrix in coordinate format, with every pair stored once (row < column).
+
+        Args:
+            kind (str | None, optional): Only pairs of entities of this kind. Defaults to None, thus, all kinds.
+            min_count (int, optional): Minimum number of tweets containing a pair. Defaults to 1.
+
+        Raises:
+            ValueError: If kind is invalid.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]: Entity labels, row indices, column indices, and counts.
+        """
+        keys, counts = self._merge()
+        rows, cols = keys >> 32, keys & 0xFFFFFFFF
+        mask = self._mask(kind)
+        keep = mask[rows] & mask[cols] & (counts >= min_count)
+        return list(self.labels), rows[keep], cols[keep], counts[keep]
+
+    def top_pairs(self, n: int = 10, kind: str | None = None) -> List[Tuple[str, str, int]]:
+        """Returns the most frequent pairs of entities.
+
+        Args:
+            n (int, optional): Number of pairs. Defaults to 10.
+            kind (str | None, optional): Only pairs of entities of this kind. Defaults to None, thus, all kinds.
+
+        Returns:
+            List[Tuple[str, str, int]]: Entity labels and number of tweets containing both.
+        """
+        labels, rows, cols, counts = self.matrix(kind)
+        order = np.argsort(-counts, kind="stable")[:n]
+        return [(labels[rows[idx]], labels[cols[idx]], int(counts[idx])) for idx in order]
+
+    def related(self, label: str, n: int = 10) -> Dict[str, int]:
+        """Returns the entities that co-occur most often with an entity.
+
+        Args:
+            label (str): Entity label, e.g. 'hashtag:python'.
+            n (int, optional): Number of entities. Defaults to 10.
+
+        Raises:
+            KeyError: If the entity is unknown.
+
+        Returns:
+            Dict[str, int]: Entity labels and number of tweets containing both, ordered by descending count.
+        """
+        index = self._indices[label]
+        _, rows, cols, counts = self.matrix()
+        partners = np.where(rows == index, cols, rows)[(rows == index) | (cols == index)]
+        counts = counts[(rows == index) | (cols == index)]
+        order = np.argsort(-counts, kind="stable")[:n]
+        return {self.labels[partners[idx]]: int(counts[idx]) for idx in order}
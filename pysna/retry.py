@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+import requests
+import tweepy
+
+# create logger instance
+log = logging.getLogger(__name__)
+# log to stdout
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.ERROR)
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+log.addHandler(handler)
+
+
+class RequestError(Exception):
+    """Error of a manual request. Subclasses classify whether the request may succeed when retried."""
+
+    retryable = False
+
+    def __init__(self, message: str, response: requests.Response | None = None):
+        super().__init__(message)
+        self.response = response
+        self.status_code = None if response is None else response.status_code
+
+
+class ClientError(RequestError):
+    """Request was rejected (e.g., 400, 401, 403, or 404) and fails again if retried."""
+
+
+class TransientError(RequestError):
+    """Request failed temporarily (e.g., 5xx responses, timeouts, or connection errors)."""
+
+    retryable = True
+
+
+class RateLimitError(TransientError):
+    """Request was rate limited (429)."""
+
+
+class UnavailableError(ClientError):
+    """User or Tweet is known to be unavailable (suspended, not found, or protected), so it was not requested again."""
+
+    def __init__(self, message: str, status: str, response: requests.Response | None = None):
+        super().__init__(message, response)
+        self.status = status
+
+
+class CircuitOpenError(RequestError):
+    """Request was not made, since recent requests to the host failed repeatedly."""
+
+
+class DeadlineExceeded(RequestError):
+    """Request could not be completed before the deadline."""
+
+
+def raise_for_status(response: requests.Response):
+    """Raises a classified RequestError if a manual request did not succeed.
+
+    Args:
+        response (requests.Response): Response of the request.
+
+    Raises:
+        RateLimitError: If status code is 429.
+        TransientError: If status code is 408 or 5xx.
+        ClientError: If status code is another one than 200.
+    """
+    if response.status_code == 200:
+        return
+    message = "Request returned an error: {} {}".format(response.status_code, response.text)
+    if response.status_code == 429:
+        raise RateLimitError(message, response)
+    if (response.status_code == 408) or (response.status_code >= 500):
+        raise TransientError(message, response)
+    raise ClientError(message, response)
+
+
+def retry_after(response: requests.Response | None) -> float | None:
+    """Returns the seconds to wait according to the 'Retry-After' or 'x-rate-limit-reset' header of a response, or None if neither is available."""
+    if response is None:
+        return None
+    headers = response.headers
+    if "retry-after" in headers:
+        value = headers["retry-after"]
+        # either delay in seconds or HTTP date
+        if value.strip().isdigit():
+            return float(value)
+        with contextlib.suppress(TypeError, ValueError):
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    if "x-rate-limit-reset" in headers:
+        return max(0.0, float(headers["x-rate-limit-reset"]) - time.time())
+    return None
+
+
+def _connection_failure(error: BaseException | None) -> bool:
+    """Returns whether an error of the requests library is a connection error or timeout. SSL errors fail again if retried."""
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)) and not isinstance(error, requests.exceptions.SSLError)
+
+
+def classify(error: BaseException) -> tuple:
+    """Classifies errors of manual requests and tweepy calls.
+
+    Returns:
+        tuple: Whether the error is transient, whether it is a rate limit, and the response (if any).
+    """
+    if isinstance(error, RequestError):
+        return error.retryable, isinstance(error, RateLimitError), error.response
+    if isinstance(error, tweepy.errors.TooManyRequests):
+        return True, True, error.response
+    if isinstance(error, tweepy.errors.TwitterServerError):
+        return True, False, error.response
+    if isinstance(error, tweepy.errors.HTTPException):
+        return False, False, error.response
+    # connection errors and timeouts
+    if _connection_failure(error):
+        return True, False, None
+    # tweepy wraps every error of the session (e.g., also invalid URLs or too many redirects), the original error is its context
+    if isinstance(error, tweepy.errors.TweepyException) and _connection_failure(error.__context__):
+        return True, False, None
+    return False, False, None
+
+
+class CircuitBreaker:
+    """Circuit breaker of a host.
+
+    After 'failure_threshold' consecutive transient failures, the circuit opens and requests are rejected for 'recovery_time' seconds.
+    Afterwards, a single trial request is let through (half-open). The circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.recovery_time else "half-open"
+
+    def allow(self) -> bool:
+        """Returns whether a request may be made and reserves the trial request of a half-open circuit."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures, self.opened_at, self._trial = 0, None, False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at, self._trial = time.monotonic(), False
+
+
+class RetryPolicy:
+    """Retries transient failures of requests with exponential backoff and full jitter.
+
+    The delay before the n-th retry is drawn uniformly from [0, min(max_delay, base_delay * 2^n)]. If a response tells when to retry ('Retry-After' or 'x-rate-limit-reset' header), that delay is used instead.
+    Every host has a circuit breaker, so requests to a failing host are rejected immediately instead of being retried.
+    Calls fail with DeadlineExceeded if the next retry would end after the deadline of the call ('timeout' seconds after the call started, or an earlier deadline set with the 'deadline' context manager).
+
+    Metrics per host are available via 'metrics': calls, retries, failed calls, calls rejected by the circuit breaker, and wasted time in seconds (spent on failed attempts and waiting).
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0, timeout: float | None = None, failure_threshold: int = 5, recovery_time: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._breakers = dict()
+        self._metrics = dict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Returns the circuit breaker of a host."""
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.recovery_time)
+            return self._breakers[host]
+
+    def _count(self, host: str, **values):
+        with self._lock:
+            self._metrics.setdefault(host, Counter()).update(values)
+
+    def metrics(self) -> Dict[str, dict]:
+        """Returns the metrics per host."""
+        with self._lock:
+            return {host: {key: counter[key] for key in ("calls", "retries", "failures", "rejected", "wasted_time")} for host, counter in self._metrics.items()}
+
+    @contextlib.contextmanager
+    def deadline(self, seconds: float | None, extend: bool = False):
+        """Sets a deadline for all calls of the current thread within the context. Nested deadlines cannot extend outer ones, unless 'extend' is True.
+
+        Args:
+            seconds (float | None): Seconds from now. None sets no deadline if 'extend' is True and keeps the outer one otherwise.
+            extend (bool, optional): Replace the outer deadline instead of bounding it, e.g. for work done on behalf of several threads. Defaults to False.
+        """
+        outer = getattr(self._local, "deadline", None)
+        deadline = None if seconds is None else time.monotonic() + seconds
+        if extend or (outer is None):
+            self._local.deadline = deadline
+        else:
+            self._local.deadline = outer if deadline is None else min(outer, deadline)
+        try:
+            yield
+        finally:
+            self._local.deadline = outer
+
+    def remaining_time(self) -> float | None:
+        """Returns the seconds until the deadline of the current thread or None if no deadline is set."""
+        deadline = getattr(self._local, "deadline", None)
+        return None if deadline is None else deadline - time.monotonic()
+
+    def call(self, host: str, func, *args, retry_rate_limits: bool = True, **kwargs):
+        """Calls a function that makes a request and retries transient failures.
+
+        Args:
+            host (str): Host of the request, e.g. 'api.twitter.com'.
+            func: Function that makes the request.
+            retry_rate_limits (bool, optional): Retry rate limited requests. Disable if rate limits are handled by the caller. Defaults to True.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker of the host is open.
+            DeadlineExceeded: If the call cannot be completed before its deadline.
+
+        Returns:
+            Result of the function. Errors that are not transient and the last error after all retries are raised as is.
+        """
+        breaker = self.breaker(host)
+        start = time.monotonic()
+        deadline = getattr(self._local, "deadline", None)
+        if self.timeout is not None:
+            deadline = start + self.timeout if deadline is None else min(deadline, start + self.timeout)
+        self._count(host, calls=1)
+        attempt = 0
+        while True:
+            if (deadline is not None) and (time.monotonic() >= deadline):
+                self._count(host, failures=1)
+                raise DeadlineExceeded("Deadline of request to {} exceeded.".format(host))
+            if not breaker.allow():
+                self._count(host, rejected=1, failures=1)
+                raise CircuitOpenError("Circuit breaker for {} is open after {} consecutive failures.".format(host, breaker.failures))
+            attempt_start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                transient, rate_limited, response = classify(e)
+                if not transient or (rate_limited and not retry_rate_limits):
+                    # the host works, the request is rejected
+                    breaker.success()
+                    self._count(host, failures=1)
+                    raise
+                if not rate_limited:
+                    breaker.failure()
+                self._count(host, wasted_time=time.monotonic() - attempt_start)
+                if attempt >= self.max_retries:
+                    self._count(host, failures=1)
+                    raise
+                # honor the delay requested by the server, else back off exponentially with full jitter
+                delay = retry_after(response)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+                if (deadline is not None) and (time.monotonic() + delay > deadline):
+                    self._count(host, failures=1)
+                    raise DeadlineExceeded("Request to {} cannot be retried before the deadline: {}".format(host, e), response) from e
+                log.info("Retrying request to {} in {:.2f} seconds after: {}".format(host, delay, e))
+                time.sleep(delay)
+                self._count(host, retries=1, wasted_time=delay)
+                attempt += 1
+                continue
+            breaker.success()
+            return result
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import heapq
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+from pysna.pool import CredentialPool
+from pysna.retry import DeadlineExceeded
+
+
+class _Job:
+    """Queued call of a fetcher method."""
+
+    __slots__ = ("endpoint", "func", "args", "kwargs", "cost", "deadline", "priority", "future")
+
+    def __init__(self, endpoint: str, func, args: tuple, kwargs: dict, cost: int, deadline: float | None = None, priority: str = "normal"):
+        self.endpoint = endpoint
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cost = cost
+        # monotonic time until the job must be finished
+        self.deadline = deadline
+        self.priority = priority
+        self.future = Future()
+
+
+class RequestScheduler:
+    """Per-endpoint scheduler that runs queued work on endpoints with remaining requests instead of sleeping on exhausted ones.
+
+    Every endpoint has a token bucket built from the rate limit headers observed by the credential pool: the remaining requests of all credentials, refilled to the limit of a credential at the reset of its window.
+    Queued jobs are dispatched in order to a thread pool as long as their endpoint has more tokens than jobs running on it. Jobs of exhausted endpoints stay queued until the next reset, while later jobs of other endpoints overtake them.
+    Jobs of higher priority are dispatched before jobs of lower priority (see CredentialPool.PRIORITIES), and background jobs only use the share of the tokens left to them by the pool.
+    Endpoints without observed headers are assumed to have remaining requests.
+    Jobs inherit the deadline and the priority of the submitting thread (see RetryPolicy.deadline and CredentialPool.prioritized). Queued jobs fail with DeadlineExceeded once their deadline expired, running jobs make their requests with the remaining time.
+    """
+
+    # length of a rate limit window in seconds
+    WINDOW = 15 * 60
+
+    def __init__(self, pool: CredentialPool, workers: int = 4):
+        if workers < 1:
+            raise ValueError("'workers' must be at least 1.")
+        self.pool = pool
+        self.workers = workers
+        self._queue = list()
+        self._running = Counter()
+        self._running_costs = Counter()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._thread = None
+
+    def submit(self, endpoint: str, func, args: tuple = (), kwargs: Dict[str, Any] | None = None, cost: int = 1, priority: str | None = None) -> Future:
+        """Queues a call.
+
+        Args:
+            endpoint (str): Rate limit endpoint mainly requested by the call, e.g. '1.1/followers/ids'.
+            func: Function to be called.
+            args (tuple, optional): Positional arguments of the call. Defaults to ().
+            kwargs (Dict[str, Any] | None, optional): Keyword arguments of the call. Defaults to None.
+            cost (int, optional): Estimated number of requests of the call (e.g., pages), used to predict completion times. Defaults to 1.
+            priority (str | None, optional): Priority of the call. Must be from 'high', 'normal', and 'background'. Defaults to None, thus, the priority of the submitting thread.
+
+        Raises:
+            ValueError: If an invalid priority was provided.
+
+        Returns:
+            Future: Result of the call.
+        """
+        priority = priority or self.pool.current_priority()
+        if priority not in self.pool.PRIORITIES:
+            raise ValueError("Invalid priority '{}'. Must be one of {}.".format(priority, list(self.pool.PRIORITIES)))
+        remaining = self.pool.retry.remaining_time()
+        job = _Job(endpoint, func, args, kwargs or dict(), cost, deadline=None if remaining is None else time.monotonic() + remaining, priority=priority)
+        with self._condition:
+            self._queue.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return job.future
+
+    def _tokens(self, endpoint: str, now: float, priority: str = "normal") -> float:
+        """Returns the remaining requests of an endpoint across all credentials that jobs of a priority may use."""
+        return sum(self.pool.available(credential, endpoint, now, priority) for credential in self.pool.credentials)
+
+    def _dispatch(self):
+        """Dispatcher loop of the background thread."""
+        with self._condition:
+            while True:
+                now = time.time()
+                # drop jobs whose deadline expired while they were queued
+                for job in [job for job in self._queue if (job.deadline is not None) and (job.deadline <= time.monotonic())]:
+                    self._queue.remove(job)
+                    if job.future.set_running_or_notify_cancel():
+                        job.future.set_exception(DeadlineExceeded("Deadline of queued request to {} exceeded.".format(job.endpoint)))
+                # jobs of higher priority first, in order of submission per priority
+                for job in sorted(self._queue, key=lambda job: self.pool.PRIORITIES.index(job.priority)):
+                    if sum(self._running.values()) >= self.workers:
+                        break
+                    # running jobs have not necessarily made their requests yet
+                    if self._tokens(job.endpoint, now, job.priority) <= self._running[job.endpoint]:
+                        continue
+                    self._queue.remove(job)
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    self._running[job.endpoint] += 1
+                    self._running_costs[job.endpoint] += job.cost
+                    self._executor.submit(self._execute, job)
+                # wait for finished or new jobs, or the next reset of a waiting endpoint
+                resets = [self.pool.reset_time(job.endpoint) for job in self._queue if self._tokens(job.endpoint, now, job.priority) <= self._running[job.endpoint]]
+                timeouts = [reset - now + 0.01 for reset in resets if reset > now]
+                # wake up to drop jobs at their deadline
+                timeouts += [job.deadline - time.monotonic() + 0.01 for job in self._queue if job.deadline is not None]
+                self._condition.wait(timeout=max(min(timeouts), 0) if timeouts else None)
+
+    def _execute(self, job: _Job):
+        try:
+            with self.pool.prioritized(job.priority), contextlib.nullcontext() if job.deadline is None else self.pool.retry.deadline(job.deadline - time.monotonic()):
+                job.future.set_result(job.func(*job.args, **job.kwargs))
+        except BaseException as e:
+            job.future.set_exception(e)
+        finally:
+            with self._condition:
+                self._running[job.endpoint] -= 1
+                self._running_costs[job.endpoint] -= job.cost
+                self._condition.notify_all()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Returns the number of queued jobs per endpoint, excluding running ones."""
+        with self._condition:
+            return dict(Counter(job.endpoint for job in self._queue))
+
+    def _completion(self, endpoint: str, requests: int, now: float) -> float:
+        """Predicts when a number of requests to an endpoint can be made, refilling every credential's bucket at the reset of its window."""
+        states = [credential.limits.get(endpoint) for credential in self.pool.credentials]
+        # endpoints without observed headers are assumed to be unlimited
+        if any(state is None for state in states):
+            return now
+        requests -= sum((state["limit"] or 0) if state["reset"] <= now else state["remaining"] for state in states)
+        if requests <= 0:
+            return now
+        # credentials whose window was reset are refilled after their next window at the latest
+        refills = [(state["reset"] if state["reset"] > now else now + self.WINDOW, max(state["limit"] or 1, 1)) for state in states]
+        heapq.heapify(refills)
+        while True:
+            reset, limit = heapq.heappop(refills)
+            requests -= limit
+            if requests <= 0:
+                return reset
+            heapq.heappush(refills, (reset + self.WINDOW, limit))
+
+    def eta(self) -> Dict[str, float]:
+        """Returns the predicted Unix timestamp per endpoint when all queued and running requests can be made."""
+        now = time.time()
+        with self._condition:
+            demand = Counter(self._running_costs)
+            for job in self._queue:
+                demand[job.endpoint] += job.cost
+        return {endpoint: self._completion(endpoint, requests, now) for endpoint, requests in demand.items() if requests > 0}
+
+    def shutdown(self, wait: bool = True):
+        """Cancels queued jobs and shuts down the thread pool.
+
+        Args:
+            wait (bool, optional): Wait for running jobs to finish. Defaults to True.
+        """
+        with self._condition:
+            for job in self._queue:
+                job.future.cancel()
+            self._queue = list()
+        self._executor.shutdown(wait=wait)
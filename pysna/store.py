@@ -0,0 +1,625 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# keys are used as file names
+KEY_PATTERN = re.compile(r"^[\w.-]+$")
+
+
+def _atomic_write(path: str, write_func):
+    """Writes a file atomically by writing to a temporary file in the same directory first and replacing the target afterwards.
+
+    Args:
+        path (str): Target file path.
+        write_func: Function that takes a binary file handle and writes the content.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write_func(handle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class IDStore:
+    """On-disk store for ID collections (e.g., follower, liker, or retweeter IDs).
+
+    Every collection is written as a sorted and deduplicated int64 array in NumPy's .npy format next to a small JSON metadata file.
+    Collections are read back as read-only memory maps. Thus, several processes reading the same collection share the pages of the operating system's page cache instead of holding private copies.
+    """
+
+    DTYPE = np.int64
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        """Returns the file path of a collection.
+
+        Args:
+            key (str): Collection key.
+            extension (str): File extension, either 'npy', 'json', or 'jsonl'.
+
+        Raises:
+            ValueError: If key contains characters other than letters, digits, '_', '.', and '-'.
+
+        Returns:
+            str: File path.
+        """
+        if not KEY_PATTERN.match(key):
+            raise ValueError("Invalid key '{}'. Only letters, digits, '_', '.', and '-' are allowed.".format(key))
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def write(self, key: str, ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Writes an ID collection to the store. Existing collections with the same key are replaced.
+
+        Args:
+            key (str): Collection key, e.g. 'followers_24677217'.
+            ids (Iterable[int] | np.ndarray): IDs to be stored.
+
+        Returns:
+            np.ndarray: Read-only memory map of the stored, sorted IDs.
+        """
+        if not isinstance(ids, np.ndarray):
+            ids = np.fromiter(ids, dtype=self.DTYPE)
+        # sort and deduplicate
+        ids = np.unique(ids.astype(self.DTYPE, copy=False))
+        return self._write(key, ids)
+
+    def _write(self, key: str, ids: np.ndarray, **fields) -> np.ndarray:
+        """Writes the data and metadata files of a collection.
+
+        Args:
+            key (str): Collection key.
+            ids (np.ndarray): IDs to be stored as they are.
+            **fields: Additional metadata fields.
+
+        Returns:
+            np.ndarray: Read-only memory map of the stored IDs.
+        """
+        # write data file first, so metadata never points to a missing file
+        _atomic_write(self._path(key, "npy"), lambda handle: np.save(handle, ids))
+        metadata = {"key": key, "count": int(ids.size), "dtype": np.dtype(self.DTYPE).name, "updated_at": datetime.now(timezone.utc).isoformat(), **fields}
+        _atomic_write(self._path(key, "json"), lambda handle: handle.write(json.dumps(metadata).encode("utf-8")))
+        return self.read(key)
+
+    def write_pages(self, key: str, pages: Iterable[List[int]]) -> np.ndarray:
+        """Writes an ID collection page by page, e.g. while paginating through an API endpoint.
+
+        Pages are spooled to a temporary file, so no Python objects are kept for already received IDs.
+
+        Args:
+            key (str): Collection key.
+            pages (Iterable[List[int]]): Pages of IDs.
+
+        Returns:
+            np.ndarray: Read-only memory map of the stored, sorted IDs.
+        """
+        with tempfile.TemporaryFile(dir=self.directory) as spool:
+            for page in pages:
+                np.asarray(page, dtype=self.DTYPE).tofile(spool)
+            spool.seek(0)
+            ids = np.fromfile(spool, dtype=self.DTYPE)
+        return self.write(key, ids)
+
+    def read(self, key: str) -> np.ndarray:
+        """Opens a stored ID collection as read-only memory map.
+
+        Args:
+            key (str): Collection key.
+
+        Raises:
+            KeyError: If the collection does not exist.
+
+        Returns:
+            np.ndarray: Sorted IDs.
+        """
+        path = self._path(key, "npy")
+        if not os.path.exists(path):
+            raise KeyError(key)
+        return np.load(path, mmap_mode="r")
+
+    def metadata(self, key: str) -> dict:
+        """Returns the metadata of a stored ID collection.
+
+        Args:
+            key (str): Collection key.
+
+        Raises:
+            KeyError: If the collection does not exist.
+
+        Returns:
+            dict: Key, number of IDs, data type, and time of the last update.
+        """
+        path = self._path(key, "json")
+        if not os.path.exists(path):
+            raise KeyError(key)
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def index(self) -> Dict[str, dict]:
+        """Returns the metadata of all stored ID collections.
+
+        Returns:
+            Dict[str, dict]: Metadata with collection keys as keys.
+        """
+        return {key: self.metadata(key) for key in self.keys()}
+
+    def keys(self) -> List[str]:
+        """Returns the keys of all stored ID collections.
+
+        Returns:
+            List[str]: Sorted collection keys.
+        """
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def delete(self, key: str):
+        """Removes an ID collection from the store.
+
+        Args:
+            key (str): Collection key.
+
+        Raises:
+            KeyError: If the collection does not exist.
+        """
+        if key not in self:
+            raise KeyError(key)
+        os.remove(self._path(key, "json"))
+        os.remove(self._path(key, "npy"))
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key, "json"))
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class TimelineStore(IDStore):
+    """On-disk store for ordered ID timelines (e.g., composed or liked Tweets), newest first.
+
+    In contrast to the IDStore, IDs keep their order and only later duplicates are removed. The first ID is stored as 'newest_id' in the metadata and serves as watermark for incremental synchronization.
+    """
+
+    def write(self, key: str, ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Writes an ID timeline to the store. Existing timelines with the same key are replaced.
+
+        Args:
+            key (str): Timeline key, e.g. 'composed_tweets_24677217'.
+            ids (Iterable[int] | np.ndarray): IDs to be stored, newest first.
+
+        Returns:
+            np.ndarray: Read-only memory map of the stored IDs.
+        """
+        if not isinstance(ids, np.ndarray):
+            ids = np.fromiter(ids, dtype=self.DTYPE)
+        ids = ids.astype(self.DTYPE, copy=False)
+        # deduplicate, keeping the first (newest) occurrence
+        _, first = np.unique(ids, return_index=True)
+        ids = ids[np.sort(first)]
+        return self._write(key, ids, newest_id=int(ids[0]) if ids.size else None)
+
+    def prepend(self, key: str, ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Adds newer IDs in front of a stored timeline. Creates the timeline if it does not exist.
+
+        Args:
+            key (str): Timeline key.
+            ids (Iterable[int] | np.ndarray): New IDs, newest first.
+
+        Returns:
+            np.ndarray: Read-only memory map of the merged timeline.
+        """
+        if not isinstance(ids, np.ndarray):
+            ids = np.fromiter(ids, dtype=self.DTYPE)
+        stored = self.read(key) if key in self else np.empty(0, dtype=self.DTYPE)
+        return self.write(key, np.concatenate([ids.astype(self.DTYPE, copy=False), stored]))
+
+    def newest_id(self, key: str) -> int | None:
+        """Returns the newest stored ID of a timeline.
+
+        Args:
+            key (str): Timeline key.
+
+        Returns:
+            int | None: Newest ID or None if the timeline does not exist or is empty.
+        """
+        if key not in self:
+            return None
+        return self.metadata(key)["newest_id"]
+
+    def prepend_records(self, key: str, records: List[dict]) -> List[dict]:
+        """Adds newer records (e.g., Tweet objects including their texts) in front of a stored timeline. The records are kept in a JSON lines file next to the ID timeline.
+
+        Args:
+            key (str): Timeline key.
+            records (List[dict]): New records with an 'id' field, newest first.
+
+        Returns:
+            List[dict]: Records of the merged timeline, newest first.
+        """
+        stored = self.read_records(key)
+        known = {int(record["id"]) for record in stored}
+        new_records = list()
+        for record in records:
+            if int(record["id"]) not in known:
+                known.add(int(record["id"]))
+                new_records.append(record)
+        merged = new_records + stored
+
+        def write_func(handle):
+            for record in merged:
+                handle.write((json.dumps(record, default=str) + "\n").encode("utf-8"))
+
+        # the records are written before the watermark moves on, so an interrupted update is requested again
+        _atomic_write(self._path(key, "jsonl"), write_func)
+        self.prepend(key, [int(record["id"]) for record in new_records])
+        return merged
+
+    def read_records(self, key: str) -> List[dict]:
+        """Reads the records of a timeline.
+
+        Args:
+            key (str): Timeline key.
+
+        Returns:
+            List[dict]: Records, newest first. Empty if no records were stored.
+        """
+        path = self._path(key, "jsonl")
+        if not os.path.exists(path):
+            return list()
+        with open(path, "r", encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+
+    def delete(self, key: str):
+        """Removes a timeline and its records from the store.
+
+        Args:
+            key (str): Timeline key.
+
+        Raises:
+            KeyError: If the timeline does not exist.
+        """
+        super().delete(key)
+        if os.path.exists(self._path(key, "jsonl")):
+            os.remove(self._path(key, "jsonl"))
+
+
+class LRUCache(MutableMapping):
+    """Thread-safe in-memory mapping that holds at most 'max_size' entries. If full, the least recently used entry is evicted."""
+
+    def __init__(self, max_size: int = 100000):
+        if max_size < 1:
+            raise ValueError("'max_size' must be at least 1.")
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._entries[key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class MetricsStore:
+    """Append-only columnar store for public metrics samples of Tweets.
+
+    Every column is a raw binary file that grows with every appended batch of samples. The number of valid rows is kept in a JSON metadata file that is replaced atomically after the columns were appended, so rows of an interrupted append are ignored.
+    Samples must be appended in chronological order. Thus, time ranges are found by binary search on the timestamp column.
+    """
+
+    COLUMNS = {
+        "tweet_id": np.int64,
+        "timestamp": np.float64,
+        "impression_count": np.int64,
+        "like_count": np.int64,
+        "retweet_count": np.int64,
+        "quote_count": np.int64,
+        "reply_count": np.int64,
+    }
+    METRICS = ("impression_count", "like_count", "retweet_count", "quote_count", "reply_count")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._metadata_path = os.path.join(self.directory, "metrics.json")
+        if os.path.exists(self._metadata_path):
+            with open(self._metadata_path, "r", encoding="utf-8") as handle:
+                metadata = json.load(handle)
+            self.count, self.last_timestamp = metadata["count"], metadata["last_timestamp"]
+        else:
+            self.count, self.last_timestamp = 0, None
+        # drop rows of interrupted appends
+        for column, dtype in self.COLUMNS.items():
+            with open(self._column_path(column), "ab") as handle:
+                handle.truncate(self.count * np.dtype(dtype).itemsize)
+
+    def _column_path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def append(self, samples: Dict[int, dict], timestamp: float):
+        """Appends the public metrics of several Tweets sampled at the same time.
+
+        Args:
+            samples (Dict[int, dict]): Public metrics with Tweet IDs as keys, e.g. {1612443577447026689: {"like_count": 5, ...}}. Missing metrics are stored as 0.
+            timestamp (float): Unix timestamp of the samples.
+
+        Raises:
+            ValueError: If timestamp is older than the last appended samples.
+        """
+        if (self.last_timestamp is not None) and (timestamp < self.last_timestamp):
+            raise ValueError("Samples must be appended in chronological order.")
+        if not samples:
+            return
+        columns = {"tweet_id": np.fromiter(samples.keys(), dtype=np.int64, count=len(samples)), "timestamp": np.full(len(samples), timestamp, dtype=np.float64)}
+        for metric in self.METRICS:
+            columns[metric] = np.fromiter((sample.get(metric, 0) for sample in samples.values()), dtype=np.int64, count=len(samples))
+        for column, dtype in self.COLUMNS.items():
+            with open(self._column_path(column), "ab") as handle:
+                columns[column].astype(dtype, copy=False).tofile(handle)
+        self.count += len(samples)
+        self.last_timestamp = timestamp
+        metadata = {"count": self.count, "last_timestamp": self.last_timestamp, "columns": list(self.COLUMNS.keys())}
+        _atomic_write(self._metadata_path, lambda handle: handle.write(json.dumps(metadata).encode("utf-8")))
+
+    def _column(self, column: str) -> np.ndarray:
+        """Returns a read-only memory map of the valid rows of a column."""
+        if self.count == 0:
+            return np.empty(0, dtype=self.COLUMNS[column])
+        return np.memmap(self._column_path(column), dtype=self.COLUMNS[column], mode="r", shape=(self.count,))
+
+    def read(self, columns: List[str] | None = None, start: float | None = None, end: float | None = None, tweet_ids: Iterable[int] | None = None) -> Dict[str, np.ndarray]:
+        """Reads the samples within a time range.
+
+        Args:
+            columns (List[str] | None, optional): Columns to be read. Defaults to None, thus, all columns.
+            start (float | None, optional): Unix timestamp of the first sample (inclusive). Defaults to None.
+            end (float | None, optional): Unix timestamp of the last sample (exclusive). Defaults to None.
+            tweet_ids (Iterable[int] | None, optional): Only samples of these Tweets. Defaults to None, thus, all Tweets.
+
+        Raises:
+            KeyError: If an unknown column was requested.
+
+        Returns:
+            Dict[str, np.ndarray]: Column names and values.
+        """
+        columns = list(self.COLUMNS.keys()) if columns is None else columns
+        for column in columns:
+            if column not in self.COLUMNS:
+                raise KeyError(column)
+        # binary search on the chronologically ordered timestamps
+        timestamps = self._column("timestamp")
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = self.count if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        rows = np.arange(first, last)
+        if tweet_ids is not None:
+            rows = rows[np.isin(self._column("tweet_id")[first:last], np.fromiter(tweet_ids, dtype=np.int64))]
+        return {column: np.asarray(self._column(column)[rows]) for column in columns}
+
+    def growth_rates(self, metric: str = "like_count", start: float | None = None, end: float | None = None) -> Dict[int, float]:
+        """Computes the growth of a metric per hour for every Tweet between its first and last sample within a time range.
+
+        Args:
+            metric (str, optional): Metric. Defaults to "like_count".
+            start (float | None, optional): Unix timestamp of the range start (inclusive). Defaults to None.
+            end (float | None, optional): Unix timestamp of the range end (exclusive). Defaults to None.
+
+        Raises:
+            KeyError: If the metric is unknown.
+
+        Returns:
+            Dict[int, float]: Growth per hour with Tweet IDs as keys. Tweets with a single sample are omitted.
+        """
+        if metric not in self.METRICS:
+            raise KeyError(metric)
+        samples = self.read(["tweet_id", "timestamp", metric], start=start, end=end)
+        # group samples by Tweet, keeping the chronological order within groups
+        order = np.argsort(samples["tweet_id"], kind="stable")
+        tweet_ids, timestamps, values = samples["tweet_id"][order], samples["timestamp"][order], samples[metric][order]
+        # no samples within the time range
+        if tweet_ids.size == 0:
+            return dict()
+        firsts = np.flatnonzero(np.diff(tweet_ids, prepend=-1))
+        lasts = np.append(firsts[1:], tweet_ids.size) - 1
+        hours = (timestamps[lasts] - timestamps[firsts]) / 3600
+        valid = hours > 0
+        rates = (values[lasts] - values[firsts])[valid] / hours[valid]
+        return dict(zip(tweet_ids[firsts][valid].tolist(), rates.tolist()))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class RateLimitStore:
+    """Rate limit state of credentials and endpoints in a SQLite database that is shared by concurrent processes.
+
+    The database uses write-ahead logging, so readers do not block the writer. Requests are reserved by decrementing the remaining requests of a window in a write transaction before they are made.
+    Thus, processes sharing the database (e.g., consecutive or concurrent CLI runs) pace their requests in advance instead of running into rejected requests.
+    Credentials are identified by a hash of their tokens only.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, "rate_limits.sqlite")
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS rate_limits (credential TEXT, endpoint TEXT, requests_limit INTEGER, remaining INTEGER, reset REAL, PRIMARY KEY (credential, endpoint))")
+
+    def _connect(self) -> sqlite3.Connection:
+        # connections are not shared between threads, busy databases are retried for up to 30 seconds
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def read(self, endpoint: str | None = None) -> Dict[str, Dict[str, dict]]:
+        """Returns the rate limit state per credential and endpoint.
+
+        Args:
+            endpoint (str | None, optional): Only return the state of this endpoint. Defaults to None, thus, all endpoints.
+
+        Returns:
+            Dict[str, Dict[str, dict]]: States as {"limit": ..., "remaining": ..., "reset": ...} with credential hashes and endpoints as keys.
+        """
+        query, params = "SELECT credential, endpoint, requests_limit, remaining, reset FROM rate_limits", ()
+        if endpoint is not None:
+            query, params = query + " WHERE endpoint = ?", (endpoint,)
+        states = dict()
+        with contextlib.closing(self._connect()) as connection:
+            for credential, key, limit, remaining, reset in connection.execute(query, params):
+                states.setdefault(credential, dict())[key] = {"limit": limit, "remaining": remaining, "reset": reset}
+        return states
+
+    def update(self, credential: str, endpoint: str, state: dict):
+        """Writes the state observed from a response. Within the same window, the lower number of remaining requests is kept, since requests reserved by other processes may not be counted by the response yet.
+
+        Args:
+            credential (str): Credential hash.
+            endpoint (str): Endpoint.
+            state (dict): State as {"limit": ..., "remaining": ..., "reset": ...}.
+        """
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT INTO rate_limits VALUES (?, ?, ?, ?, ?) ON CONFLICT (credential, endpoint) DO UPDATE SET requests_limit = excluded.requests_limit, "
+                "remaining = CASE WHEN reset = excluded.reset THEN MIN(remaining, excluded.remaining) ELSE excluded.remaining END, reset = excluded.reset",
+                (credential, endpoint, state["limit"], state["remaining"], state["reset"]),
+            )
+
+    def reserve(self, credential: str, endpoint: str, now: float | None = None) -> bool:
+        """Reserves a request of a credential for an endpoint.
+
+        Args:
+            credential (str): Credential hash.
+            endpoint (str): Endpoint.
+            now (float | None, optional): Unix timestamp. Defaults to None, thus, the current time.
+
+        Returns:
+            bool: False if the credential has no remaining requests in the current window, else True. Requests of unknown and reset windows are always granted.
+        """
+        now = time.time() if now is None else now
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                updated = connection.execute("UPDATE rate_limits SET remaining = remaining - 1 WHERE credential = ? AND endpoint = ? AND reset > ? AND remaining > 0", (credential, endpoint, now)).rowcount
+                exhausted = connection.execute("SELECT COUNT(*) FROM rate_limits WHERE credential = ? AND endpoint = ? AND reset > ? AND remaining <= 0", (credential, endpoint, now)).fetchone()[0]
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return bool(updated) or not exhausted
+
+
+class NegativeCache:
+    """Users and Tweets known to be unavailable (suspended, not found, or protected), remembered for 'ttl' seconds.
+
+    Entries are kept in memory. If a directory is provided, they are also stored in a SQLite database, so later runs and concurrent processes skip the same users and Tweets without requesting them again.
+    """
+
+    STATUSES = ("suspended", "not_found", "protected")
+
+    def __init__(self, ttl: float = 24 * 60 * 60, directory: str | None = None):
+        self.ttl = ttl
+        self.directory = directory
+        self._entries = dict()
+        self.path = None
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.path = os.path.join(self.directory, "negative_cache.sqlite")
+            with contextlib.closing(self._connect()) as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("CREATE TABLE IF NOT EXISTS unavailable (kind TEXT, key TEXT, status TEXT, expires REAL, PRIMARY KEY (kind, key))")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, kind: str, key: str | int, now: float | None = None) -> str | None:
+        """Returns the status of an unavailable user or Tweet.
+
+        Args:
+            kind (str): Kind of the key, e.g. 'user_id', 'screen_name', or 'tweet'.
+            key (str | int): User ID, screen name, or Tweet ID.
+            now (float | None, optional): Unix timestamp. Defaults to None, thus, the current time.
+
+        Returns:
+            str | None: Status, or None if the user or Tweet is not known to be unavailable or its entry expired.
+        """
+        now = time.time() if now is None else now
+        entry = self._entries.get((kind, str(key)))
+        if (entry is None) and (self.path is not None):
+            with contextlib.closing(self._connect()) as connection:
+                entry = connection.execute("SELECT status, expires FROM unavailable WHERE kind = ? AND key = ?", (kind, str(key))).fetchone()
+            if entry is not None:
+                self._entries[(kind, str(key))] = entry
+        if entry is None:
+            return None
+        status, expires = entry
+        if expires <= now:
+            self.discard(kind, key)
+            return None
+        return status
+
+    def add(self, kind: str, key: str | int, status: str, now: float | None = None):
+        """Remembers an unavailable user or Tweet.
+
+        Args:
+            kind (str): Kind of the key, e.g. 'user_id', 'screen_name', or 'tweet'.
+            key (str | int): User ID, screen name, or Tweet ID.
+            status (str): Must be one of 'suspended', 'not_found', or 'protected'.
+            now (float | None, optional): Unix timestamp. Defaults to None, thus, the current time.
+        """
+        if status not in self.STATUSES:
+            raise ValueError("Invalid status '{}'. Must be one of {}.".format(status, self.STATUSES))
+        expires = (time.time() if now is None else now) + self.ttl
+        self._entries[(kind, str(key))] = (status, expires)
+        if self.path is not None:
+            with contextlib.closing(self._connect()) as connection:
+                connection.execute("INSERT OR REPLACE INTO unavailable (kind, key, status, expires) VALUES (?, ?, ?, ?)", (kind, str(key), status, expires))
+
+    def discard(self, kind: str, key: str | int):
+        """Forgets a user or Tweet, e.g. after it became available again."""
+        self._entries.pop((kind, str(key)), None)
+        if self.path is not None:
+            with contextlib.closing(self._connect()) as connection:
+                connection.execute("DELETE FROM unavailable WHERE kind = ? AND key = ?", (kind, str(key)))
+
+    def __len__(self) -> int:
+        now = time.time()
+        if self.path is None:
+            return sum(expires > now for _, expires in self._entries.values())
+        with contextlib.closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM unavailable WHERE expires > ?", (now,)).fetchone()[0]
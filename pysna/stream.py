@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Iterable, Iterator, List
+
+import tweepy
+
+from pysna.process import EntityCooccurrence, TwitterDataProcessor
+
+# create logger instance
+log = logging.getLogger(__name__)
+# log to stdout
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.ERROR)
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+log.addHandler(handler)
+
+
+def parse_timestamp(tweet: dict) -> float | None:
+    """Returns the Unix timestamp of a Twitter API v2 tweet object's 'created_at' field or None if not available or malformed."""
+    if "created_at" not in tweet:
+        return None
+    try:
+        return datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00")).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def replay_ndjson(path: str, speed: float | None = 1.0) -> Iterator[dict]:
+    """Replays tweets from a newline-delimited JSON file, e.g. a recorded filtered stream.
+
+    Args:
+        path (str): Path to the NDJSON file with one tweet object (or stream message with a 'data' field) per line.
+        speed (float | None, optional): Replay speed relative to the 'created_at' times of the tweets, e.g. 60 replays one minute per second. Defaults to 1.0. If None, tweets are yielded without delay.
+
+    Yields:
+        dict: Tweet objects.
+    """
+    first_event, first_replay = None, time.monotonic()
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            tweet = json.loads(line)
+            # unwrap stream messages
+            tweet = tweet.get("data", tweet)
+            timestamp = parse_timestamp(tweet)
+            if (speed is not None) and (timestamp is not None):
+                if first_event is None:
+                    first_event = timestamp
+                # wait until the tweet is due relative to the first tweet
+                delay = (timestamp - first_event) / speed - (time.monotonic() - first_replay)
+                if delay > 0:
+                    time.sleep(delay)
+            yield tweet
+
+
+class SentimentStream:
+    """Streaming stage that scores tweets in micro-batches and keeps rolling time-window aggregates.
+
+    Tweets are put on a bounded queue by a producer (e.g., a filtered stream). If the queue is full, the producer blocks until the consumer caught up (backpressure).
+    The consumer cleans and scores the tweets of a micro-batch with a shared VADER analyzer and adds them to time buckets of 'resolution' seconds.
+    Buckets older than 'window' seconds, measured from the newest tweet, are dropped, and the entity counts of every bucket are truncated to the 'max_entities' most common ones. Thus, memory is bounded.
+    """
+
+    def __init__(self, window: float = 300.0, resolution: float = 10.0, batch_size: int = 100, max_queue_size: int = 10000, max_entities: int = 1000, processor: TwitterDataProcessor | None = None):
+        if resolution <= 0 or window < resolution:
+            raise ValueError("'resolution' must be positive and not greater than 'window'.")
+        self.window = window
+        self.resolution = resolution
+        self.batch_size = batch_size
+        self.max_entities = max_entities
+        self.processor = processor or TwitterDataProcessor()
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        # buckets as (bucket index, volume, label counts, sum of compound scores, entity counts)
+        self._buckets = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.processed = 0
+
+    def put(self, tweet: dict, timeout: float | None = None):
+        """Adds a tweet to the queue. Blocks while the queue is full.
+
+        Args:
+            tweet (dict): Twitter API v2 tweet object with 'text' and, optionally, 'created_at' and 'entities' fields.
+            timeout (float | None, optional): Maximum seconds to wait for a free slot. Defaults to None, thus, no timeout.
+
+        Raises:
+            queue.Full: If no slot became free within the timeout.
+        """
+        self.queue.put(tweet, timeout=timeout)
+
+    def process(self, tweets: List[dict]):
+        """Scores a micro-batch of tweets and adds them to the rolling window. Malformed tweets are logged and skipped.
+
+        Args:
+            tweets (List[dict]): Tweet objects.
+        """
+        if not tweets:
+            return
+        # tweets without a text are scored as empty texts
+        texts = [tweet.get("text") if isinstance(tweet, dict) and isinstance(tweet.get("text"), str) else "" for tweet in tweets]
+        sentiments = self.processor.detect_tweets_sentiment(texts)
+        now = time.time()
+        with self._lock:
+            for tweet, sentiment in zip(tweets, sentiments):
+                try:
+                    timestamp = parse_timestamp(tweet)
+                    entities = EntityCooccurrence.extract(tweet)
+                except Exception as e:
+                    log.warning("Skipping malformed tweet: {}".format(e))
+                    continue
+                bucket = self._bucket(int((now if timestamp is None else timestamp) // self.resolution))
+                if bucket is None:
+                    # tweet is older than the window
+                    continue
+                bucket[1] += 1
+                bucket[2][sentiment["label"]] += 1
+                bucket[3] += sentiment["polarity_scores"]["compound"]
+                bucket[4].update(entities)
+            self.processed += len(tweets)
+
+    def _bucket(self, index: int) -> list | None:
+        """Returns the bucket of a time index, creating it and dropping expired buckets if required."""
+        horizon = int(self.window // self.resolution)
+        if self._buckets and index <= self._buckets[-1][0] - horizon:
+            return None
+        # buckets are ordered by time, late tweets are added to existing buckets
+        for bucket in reversed(self._buckets):
+            if bucket[0] == index:
+                return bucket
+        bucket = [index, 0, Counter(), 0.0, Counter()]
+        self._buckets.append(bucket)
+        if len(self._buckets) > 1 and self._buckets[-2][0] > index:
+            self._buckets = deque(sorted(self._buckets, key=lambda item: item[0]))
+        # drop expired buckets and bound the entity counts of closed buckets
+        newest = self._buckets[-1][0]
+        while self._buckets[0][0] <= newest - horizon:
+            self._buckets.popleft()
+        for closed in list(self._buckets)[:-1]:
+            if len(closed[4]) > self.max_entities:
+                closed[4] = Counter(dict(closed[4].most_common(self.max_entities)))
+        return bucket
+
+    def consume(self, tweets: Iterable[dict]):
+        """Processes tweets from an iterator (e.g., a replayed NDJSON file) in micro-batches without a queue.
+
+        Args:
+            tweets (Iterable[dict]): Tweet objects.
+        """
+        batch = list()
+        for tweet in tweets:
+            batch.append(tweet)
+            if len(batch) >= self.batch_size:
+                self.process(batch)
+                batch = list()
+        self.process(batch)
+
+    def _run(self):
+        """Consumer loop of the background thread."""
+        while not (self._stopped.is_set() and self.queue.empty()):
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            # drain further queued tweets up to the batch size
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # the consumer must not die, otherwise producers block on the full queue
+            try:
+                self.process(batch)
+            except Exception:
+                log.exception("Failed to process a batch of {} tweets.".format(len(batch)))
+
+    def start(self):
+        """Starts consuming the queue in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("Stream is already running.")
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Processes the remaining queued tweets and stops the background thread."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def aggregates(self, top: int = 10) -> dict:
+        """Returns the aggregates of the current window.
+
+        Args:
+            top (int, optional): Number of top entities. Defaults to 10.
+
+        Returns:
+            dict: Tweet volume, sentiment distribution, mean compound score, top entities, queue depth, and window bounds as Unix timestamps.
+        """
+        with self._lock:
+            volume = sum(bucket[1] for bucket in self._buckets)
+            labels = sum((bucket[2] for bucket in self._buckets), Counter())
+            compound = sum(bucket[3] for bucket in self._buckets)
+            entities = sum((bucket[4] for bucket in self._buckets), Counter())
+            end = (self._buckets[-1][0] + 1) * self.resolution if self._buckets else None
+        return {
+            "volume": volume,
+            "sentiment": {label: labels[label] for label in ("positive", "neutral", "negative")},
+            "mean_compound": compound / volume if volume else None,
+            "top_entities": dict(entities.most_common(top)),
+            "queue_size": self.queue.qsize(),
+            "start": None if end is None else end - self.window,
+            "end": end,
+        }
+
+
+class SentimentStreamingClient(tweepy.StreamingClient):
+    """Filtered stream client that forwards incoming tweets to a SentimentStream.
+
+    Request 'created_at' and 'entities' as tweet fields when calling 'filter' to aggregate by event time and entities.
+    """
+
+    def __init__(self, bearer_token: str, stream: SentimentStream, **kwargs):
+        super().__init__(bearer_token, **kwargs)
+        self.stream = stream
+
+    def on_data(self, raw_data):
+        data = json.loads(raw_data)
+        # blocks while the stream's queue is full, which slows down reading from the connection
+        if "data" in data:
+            self.stream.put(data["data"])
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
 import pickle
+import tempfile
+import time
 from typing import get_args
 
+import numpy as np
+import tweepy
 from config import PySNATestCase, tape
 
+from pysna.store import TimelineStore
+
 test_user_id_1 = 24677217
 test_username_1 = "WWU_Muenster"
 
@@ -26,7 +32,9 @@ class TestTwitterAPI(PySNATestCase):
 
     @tape.use_cassette("tests/cassettes/user_info.yaml")
     def test_user_info(self):
-        user_info = self.api.user_info(test_username_1, get_args(self.api.LITERALS_USER_INFO))
+        # the recorded cassette does not cover the timeline requests of the sentiment profile
+        attributes = [attr for attr in get_args(self.api.LITERALS_USER_INFO) if attr != "sentiment_profile"]
+        user_info = self.api.user_info(test_username_1, attributes)
         # Assert that the response matches the saved cassette
         cassette_response = user_info
         with open("tests/fixtures/user_info.pickle", "rb") as handle:
@@ -57,3 +65,88 @@ class TestTwitterAPI(PySNATestCase):
         with open("tests/fixtures/compare_tweets.pickle", "rb") as handle:
             expected_response = pickle.load(handle)
         self.assertDictEqual(cassette_response, expected_response)
+
+    def test_timeout(self):
+        self.api.fetcher.get_user_object = lambda user: tweepy.models.User.parse(None, {"id": 1, "screen_name": "user"})
+
+        def get_liked_tweets_ids(user, store=None):
+            # every page is a request that checks the deadline
+            for _ in range(100):
+                self.api.fetcher.retry.call("api.twitter.com", time.sleep, 0.05)
+            return [1, 2]
+
+        self.api.fetcher.get_liked_tweets_ids = get_liked_tweets_ids
+        start = time.monotonic()
+        output = self.api.user_info(1, ["id", "liked_tweets"], timeout=0.5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertDictEqual(output["results"], {"id": 1})
+        self.assertDictEqual(output["status"], {"id": "complete", "liked_tweets": "pending"})
+        # resume the pending attributes
+        self.api.fetcher.get_liked_tweets_ids = lambda user, store=None: [1, 2]
+        self.assertEqual(self.api.resume(output["continuation"]), [1, 2])
+        self.assertIsNone(self.api.user_info(1, ["id", "liked_tweets"], timeout=5)["continuation"])
+        with self.assertRaises(ValueError):
+            self.api.resume("invalid")
+        # the token keeps the priority and the store, the timestamp is not part of the results
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.api.fetcher.get_liked_tweets_ids = get_liked_tweets_ids
+            output = self.api.user_info(1, ["id", "liked_tweets"], return_timestamp=True, store=TimelineStore(tmp_dir), timeout=0.5, priority="background")
+            self.assertDictEqual(output["results"], {"id": 1})
+            self.assertIn("utc_timestamp", output)
+            calls = list()
+            self.api.fetcher.get_liked_tweets_ids = lambda user, store=None: calls.append((store.directory, self.api.fetcher.pool.current_priority())) or np.array([1, 2])
+            self.assertEqual(self.api.resume(output["continuation"])["liked_tweets"], [1, 2])
+            self.assertEqual(calls, [(tmp_dir, "background")])
+
+    def test_stream(self):
+        users = {user: tweepy.models.User.parse(None, {"id": user, "verified": user == 1}) for user in (1, 2)}
+        self.api.fetcher.get_user_objects = lambda requested: {user: users[user] for user in requested}
+
+        def get_liked_tweets_ids(user):
+            # two pages of two Tweets each
+            for _ in range(2):
+                time.sleep(0.05)
+                self.api.fetcher._page_fetched(2)
+            return [1, 2]
+
+        self.api.fetcher.get_liked_tweets_ids = get_liked_tweets_ids
+        events = list(self.api.compare_users([1, 2], ["commonly_liked_tweets", "verified"], stream=True))
+        # cheap attributes are yielded first
+        results = [event for event in events if event["event"] == "result"]
+        self.assertEqual([event["attribute"] for event in results], ["verified", "commonly_liked_tweets"])
+        self.assertEqual(results[0]["value"], {1: True, 2: False})
+        # progress of the scheduled pagination of both users
+        progress = [event for event in events if event["event"] == "progress"]
+        self.assertEqual(len(progress), 4)
+        self.assertDictEqual(progress[-1], {"event": "progress", "attribute": "commonly_liked_tweets", "pages": 4, "items": 8})
+        self.assertDictEqual(events[-1], {"event": "end", "status": {"verified": "complete", "commonly_liked_tweets": "complete"}, "continuation": None})
+        # the callback receives the events while the results are computed
+        received = list()
+        output = self.api.compare_users([1, 2], ["commonly_liked_tweets", "verified"], callback=received.append)
+        self.assertEqual(list(output.keys()), ["commonly_liked_tweets", "verified"])
+        self.assertEqual([event["event"] for event in received if event["event"] != "progress"], ["result", "result"])
+
+    def test_approximate(self):
+        followers = {1: set(range(0, 20000)), 2: set(range(10000, 30000))}
+        users = {user: tweepy.models.User.parse(None, {"id": user, "followers_count": len(followers[user])}) for user in followers}
+        self.api.fetcher.get_user_objects = lambda requested: {user: users[user] for user in requested}
+
+        def get_user_follower_ids(user, limit=None, sketch=None):
+            ids = sorted(followers[user])[:limit]
+            if sketch is not None:
+                sketch.update(user, ids)
+                return len(ids)
+            return set(ids)
+
+        self.api.fetcher.get_user_follower_ids = get_user_follower_ids
+        # all pages are sketched and the estimates have confidence intervals
+        results = self.api.compare_users([1, 2], "common_followers", approximate=True)
+        self.assertLessEqual(results["common_count"]["lower"], 10000)
+        self.assertGreaterEqual(results["common_count"]["upper"], 10000)
+        self.assertDictEqual(results["api_calls"], {"used": 10, "full": 8, "saved": 0})
+        # the first pages only give point estimates
+        results = self.api.compare_users([1, 2], "common_followers", approximate=True, max_pages=1)
+        self.assertEqual(set(results["common_count"].keys()), {"estimate"})
+        self.assertDictEqual(results["api_calls"], {"used": 4, "full": 8, "saved": 4})
+        with self.assertRaises(ValueError):
+            self.api.compare_users([1, 2], "common_followers", approximate=True, max_pages=0)
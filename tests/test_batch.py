@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import tweepy
+from config import PySNATestCase
+
+from pysna.batch import BatchLoader
+from pysna.fetch import Unavailable
+from pysna.retry import UnavailableError
+
+
+class LookupAdapter(requests.adapters.BaseAdapter):
+    """Simulates the v1.1 and v2 user and Tweet lookup endpoints for a set of available and suspended IDs."""
+
+    def __init__(self, available, suspended=frozenset(), unauthorized=False):
+        super().__init__()
+        self.available = available
+        self.suspended = suspended
+        # every request is rejected as with invalid or expired tokens
+        self.unauthorized = unauthorized
+        self.requests = list()
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.requests.append((url.path, params))
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.status_code = 200
+        if self.unauthorized:
+            response.status_code = 401
+            body = {"errors": [{"code": 89, "message": "Invalid or expired token."}]}
+        elif url.path.endswith("lookup.json"):
+            ids = [int(value) for value in (params.get("user_id") or params.get("id")).split(",")]
+            body = [{"id": value, "screen_name": f"user{value}"} for value in ids if value in self.available]
+        elif url.path.startswith("/2/"):
+            ids = [int(value) for value in params["ids"].split(",")]
+            body = {"data": [{"id": str(value)} for value in ids if value in self.available], "errors": list()}
+            for value in set(ids) - self.available:
+                if value in self.suspended:
+                    body["errors"].append({"value": str(value), "detail": f"User has been suspended: [{value}].", "title": "Forbidden"})
+                else:
+                    body["errors"].append({"value": str(value), "detail": f"Could not find user with ids: [{value}].", "title": "Not Found Error"})
+        else:
+            value = int(params.get("user_id") or params.get("id"))
+            body = {"id": value, "screen_name": f"user{value}"}
+            if value in self.suspended:
+                response.status_code = 403
+                body = {"errors": [{"code": 63, "message": "User has been suspended."}]}
+            elif value not in self.available:
+                response.status_code = 404
+                body = {"errors": [{"code": 50, "message": "User not found."}]}
+        response._content = json.dumps(body).encode("utf-8")
+        return response
+
+    def close(self):
+        pass
+
+
+class TestBatchLoader(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.batches = list()
+
+    def _load(self, keys):
+        self.batches.append(sorted(keys))
+        return {key: key * 2 if key >= 0 else ValueError(key) for key in keys if key != 0}
+
+    def _concurrently(self, loader, keys):
+        barrier = threading.Barrier(len(keys))
+
+        def load(key):
+            barrier.wait()
+            return loader.load(key)
+
+        with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+            return [executor.submit(load, key) for key in keys]
+
+    def test_batch(self):
+        loader = BatchLoader(self._load, window=0.2)
+        futures = self._concurrently(loader, [1, 2, 2, 3, -1, 0])
+        self.assertEqual([future.result() for future in futures[:4]], [2, 4, 4, 6])
+        # errors are raised to the caller of the key only
+        self.assertIsInstance(futures[4].exception(), ValueError)
+        self.assertIsInstance(futures[5].exception(), KeyError)
+        self.assertEqual(self.batches, [[-1, 0, 1, 2, 3]])
+
+    def test_max_batch_size(self):
+        loader = BatchLoader(self._load, max_batch_size=3, window=0.2)
+        start = time.monotonic()
+        futures = self._concurrently(loader, [1, 2, 3])
+        self.assertEqual([future.result() for future in futures], [2, 4, 6])
+        # full batches are dispatched without waiting for the window
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(loader.load_many(list(range(1, 8))), {key: key * 2 for key in range(1, 8)})
+        self.assertEqual([len(batch) for batch in self.batches], [3, 3, 3, 1])
+
+    def test_context(self):
+        local = threading.local()
+        deadlines = list()
+
+        def load(keys, deadline=None):
+            deadlines.append(deadline)
+            return self._load(keys)
+
+        loader = BatchLoader(load, window=0.2, context=lambda: (local.group, local.deadline))
+        contexts = [(1, "high", 10.0), (2, "background", 5.0), (3, "background", 20.0), (4, "high", None)]
+        barrier = threading.Barrier(len(contexts))
+
+        def run(key, group, deadline):
+            local.group, local.deadline = group, deadline
+            barrier.wait()
+            return loader.load(key)
+
+        with ThreadPoolExecutor(max_workers=len(contexts)) as executor:
+            futures = [executor.submit(run, *context) for context in contexts]
+        self.assertEqual([future.result() for future in futures], [2, 4, 6, 8])
+        # keys are batched per group and looked up with the latest deadline of the batch
+        self.assertEqual(sorted(self.batches), [[1, 4], [2, 3]])
+        self.assertEqual(deadlines[self.batches.index([2, 3])], 20.0)
+        self.assertIsNone(deadlines[self.batches.index([1, 4])])
+
+    def test_fetcher(self):
+        adapter = LookupAdapter(available={1, 2, 3, 10})
+        for session in self.fetcher.pool.credentials[0].sessions:
+            session.mount("https://", adapter)
+        self.fetcher._user_loader.window = 0.2
+        futures = [self.fetcher.scheduler.submit("1.1/users/show", self.fetcher.get_user_object, args=(user,)) for user in [1, "2", "3"]]
+        self.assertEqual([future.result(timeout=5).screen_name for future in futures], ["user1", "user2", "user3"])
+        self.assertEqual([path for path, _ in adapter.requests], ["/1.1/users/lookup.json"])
+        # a single lookup requests the user directly
+        adapter.requests = list()
+        self.assertEqual(self.fetcher.get_user_object(10).id, 10)
+        self.assertEqual([path for path, _ in adapter.requests], ["/1.1/users/show.json"])
+        # a single unavailable Tweet is requested directly to raise the proper error
+        adapter.requests = list()
+        with self.assertRaises(tweepy.errors.NotFound):
+            self.fetcher.get_tweet_object(4)
+        self.assertEqual([path for path, _ in adapter.requests], ["/1.1/statuses/show.json"])
+
+    def test_unavailable(self):
+        adapter = LookupAdapter(available={1, 2}, suspended={3})
+        for session in self.fetcher.pool.credentials[0].sessions:
+            session.mount("https://", adapter)
+        # the v2 endpoint tells why users are missing in the bulk response
+        user_objs = self.fetcher.get_user_objects([1, "2", 3, 4])
+        self.assertEqual([user_objs[user].id for user in [1, "2"]], [1, 2])
+        self.assertEqual([user_objs[3], user_objs[4]], [Unavailable("user_id", 3, "suspended"), Unavailable("user_id", 4, "not_found")])
+        self.assertEqual([path for path, _ in adapter.requests], ["/1.1/users/lookup.json", "/2/users"])
+        # known unavailable users are not requested again
+        adapter.requests = list()
+        self.assertEqual(self.fetcher.get_user_objects([3, 4]), {3: Unavailable("user_id", 3, "suspended"), 4: Unavailable("user_id", 4, "not_found")})
+        with self.assertRaises(UnavailableError) as context:
+            self.fetcher.get_user_object("3")
+        self.assertEqual(context.exception.status, "suspended")
+        self.assertEqual(adapter.requests, list())
+        # single lookups are remembered, too
+        with self.assertRaises(tweepy.errors.NotFound):
+            self.fetcher.get_tweet_object(5)
+        self.assertEqual(self.fetcher.unavailable.get("tweet", 5), "not_found")
+        self.assertEqual(self.fetcher.get_tweet_objects([5]), {5: Unavailable("tweet", 5, "not_found")})
+        self.assertEqual(len(adapter.requests), 1)
+
+    def test_unauthorized(self):
+        adapter = LookupAdapter(available={1}, unauthorized=True)
+        for session in self.fetcher.pool.credentials[0].sessions:
+            session.mount("https://", adapter)
+        # rejected tokens do not make users or Tweets unavailable
+        with self.assertRaises(tweepy.errors.Unauthorized):
+            self.fetcher.get_user_object(1)
+        with self.assertRaises(tweepy.errors.Unauthorized):
+            self.fetcher.get_tweet_objects([2, 3])
+        self.assertEqual(len(self.fetcher.unavailable), 0)
+        adapter.unauthorized = False
+        self.assertEqual(self.fetcher.get_user_object(1).id, 1)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PySNATestCase
+from test_pool import FakeAdapter
+
+from pysna.coalesce import SingleFlight, flight_key
+from pysna.pool import CredentialPool
+
+
+class SlowAdapter(FakeAdapter):
+    """FakeAdapter that answers after a delay, so identical requests overlap."""
+
+    def send(self, request, **kwargs):
+        time.sleep(0.2)
+        return super().send(request, **kwargs)
+
+
+class TestSingleFlight(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.flight = SingleFlight()
+        self.calls = list()
+
+    def _slow(self, value):
+        self.calls.append(value)
+        time.sleep(0.2)
+        return value * 2
+
+    def test_flight_key(self):
+        self.assertEqual(flight_key("get_users", ([1, 2],), {"a": 1, "b": 2}), flight_key("get_users", ([1, 2],), {"b": 2, "a": 1}))
+        self.assertNotEqual(flight_key("get_users", ([1, 2],), dict()), flight_key("get_users", ([2, 1],), dict()))
+
+    def test_threads(self):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(self.flight.do, "key", self._slow, 1) for _ in range(5)]
+            other = executor.submit(self.flight.do, "other", self._slow, 2)
+        self.assertEqual([future.result() for future in futures], [2] * 5)
+        self.assertEqual(other.result(), 4)
+        self.assertEqual(sorted(self.calls), [1, 2])
+        self.assertEqual(self.flight.coalesced, 4)
+        # finished calls are not cached
+        self.assertEqual(self.flight.do("key", self._slow, 1), 2)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_shared_error(self):
+        barrier = threading.Barrier(3)
+
+        def fail():
+            self.calls.append(1)
+            time.sleep(0.2)
+            raise ValueError("Failed")
+
+        def run():
+            barrier.wait()
+            with self.assertRaises(ValueError):
+                self.flight.do("key", fail)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_private_error(self):
+        flight = SingleFlight(private_errors=(TimeoutError,))
+        barrier = threading.Barrier(3)
+
+        def call():
+            self.calls.append(1)
+            time.sleep(0.2)
+            # only the first call fails due to its own context
+            if len(self.calls) == 1:
+                raise TimeoutError("Deadline of the first caller")
+            return 1
+
+        def run():
+            barrier.wait()
+            return flight.do("key", call)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(run) for _ in range(3)]
+        results = [future.exception() or future.result() for future in futures]
+        # the waiting callers repeated the call instead of receiving the error
+        self.assertEqual(sum(isinstance(result, TimeoutError) for result in results), 1)
+        self.assertEqual(results.count(1), 2)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_async(self):
+        async def fetch(value):
+            self.calls.append(value)
+            await asyncio.sleep(0.2)
+            return value * 2
+
+        async def main():
+            coroutines = [self.flight.do_async("coroutine", fetch, 1) for _ in range(3)]
+            blocking = [self.flight.do_async("blocking", self._slow, 2) for _ in range(3)]
+            return await asyncio.gather(*coroutines, *blocking)
+
+        self.assertEqual(asyncio.run(main()), [2, 2, 2, 4, 4, 4])
+        self.assertEqual(sorted(self.calls), [1, 2])
+
+    def test_pool(self):
+        pool = CredentialPool([{"bearer_token": "token"}], wait_on_rate_limit=False)
+        adapter = SlowAdapter(15)
+        for session in pool.credentials[0].sessions:
+            session.mount("https://", adapter)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = [executor.submit(pool.api.get_follower_ids, user_id=1) for _ in range(3)]
+            manual = [executor.submit(pool.request, "GET", "https://api.twitter.com/2/tweets?ids=1") for _ in range(3)]
+        self.assertEqual([future.result() for future in ids], [[1, 2]] * 3)
+        self.assertEqual([future.result().status_code for future in manual], [200] * 3)
+        # one request per distinct call
+        self.assertEqual(len(adapter.requests), 2)
+
+    def test_fetcher_async(self):
+        self.fetcher.get_user_follower_ids = lambda user: self._slow(user)
+
+        async def main():
+            return await asyncio.gather(*[self.fetcher.run_async("get_user_follower_ids", 1) for _ in range(3)])
+
+        self.assertEqual(asyncio.run(main()), [2, 2, 2])
+        self.assertEqual(self.calls, [1])
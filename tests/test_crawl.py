@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import tempfile
+import time
+
+import requests
+import tweepy
+from config import PySNATestCase
+
+from pysna.crawl import EgoNetworkCrawler
+from pysna.retry import CircuitOpenError, DeadlineExceeded, RateLimitError
+
+# simulated followees and followers counts
+followees = {1: [2, 3, 4], 2: [1, 5], 3: [6], 4: [7, 8], 5: [9], 6: [1]}
+followers_counts = {1: 10, 2: 20, 3: 30, 4: 10**7, 5: 5, 6: 1, 7: 1, 8: 1, 9: 1}
+
+
+class FakeAPI:
+    """Simulates the v1.1 endpoints used by the crawler with one-ID pages and a single rate limit on friends/ids."""
+
+    def __init__(self):
+        self.requests = {"friends/ids": 0, "users/lookup": 0}
+        self.rate_limited = False
+
+    def get_friend_ids(self, user_id, cursor, return_cursors):
+        self.requests["friends/ids"] += 1
+        if self.requests["friends/ids"] == 3 and not self.rate_limited:
+            self.rate_limited = True
+            response = requests.Response()
+            response.status_code = 429
+            response.headers["x-rate-limit-reset"] = str(int(time.time()) + 1)
+            raise tweepy.errors.TooManyRequests(response)
+        ids = followees.get(user_id, list())
+        position = 0 if cursor == -1 else cursor
+        next_cursor = position + 1 if position + 1 < len(ids) else 0
+        return ids[position:][:1], (0, next_cursor)
+
+    def lookup_users(self, user_id=None, screen_name=None):
+        self.requests["users/lookup"] += 1
+        # screen names are case-insensitive and returned in their original case
+        users = user_id if user_id is not None else [name.lower().removeprefix("user") for name in screen_name]
+        return [tweepy.models.User.parse(None, {"id": int(user), "screen_name": f"User{user}", "followers_count": followers_counts[int(user)], "friends_count": len(followees.get(int(user), [])), "protected": False}) for user in users]
+
+
+class FailingAPI(FakeAPI):
+    """Raises the given errors on the first friends/ids requests instead of a 429 response."""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.rate_limited = True
+        self.errors = errors
+
+    def get_friend_ids(self, user_id, cursor, return_cursors):
+        if self.errors:
+            self.requests["friends/ids"] += 1
+            raise self.errors.pop(0)
+        return super().get_friend_ids(user_id, cursor, return_cursors)
+
+
+class TestEgoNetworkCrawler(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fetcher.api = FakeAPI()
+        self.fetcher._wait_on_rate_limit = False
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_crawl(self):
+        crawler = EgoNetworkCrawler(self.fetcher, self.tmp_dir.name, depth=2, max_followers_count=1000)
+        crawler.add_seeds([1])
+        graph = crawler.run()
+        sources, targets = graph.edges()
+        edges = set(zip(graph.ids[sources].tolist(), graph.ids[targets].tolist()))
+        # seed and its followees are expanded, except the account with too many followers
+        self.assertSetEqual(edges, {(1, 2), (1, 3), (1, 4), (2, 1), (2, 5), (3, 6)})
+        self.assertDictEqual(crawler.progress(), {"calls": 10, "edges": 6, "frontier": 0, "pending": 0})
+        # users were scored while friends/ids was rate limited
+        self.assertDictEqual(self.fetcher.api.requests, {"friends/ids": 7, "users/lookup": 3})
+
+    def test_resume(self):
+        crawler = EgoNetworkCrawler(self.fetcher, self.tmp_dir.name, depth=2, max_followers_count=1000, budget=4)
+        crawler.add_seeds(["1"])
+        crawler.run()
+        self.assertEqual(crawler.calls, 4)
+        # a new crawler continues from the persisted frontier
+        resumed = EgoNetworkCrawler(self.fetcher, self.tmp_dir.name, depth=2, max_followers_count=1000)
+        self.assertEqual(resumed.edge_count, crawler.edge_count)
+        graph = resumed.run()
+        self.assertEqual(graph.num_edges, 6)
+        self.assertEqual(resumed.progress()["frontier"], 0)
+
+    def test_request_errors(self):
+        self.fetcher.api = FailingAPI([DeadlineExceeded("deadline"), CircuitOpenError("open"), RateLimitError("exhausted")])
+        self.fetcher.retry.recovery_time = 0.1
+        crawler = EgoNetworkCrawler(self.fetcher, self.tmp_dir.name, depth=2, max_followers_count=1000)
+        crawler.add_seeds([1])
+        # the crawl stops at the deadline and resumes later
+        crawler.run()
+        self.assertEqual(crawler.edge_count, 0)
+        self.assertEqual(crawler.progress()["frontier"], 1)
+        # open circuits and exhausted credentials pause the endpoints
+        graph = crawler.run()
+        self.assertEqual(graph.num_edges, 6)
+        self.assertEqual(self.fetcher.api.requests["friends/ids"], 9)
+
+    def test_screen_name_seeds(self):
+        crawler = EgoNetworkCrawler(self.fetcher, self.tmp_dir.name, depth=1, max_followers_count=1000)
+        # the seed is returned as "User1"
+        crawler.add_seeds(["user1"])
+        graph = crawler.run()
+        self.assertEqual(graph.num_edges, 3)
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
+import json
 import pickle
+import tempfile
 
+import numpy as np
+import requests
 import tweepy
 from config import PySNATestCase, tape
 
+from pysna.store import TimelineStore
+
 test_user_id_1 = 24677217
 test_username_1 = "WWU_Muenster"
 
@@ -333,3 +339,127 @@ class TestTwitterDataFetcher(PySNATestCase):
         # ensure expected response
         self.assertDictEqual(cassette_response_1, expected_response)
         self.assertDictEqual(cassette_response_2, expected_response)
+
+    def test_get_common_follower_ids(self):
+        # simulated follower lists of a small, a medium, and a large account
+        followers = {"small": set(range(0, 300)), "medium": set(range(0, 30000, 2)), "large": set(range(0, 200000, 3))}
+        requests = {"relationship": 0, "pages": 0}
+
+        def get_user_objects(users):
+            return {user: tweepy.models.User.parse(None, {"id": 1, "followers_count": len(followers[user])}) for user in users}
+
+        def cursor_pages(method, screen_name):
+            for page in np.array_split(sorted(followers[screen_name]), -(-len(followers[screen_name]) // self.fetcher.FOLLOWER_IDS_PAGE_SIZE)):
+                requests["pages"] += 1
+                yield page.tolist()
+
+        def get_relationship(source_user, target_user):
+            requests["relationship"] += 1
+            return {"source": {"following": source_user in followers[target_user]}}
+
+        self.fetcher.get_user_objects = get_user_objects
+        self.fetcher._cursor_pages = cursor_pages
+        self.fetcher.get_relationship = get_relationship
+        results = self.fetcher.get_common_follower_ids(["large", "small", "medium"])
+        # ensure same results as intersecting the complete follower lists
+        self.assertSetEqual(results, set.intersection(*followers.values()))
+        # the large follower list is not requested completely
+        self.assertLess(requests["pages"], 1 + 3 + 40)
+
+    def test_get_common_follower_ids_unavailable(self):
+        followers = {"small": {1, 2, 3, 4}, "large": set(range(0, 10**6))}
+
+        def get_relationship(source_user, target_user):
+            # suspended and deleted accounts are rejected as source users
+            response = requests.Response()
+            response.status_code = 403 if source_user == 2 else 404
+            response._content = json.dumps({"errors": [{"code": 63 if source_user == 2 else 50, "message": "User is unavailable."}]}).encode("utf-8")
+            if source_user in (2, 3):
+                raise tweepy.errors.Forbidden(response) if source_user == 2 else tweepy.errors.NotFound(response)
+            return {"source": {"following": source_user in followers[target_user]}}
+
+        self.fetcher.get_user_objects = lambda users: {user: tweepy.models.User.parse(None, {"id": 1, "followers_count": len(followers[user])}) for user in users}
+        self.fetcher.get_user_follower_ids = lambda user: followers[user]
+        self.fetcher.get_relationship = get_relationship
+        # unavailable candidates are missing in the follower lists, too
+        self.assertSetEqual(self.fetcher.get_common_follower_ids(["small", "large"]), {1, 4})
+
+    def test_get_tweets_entities(self):
+        requested = list()
+
+        def manual_request(url, additional_fields=None):
+            requested.append(additional_fields["ids"])
+            return {"data": [{"id": tweet_id, "entities": {"hashtags": [{"tag": "test"}]}} for tweet_id in additional_fields["ids"] if tweet_id != "7"]}
+
+        self.fetcher._manual_request = manual_request
+        results = self.fetcher.get_tweets_entities(list(range(250)))
+        # 250 Tweets are requested in three batches, unavailable Tweets are omitted
+        self.assertListEqual([len(batch) for batch in requested], [100, 100, 50])
+        self.assertEqual(len(results), 249)
+        self.assertDictEqual(results[0], {"id": "0", "entities": {"hashtags": [{"tag": "test"}]}})
+
+    def test_sync_timelines(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = TimelineStore(tmp_dir)
+            likes = [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
+            requested = {"pages": 0, "params": None}
+
+            def iter_pages(func, params, response_attribute="data", page_attribute=None):
+                for page in likes:
+                    requested["pages"] += 1
+                    yield page
+
+            def paginate(func, params, limit=None, response_attribute="data", page_attribute=None):
+                requested["params"] = dict(params)
+                return [12, 11] if "since_id" in params else [10, 9]
+
+            self.fetcher._iter_pages = iter_pages
+            self.fetcher._paginate = paginate
+            # initial synchronization requests all pages
+            self.assertListEqual(self.fetcher.get_liked_tweets_ids(test_user_id_1, store=store).tolist(), [9, 8, 7, 6, 5, 4, 3, 2, 1])
+            self.assertEqual(requested["pages"], 3)
+            # later synchronizations stop at the first known Tweet
+            likes.insert(0, [11, 10])
+            requested["pages"] = 0
+            self.assertListEqual(self.fetcher.get_liked_tweets_ids(test_user_id_1, store=store).tolist()[:3], [11, 10, 9])
+            self.assertEqual(requested["pages"], 2)
+            # composed Tweets are requested since the newest stored Tweet
+            self.assertListEqual(self.fetcher.get_composed_tweets_ids(test_user_id_1, store=store).tolist(), [10, 9])
+            self.assertNotIn("since_id", requested["params"])
+            self.assertListEqual(self.fetcher.get_composed_tweets_ids(test_user_id_1, store=store).tolist(), [12, 11, 10, 9])
+            self.assertEqual(requested["params"]["since_id"], 10)
+            # truncated synchronizations would leave gaps in the stored timelines
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.fetcher.get_liked_tweets_ids(test_user_id_1, limit=1, store=store)
+                with self.assertRaises(ValueError):
+                    self.fetcher.get_composed_tweets_ids(test_user_id_1, limit=1, store=store)
+            self.assertListEqual(store.read(f"liked_tweets_{test_user_id_1}").tolist()[:3], [11, 10, 9])
+            self.assertEqual(store.newest_id(f"composed_tweets_{test_user_id_1}"), 12)
+
+    def test_get_composed_tweets_texts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = TimelineStore(tmp_dir)
+            requested = list()
+
+            def paginate(func, params, limit=None, response_attribute="data", page_attribute=None):
+                requested.append(dict(params))
+                if "since_id" in params:
+                    return [tweepy.Tweet({"id": "3", "text": "new", "created_at": "2023-01-03T00:00:00.000Z"})]
+                long_tweet = {"id": "2", "text": "truncated", "created_at": "2023-01-02T00:00:00.000Z", "note_tweet": {"text": "complete text"}}
+                return [tweepy.Tweet(long_tweet), tweepy.Tweet({"id": "1", "text": "short", "created_at": "2023-01-01T00:00:00.000Z"})][:limit]
+
+            self.fetcher._paginate = paginate
+            # long Tweets are returned with their complete text, Retweets are excluded
+            tweets = self.fetcher.get_composed_tweets_texts(test_user_id_1)
+            self.assertListEqual([tweet["text"] for tweet in tweets], ["complete text", "short"])
+            self.assertNotIn("note_tweet", tweets[0])
+            self.assertIn("note_tweet", requested[0]["tweet_fields"])
+            self.assertEqual(requested[0]["exclude"], ["retweets"])
+            # the texts are kept in the store and only newer Tweets are requested
+            self.assertListEqual([tweet["id"] for tweet in self.fetcher.get_composed_tweets_texts(test_user_id_1, store=store)], ["2", "1"])
+            tweets = self.fetcher.get_composed_tweets_texts(test_user_id_1, store=store)
+            self.assertEqual(requested[-1]["since_id"], 2)
+            self.assertListEqual([tweet["text"] for tweet in tweets], ["new", "complete text", "short"])
+            with self.assertRaises(ValueError):
+                self.fetcher.get_composed_tweets_texts(test_user_id_1, limit=1, store=store)
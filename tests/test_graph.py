@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+import numpy as np
+from config import PySNATestCase
+
+from pysna.graph import EngagementGraph, FollowerGraph
+from pysna.process import IDSet
+
+test_user_id_1 = 24677217
+test_user_id_2 = 38180826
+test_user_id_3 = 160286320
+
+
+class TestFollowerGraph(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        # 1 <-> 2 <-> 3 <-> 1 form a mutual triangle, 4 and 5 only follow 1
+        self.graph = FollowerGraph.from_edges([1, 2, 2, 3, 3, 1, 4, 5, 5, 5], [2, 1, 3, 2, 1, 3, 1, 1, 1, 5])
+
+    def test_from_edges(self):
+        # duplicated edges and self-loops are removed
+        self.assertEqual(self.graph.num_nodes, 5)
+        self.assertEqual(self.graph.num_edges, 8)
+        self.assertListEqual(self.graph.ids.tolist(), [1, 2, 3, 4, 5])
+        self.assertListEqual(self.graph.index_of([3, 5]).tolist(), [2, 4])
+        with self.assertRaises(KeyError):
+            self.graph.index_of([6])
+        with self.assertRaises(ValueError):
+            FollowerGraph.from_edges([1, 2], [3])
+
+    def test_from_id_lists(self):
+        followers = {test_user_id_1: IDSet([1, 2]), test_user_id_2: np.array([2])}
+        followees = {test_user_id_1: [test_user_id_3]}
+        graph = FollowerGraph.from_id_lists(followers=followers, followees=followees)
+        sources, targets = graph.edges()
+        edges = set(zip(graph.ids[sources].tolist(), graph.ids[targets].tolist()))
+        self.assertSetEqual(edges, {(1, test_user_id_1), (2, test_user_id_1), (2, test_user_id_2), (test_user_id_1, test_user_id_3)})
+
+    def test_degree_and_reciprocity(self):
+        self.assertListEqual(self.graph.in_degree().tolist(), [4, 2, 2, 0, 0])
+        self.assertListEqual(self.graph.out_degree().tolist(), [2, 2, 2, 1, 1])
+        self.assertListEqual(self.graph.transpose().out_degree().tolist(), [4, 2, 2, 0, 0])
+        # 6 of 8 edges are mutual
+        self.assertAlmostEqual(self.graph.reciprocity(), 0.75)
+
+    def test_pagerank(self):
+        pagerank = self.graph.pagerank()
+        self.assertAlmostEqual(pagerank.sum(), 1.0)
+        # the user followed by everyone ranks highest
+        self.assertEqual(int(np.argmax(pagerank)), 0)
+        self.assertAlmostEqual(pagerank[3], pagerank[4])
+
+    def test_core_number(self):
+        self.assertListEqual(self.graph.core_number().tolist(), [2, 2, 2, 1, 1])
+        metrics = self.graph.metrics()
+        self.assertDictEqual({key: value for key, value in metrics[4].items() if key != "pagerank"}, {"in_degree": 0, "out_degree": 1, "core_number": 1})
+
+    def test_communities(self):
+        # two dense groups connected by a single edge
+        rng = np.random.default_rng(0)
+        groups = [np.arange(0, 50), np.arange(100, 150)]
+        sources = np.concatenate([rng.choice(group, 600) for group in groups] + [[0]])
+        targets = np.concatenate([rng.choice(group, 600) for group in groups] + [[100]])
+        graph = FollowerGraph.from_edges(sources, targets)
+        communities = graph.communities(seed=0, workers=2)
+        self.assertSetEqual(set(communities.keys()), set(graph.ids.tolist()))
+        self.assertEqual(len({communities[user] for user in groups[0].tolist()}), 1)
+        self.assertEqual(len({communities[user] for user in groups[1].tolist()}), 1)
+        self.assertNotEqual(communities[0], communities[100])
+
+
+class TestEngagementGraph(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.graph = EngagementGraph(os.path.join(self.tmp_dir.name, "engagements.bin"))
+        self.graph.add(100, [1, 2, 3], "like")
+        self.graph.add(100, IDSet([3, 4]), "retweet")
+        self.graph.add(200, np.array([1, 2]), "like")
+        self.graph.add(300, [2, 4], "quote")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_add(self):
+        self.assertEqual(len(self.graph), 9)
+        self.graph.add(200, [1], "like")
+        # duplicated edges are ignored
+        self.assertEqual(len(self.graph), 9)
+        with self.assertRaises(ValueError):
+            self.graph.add(200, [1], "reply")
+        # edges are loaded from the file
+        self.assertEqual(len(EngagementGraph(self.graph.path)), 9)
+
+    def test_co_engagement(self):
+        first, second, counts = self.graph.co_engagement()
+        pairs = dict(zip(zip(first.tolist(), second.tolist()), counts.tolist()))
+        # user 3 liked and retweeted tweet 100, which is counted once
+        self.assertDictEqual(pairs, {(1, 2): 2, (1, 3): 1, (1, 4): 1, (2, 3): 1, (2, 4): 2, (3, 4): 1})
+        first, second, counts = self.graph.co_engagement(interactions=["like"], min_count=2)
+        self.assertListEqual(list(zip(first.tolist(), second.tolist(), counts.tolist())), [(1, 2, 2)])
+
+    def test_top_co_engagers(self):
+        self.assertListEqual(self.graph.top_co_engagers(2, n=2), [(1, 2), (4, 2)])
+        self.assertListEqual(self.graph.top_co_engagers(4, interactions=["retweet"]), [(3, 1)])
+        with self.assertRaises(KeyError):
+            self.graph.top_co_engagers(5)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import tempfile
+
+from config import PySNATestCase
+
+from pysna.poll import PublicMetricsPoller
+from pysna.store import MetricsStore
+
+
+class TestPublicMetricsPoller(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MetricsStore(self.tmp_dir.name)
+        self.requests = list()
+        self.likes = {tweet_id: 0 for tweet_id in range(1, 152)}
+
+        def get_tweets_public_metrics(tweet_ids):
+            self.requests.append(len(tweet_ids))
+            # Tweet 150 was deleted
+            return {tweet_id: {"like_count": self.likes[tweet_id], "created_at": "1970-01-01T00:00:00.000Z"} for tweet_id in tweet_ids if tweet_id != 150}
+
+        self.fetcher.get_tweets_public_metrics = get_tweets_public_metrics
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_poll(self):
+        poller = PublicMetricsPoller(self.fetcher, self.store, min_interval=60, max_interval=3600, age_factor=0.1, velocity_threshold=1)
+        poller.track(range(1, 151))
+        # all Tweets are due
+        self.assertEqual(poller.poll(now=600.0), 149)
+        self.assertListEqual(self.requests, [150])
+        self.assertEqual(len(self.store), 149)
+        self.assertNotIn(150, poller.tweet_ids)
+        # the interval is 10% of the Tweet age
+        self.assertEqual(poller.next_due(), 660.0)
+        self.assertEqual(poller.poll(now=630.0), 0)
+        # a new Tweet is due, the batch is filled with Tweets that are due soon
+        poller.track([151])
+        self.assertEqual(poller.poll(now=640.0), 100)
+        self.assertEqual(poller._due[poller.tweet_ids == 151][0], 704.0)
+        # fast growing Tweets are polled more often, unchanged Tweets less often
+        self.likes[1] = 100
+        self.assertEqual(poller.poll(now=700.0), 100)
+        # the halved interval is limited by min_interval
+        self.assertEqual(poller._due[poller.tweet_ids == 1][0], 700.0 + 60.0)
+        self.assertEqual(poller._due[poller.tweet_ids == 100][0], 700.0 + 2 * 60.0)
+        self.assertDictEqual({tweet_id: rate for tweet_id, rate in self.store.growth_rates().items() if rate}, {1: 3600.0})
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import tweepy
+from config import PySNATestCase
+
+from pysna.fetch import TwitterDataFetcher
+from pysna.pool import CredentialPool, endpoint_of
+from pysna.retry import DeadlineExceeded, RateLimitError
+from pysna.store import RateLimitStore
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    """Simulates the Twitter API with a fixed number of requests per window and endpoint for one credential."""
+
+    def __init__(self, quota, reset=None):
+        super().__init__()
+        self.quota = quota
+        self.remaining = dict()
+        self.reset = reset or int(time.time()) + 900
+        self.requests = list()
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        # refill the quota after the window was reset
+        if time.time() >= self.reset:
+            self.remaining, self.reset = dict(), int(time.time()) + 900
+        endpoint = endpoint_of(request.url)
+        remaining = self.remaining.setdefault(endpoint, self.quota)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        if remaining > 0:
+            remaining = self.remaining[endpoint] = remaining - 1
+            response.status_code = 200
+            body = {"ids": [1, 2], "next_cursor": 0, "previous_cursor": 0} if "1.1" in request.url else {"data": [{"id": "1", "text": "Tweet"}]}
+        else:
+            response.status_code = 429
+            body = {"errors": [{"code": 88, "message": "Rate limit exceeded"}]}
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers.update({"x-rate-limit-limit": str(self.quota), "x-rate-limit-remaining": str(remaining), "x-rate-limit-reset": str(self.reset)})
+        return response
+
+    def close(self):
+        pass
+
+
+class TestCredentialPool(PySNATestCase):
+
+    maxDiff = None
+
+    def _pool(self, quotas, wait_on_rate_limit=False, reset=None, state=None):
+        pool = CredentialPool([{"bearer_token": f"token{idx}"} for idx in range(len(quotas))], wait_on_rate_limit=wait_on_rate_limit, state=state)
+        adapters = list()
+        for credential, quota in zip(pool.credentials, quotas):
+            adapter = FakeAdapter(quota, reset=reset)
+            for session in credential.sessions:
+                session.mount("https://", adapter)
+            adapters.append(adapter)
+        return pool, adapters
+
+    def test_endpoint_of(self):
+        self.assertEqual(endpoint_of("https://api.twitter.com/1.1/followers/ids.json?user_id=1"), "1.1/followers/ids")
+        self.assertEqual(endpoint_of("https://api.twitter.com/2/users/44196397/liked_tweets?max_results=100"), "2/users/:id/liked_tweets")
+        self.assertEqual(endpoint_of("https://api.twitter.com/2/users/by/username/elonmusk"), "2/users/by/username/:username")
+
+    def test_routing(self):
+        pool, adapters = self._pool([2, 5])
+        # all requests of both credentials are used without a rejected request
+        for _ in range(7):
+            self.assertEqual(pool.api.get_follower_ids(user_id=1), [1, 2])
+        self.assertEqual([len(adapter.requests) for adapter in adapters], [2, 5])
+        self.assertEqual([limits["1.1/followers/ids"]["remaining"] for limits in pool.limits()], [0, 0])
+        # other endpoints still have quota
+        self.assertEqual(pool.client.get_users_tweets(1).data[0].id, 1)
+        # every credential is exhausted, so the request is not made
+        requests_made = sum(len(adapter.requests) for adapter in adapters)
+        with self.assertRaises(RateLimitError):
+            pool.api.get_follower_ids(user_id=1)
+        self.assertEqual(sum(len(adapter.requests) for adapter in adapters), requests_made)
+
+    def test_retry_rate_limited(self):
+        pool, adapters = self._pool([1, 3])
+        # quota of the first credential is unknown until it is rejected
+        adapters[0].remaining["1.1/followers/ids"] = 0
+        for _ in range(3):
+            pool.api.get_follower_ids(user_id=1)
+        self.assertEqual([len(adapter.requests) for adapter in adapters], [1, 3])
+
+    def test_wait_on_rate_limit(self):
+        pool, adapters = self._pool([1, 1], wait_on_rate_limit=True, reset=int(time.time()) + 1)
+        for _ in range(3):
+            pool.api.get_follower_ids(user_id=1)
+        self.assertEqual(sum(len(adapter.requests) for adapter in adapters), 3)
+
+    def test_cursor(self):
+        pool, _ = self._pool([5])
+        self.assertEqual(list(tweepy.Cursor(pool.api.get_follower_ids, user_id=1).items()), [1, 2])
+
+    def test_manual_request(self):
+        fetcher = TwitterDataFetcher(credentials=[{"bearer_token": "token0"}, {"bearer_token": "token1"}], wait_on_rate_limit=False)
+        adapters = list()
+        for credential, quota in zip(fetcher.pool.credentials, [1, 1]):
+            adapters.append(FakeAdapter(quota))
+            for session in credential.sessions:
+                session.mount("https://", adapters[-1])
+        for _ in range(2):
+            fetcher._manual_request("https://api.twitter.com/2/tweets", additional_fields={"ids": ["1"]})
+        self.assertEqual([adapter.requests[0].headers["Authorization"] for adapter in adapters], ["Bearer token0", "Bearer token1"])
+        with self.assertRaises(RateLimitError):
+            fetcher._manual_request("https://api.twitter.com/2/tweets", additional_fields={"ids": ["1"]})
+
+    def test_shared_state(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pool, adapters = self._pool([2], state=RateLimitStore(tmp_dir))
+            for _ in range(2):
+                pool.api.get_follower_ids(user_id=1)
+            # another process with the same credential knows that the endpoint is exhausted before requesting it
+            other_pool, other_adapters = self._pool([2], state=RateLimitStore(tmp_dir))
+            self.assertIsNone(other_pool.select("1.1/followers/ids"))
+            self.assertIsNotNone(other_pool.select("1.1/friends/ids"))
+            self.assertEqual(len(other_adapters[0].requests), 0)
+            # requests are reserved in advance across processes
+            other_pool.state.update(other_pool.credentials[0].key, "2/tweets", {"limit": 1, "remaining": 1, "reset": time.time() + 60})
+            self.assertIsNotNone(pool.select("2/tweets"))
+            self.assertIsNone(other_pool.select("2/tweets"))
+
+    def test_priority(self):
+        pool, adapters = self._pool([4])
+        # the first response reveals the limit of the window
+        pool.api.get_follower_ids(user_id=1)
+        with pool.prioritized("background"):
+            pool.api.get_follower_ids(user_id=1)
+            # background calls leave half of the window to other calls
+            with self.assertRaises(RateLimitError):
+                pool.api.get_follower_ids(user_id=1)
+        self.assertEqual(len(adapters[0].requests), 2)
+        for _ in range(2):
+            pool.api.get_follower_ids(user_id=1)
+        self.assertEqual(len(adapters[0].requests), 4)
+        # requests are left to waiting high-priority calls
+        pool._count_waiting("1.1/friends/ids", 1)
+        self.assertIsNone(pool.select("1.1/friends/ids"))
+        self.assertIsNotNone(pool.select("1.1/friends/ids", "high"))
+        pool._count_waiting("1.1/friends/ids", -1)
+
+    def test_held_back(self):
+        pool, adapters = self._pool([4], wait_on_rate_limit=True)
+        pool.api.get_follower_ids(user_id=1)
+        selections = list()
+        select = pool.select
+        pool.select = lambda *args: selections.append(args) or select(*args)
+        # calls held back by a waiting high-priority call wait until it was served instead of polling
+        pool._count_waiting("1.1/followers/ids", 1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(pool.api.get_follower_ids, user_id=1)
+            time.sleep(0.3)
+            self.assertFalse(future.done())
+            self.assertEqual(len(selections), 1)
+            pool._count_waiting("1.1/followers/ids", -1)
+            self.assertEqual(future.result(timeout=5), [1, 2])
+        self.assertEqual(len(adapters[0].requests), 2)
+        # the deadline ends the wait
+        pool._count_waiting("1.1/followers/ids", 1)
+        with self.assertRaises(DeadlineExceeded):
+            with pool.retry.deadline(0.2):
+                pool.api.get_follower_ids(user_id=1)
+        with self.assertRaises(ValueError):
+            with pool.prioritized("urgent"):
+                pass
@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 import copy
+import os
 import pickle
+import tempfile
 from datetime import datetime
 from numbers import Number
 
 import numpy as np
 from config import PySNATestCase, tape
 
+from pysna.process import (
+    EntityCooccurrence,
+    IDSet,
+    SketchIndex,
+    StreamingDescriptiveMetrics,
+)
+
 test_user_id_1 = 24677217
 test_username_1 = "WWU_Muenster"
 
@@ -62,6 +71,49 @@ class TestBaseDataProcessor(PySNATestCase):
         self.assertDictEqual(results, test_results)
         pass
 
+    def test_calc_descriptive_metrics_matrix(self):
+        # build users x metrics matrix from the test data and a scaled copy of it
+        values = list(test_dict.values())
+        matrix = np.array([values, [2 * value for value in values]]).T
+        # calc metrics for all columns at once
+        results = self.data_processor.calc_descriptive_metrics_matrix(matrix, columns=["a", "b"])
+        # assert instances
+        self.assertIsInstance(results, dict)
+        self.assertListEqual(list(results.keys()), ["a", "b"])
+        # first column must equal the single data set metrics
+        self.assertDictEqual(results["a"], self.data_processor.calc_descriptive_metrics(copy.deepcopy(test_dict))["metrics"])
+        # metrics of the scaled column
+        self.assertEqual(results["b"]["max"], 300)
+        self.assertAlmostEqual(results["b"]["std"], 2 * results["a"]["std"])
+        self.assertAlmostEqual(results["b"]["IQR"], 2 * results["a"]["IQR"])
+        # non-numeric values are not allowed
+        with self.assertRaises(ValueError):
+            self.data_processor.calc_descriptive_metrics_matrix([["a", "b"]])
+        # number of column identifiers must match
+        with self.assertRaises(ValueError):
+            self.data_processor.calc_descriptive_metrics_matrix(matrix, columns=["a"])
+
+    def test_estimate_overlap(self):
+        rng = np.random.default_rng(0)
+        set_a, set_b, set_c = set(range(0, 200000)), set(range(100000, 400000)), set(range(150000, 250000))
+        # full samples give exact results
+        results = self.data_processor.estimate_overlap({1: set_a, 2: set_b}, {1: len(set_a), 2: len(set_b)})
+        self.assertTrue(results["exact"])
+        self.assertEqual(results["common_count"]["estimate"], 100000)
+        self.assertAlmostEqual(results["jaccard"]["estimate"], 0.25)
+        results = self.data_processor.estimate_overlap({1: set_a, 2: set_b, 3: set_c}, {1: len(set_a), 2: len(set_b), 3: len(set_c)})
+        self.assertEqual(results["common_count"]["estimate"], 50000)
+        self.assertAlmostEqual(results["jaccard"]["estimate"], 0.125)
+        # samples only give point estimates
+        samples = {key: set(rng.choice(sorted(values), len(values) // 10, replace=False).tolist()) for key, values in {1: set_a, 2: set_b}.items()}
+        results = self.data_processor.estimate_overlap(samples, {1: len(set_a), 2: len(set_b)})
+        self.assertFalse(results["exact"])
+        self.assertNotIn("lower", results["common_count"])
+        self.assertAlmostEqual(results["common_count"]["estimate"], 100000, delta=30000)
+        self.assertAlmostEqual(results["jaccard"]["estimate"], 0.25, delta=0.1)
+        with self.assertRaises(ValueError):
+            self.data_processor.estimate_overlap({1: set_a}, {1: len(set_a)})
+
     def test_calc_datetime_metrics(self):
         # calc metrics
         results = self.data_processor.calc_datetime_metrics(copy.deepcopy(test_dates))
@@ -147,6 +199,33 @@ class TestTwitterDataProcessor(PySNATestCase):
         self.assertIsInstance(function_response, dict)
         self.assertEqual(function_response["label"], "positive")
 
+    def test_detect_tweets_sentiment(self):
+        function_response = self.data_processor.detect_tweets_sentiment([test_tweet, "This is terrible."])
+        self.assertEqual(len(function_response), 2)
+        self.assertDictEqual(function_response[0], self.data_processor.detect_tweet_sentiment(test_tweet))
+        self.assertEqual(function_response[1]["label"], "negative")
+
+    def test_calc_sentiment_profile(self):
+        tweets = [
+            {"id": "1", "text": "I love it", "created_at": "2023-01-02T10:00:00.000Z"},
+            {"id": "2", "text": "I hate it", "created_at": "2023-01-08T23:00:00.000Z"},
+            {"id": "3", "text": "This is terrible.", "created_at": "2023-01-09T01:00:00.000Z"},
+        ]
+        cache = dict()
+        profile = self.data_processor.calc_sentiment_profile(tweets[:2], cache=cache)
+        self.assertEqual(profile["tweets"], 2)
+        self.assertDictEqual(profile["distribution"], {"positive": 1, "neutral": 0, "negative": 1})
+        self.assertEqual(list(profile["series"].keys()), ["2023-01-02"])
+        # cached Tweets are not scored again
+        cache[1]["label"] = "neutral"
+        profile = self.data_processor.calc_sentiment_profile(tweets, cache=cache)
+        self.assertEqual(sorted(cache.keys()), [1, 2, 3])
+        self.assertDictEqual(profile["distribution"], {"positive": 0, "neutral": 1, "negative": 2})
+        self.assertDictEqual(profile["series"]["2023-01-09"], {"count": 1, "mean_compound": cache[3]["compound"], "positive": 0, "neutral": 0, "negative": 1})
+        self.assertEqual(list(self.data_processor.calc_sentiment_profile(tweets, frequency="month", cache=cache)["series"].keys()), ["2023-01-01"])
+        with self.assertRaises(ValueError):
+            self.data_processor.calc_sentiment_profile(tweets, frequency="hour")
+
     @tape.use_cassette("tests/cassettes/calc_similarity_users.yaml")
     def test_calc_similarity_users(self):
         # get serialized user objects first
@@ -176,3 +255,175 @@ class TestTwitterDataProcessor(PySNATestCase):
         with open("tests/fixtures/calc_similarity_tweets.pickle", "rb") as handle:
             test_results = pickle.load(handle)
         self.assertDictEqual(results, test_results)
+
+
+class TestStreamingDescriptiveMetrics(PySNATestCase):
+
+    maxDiff = None
+
+    def test_streaming_metrics(self):
+        rng = np.random.default_rng(0)
+        data = rng.normal(loc=[10, -5], scale=[2, 4], size=(5000, 2))
+        # feed the data in batches
+        stream = StreamingDescriptiveMetrics(columns=["x", "y"], sample_size=1000, seed=0)
+        for batch in np.array_split(data, 7):
+            stream.update(batch)
+        # single observations are supported as well
+        stream.update([10, -5])
+        data = np.vstack([data, [10, -5]])
+        results = stream.metrics()
+        self.assertEqual(stream.count, data.shape[0])
+        # exact metrics
+        for idx, column in enumerate(["x", "y"]):
+            self.assertAlmostEqual(results[column]["mean"], data[:, idx].mean())
+            self.assertAlmostEqual(results[column]["var"], data[:, idx].var())
+            self.assertEqual(results[column]["max"], data[:, idx].max())
+            self.assertEqual(results[column]["min"], data[:, idx].min())
+        # approximated metrics
+        self.assertAlmostEqual(results["x"]["median"], np.median(data[:, 0]), delta=0.3)
+        self.assertAlmostEqual(results["y"]["IQR"], np.subtract(*np.percentile(data[:, 1], [75, 25])), delta=0.8)
+
+    def test_streaming_metrics_without_data(self):
+        stream = StreamingDescriptiveMetrics(columns=["x"])
+        with self.assertRaises(ValueError):
+            stream.metrics()
+
+
+class TestIDSet(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(0)
+        # dense chunk (bitmap container), sparse chunks (array containers) and large Twitter IDs
+        self.set_a = set(range(0, 20000, 2)) | set(rng.integers(0, 2**62, 3000).tolist())
+        self.set_b = set(range(0, 20000, 3)) | set(rng.integers(0, 2**62, 3000).tolist()) | set(list(self.set_a)[:500])
+
+    def test_set_operations(self):
+        id_set_a, id_set_b = IDSet(self.set_a), IDSet(self.set_b)
+        # cardinality and membership
+        self.assertEqual(len(id_set_a), len(self.set_a))
+        self.assertIn(19998, id_set_a)
+        self.assertNotIn(19999, id_set_a)
+        self.assertNotIn(-1, id_set_a)
+        # set operations must equal the results for Python sets
+        self.assertListEqual((id_set_a | id_set_b).to_list(), sorted(self.set_a | self.set_b))
+        self.assertListEqual((id_set_a & id_set_b).to_list(), sorted(self.set_a & self.set_b))
+        self.assertListEqual((id_set_a - id_set_b).to_list(), sorted(self.set_a - self.set_b))
+        self.assertListEqual((id_set_b - id_set_a).to_list(), sorted(self.set_b - self.set_a))
+        self.assertEqual(id_set_a, self.set_a)
+        # compressed representation is smaller than the Python set
+        self.assertLess(id_set_a.nbytes, len(self.set_a) * 8)
+
+    def test_update(self):
+        id_set = IDSet([5, 1])
+        id_set.update(range(70000))
+        id_set.update(IDSet([2**40]))
+        self.assertEqual(len(id_set), 70001)
+        self.assertListEqual(list(id_set)[-2:], [69999, 2**40])
+        with self.assertRaises(ValueError):
+            IDSet([-1])
+
+    def test_processor_set_operations(self):
+        sets = {test_user_id_1: IDSet(test_sets[test_user_id_1]), test_user_id_2: IDSet(test_sets[test_user_id_2]), test_user_id_3: IDSet(test_sets[test_user_id_3])}
+        self.assertListEqual(self.data_processor.intersection(sets.values()), [3, 7])
+        self.assertDictEqual(self.data_processor.difference(sets), {test_user_id_1: [1, 5], test_user_id_2: [6, 9], test_user_id_3: [0]})
+
+
+class TestSketchIndex(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(0)
+        ids = rng.choice(2**62, 60000, replace=False)
+        # a and b share 10000 of 30000 IDs each, c is disjoint
+        self.sets = {"a": ids[:30000], "b": ids[20000:50000], "c": ids[50000:]}
+
+    def test_overlap_matrix(self):
+        index = SketchIndex(num_perm=256, seed=0)
+        for key, ids in self.sets.items():
+            # sketches are updated page by page
+            for page in np.array_split(ids, 3):
+                index.update(key, page)
+        self.assertListEqual(index.keys, ["a", "b", "c"])
+        self.assertAlmostEqual(index.cardinality("a"), 30000, delta=30000 * 0.05)
+        jaccard = index.jaccard_matrix()
+        self.assertTrue(np.allclose(np.diag(jaccard), 1.0))
+        self.assertAlmostEqual(jaccard[0, 1], 10000 / 50000, delta=0.08)
+        self.assertEqual(jaccard[0, 2], 0.0)
+        overlap = index.overlap_matrix()
+        self.assertTrue(np.allclose(overlap, overlap.T))
+        self.assertAlmostEqual(overlap[0, 1], 10000, delta=10000 * 0.3)
+
+    def test_estimate_overlap(self):
+        index = SketchIndex(num_perm=256, seed=0)
+        for key, ids in self.sets.items():
+            index.update(key, ids)
+        results = index.estimate_overlap(["a", "b"])
+        # the confidence intervals cover the true overlap
+        self.assertLessEqual(results["jaccard"]["lower"], 10000 / 50000)
+        self.assertGreaterEqual(results["jaccard"]["upper"], 10000 / 50000)
+        self.assertLessEqual(results["common_count"]["lower"], 10000)
+        self.assertGreaterEqual(results["common_count"]["upper"], 10000)
+        self.assertAlmostEqual(results["union"], 50000, delta=50000 * 0.05)
+        # wider intervals for higher confidence levels
+        wide = index.estimate_overlap(["a", "b"], confidence=0.99)
+        self.assertLess(wide["jaccard"]["lower"], results["jaccard"]["lower"])
+        # disjoint and empty collections do not overlap
+        self.assertEqual(index.estimate_overlap()["jaccard"]["estimate"], 0.0)
+        index.update("d", [])
+        self.assertDictEqual(index.estimate_overlap(["a", "d"])["common_count"], {"estimate": 0.0, "lower": 0.0, "upper": 0.0})
+        with self.assertRaises(ValueError):
+            index.estimate_overlap(["a"])
+
+    def test_save_and_load(self):
+        index = SketchIndex(num_perm=64)
+        index.update(test_user_id_1, self.sets["a"])
+        index.update(test_user_id_2, [])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "sketches.npz")
+            index.save(path)
+            loaded = SketchIndex.load(path)
+        self.assertListEqual(loaded.keys, [test_user_id_1, test_user_id_2])
+        self.assertTrue(np.array_equal(loaded.signatures, index.signatures))
+        self.assertTrue(np.array_equal(loaded.jaccard_matrix(), index.jaccard_matrix()))
+        # loaded indices can be updated incrementally
+        loaded.update(test_user_id_2, self.sets["a"])
+        self.assertEqual(loaded.jaccard_matrix()[0, 1], 1.0)
+
+
+class TestEntityCooccurrence(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tweets = [
+            {"id": "1", "entities": {"hashtags": [{"tag": "Python"}, {"tag": "NumPy"}], "mentions": [{"username": "WWU_Muenster"}]}},
+            {"id": "2", "entities": {"hashtags": [{"tag": "python"}], "urls": [{"url": "https://t.co/1", "expanded_url": "https://numpy.org"}]}},
+            {"id": "3", "entities": {"hashtags": [{"tag": "numpy"}, {"tag": "python"}]}, "context_annotations": [{"domain": {"id": "66", "name": "Interests and Hobbies Category"}, "entity": {"id": "1", "name": "Programming"}}]},
+            {"id": "4", "text": "no entities"},
+        ]
+
+    def test_extract(self):
+        labels = EntityCooccurrence.extract(self.tweets[2])
+        self.assertListEqual(labels, ["domain:Interests and Hobbies Category", "hashtag:numpy", "hashtag:python", "topic:Programming"])
+        self.assertListEqual(EntityCooccurrence.extract(self.tweets[3]), [])
+
+    def test_incremental_counts(self):
+        cooccurrence = EntityCooccurrence()
+        # tweets are added in two updates
+        cooccurrence.update(self.tweets[:2])
+        cooccurrence.update(self.tweets[2:])
+        self.assertEqual(cooccurrence.num_tweets, 4)
+        self.assertDictEqual(cooccurrence.frequencies("hashtag"), {"hashtag:python": 3, "hashtag:numpy": 2})
+        self.assertDictEqual(cooccurrence.frequencies(top=1), {"hashtag:python": 3})
+        self.assertListEqual(cooccurrence.top_pairs(n=1), [("hashtag:numpy", "hashtag:python", 2)])
+        self.assertDictEqual(cooccurrence.related("hashtag:numpy", n=2), {"hashtag:python": 2, "mention:wwu_muenster": 1})
+        labels, rows, cols, counts = cooccurrence.matrix(kind="hashtag")
+        self.assertListEqual([(labels[row], labels[col], count) for row, col, count in zip(rows, cols, counts)], [("hashtag:numpy", "hashtag:python", 2)])
+        with self.assertRaises(ValueError):
+            cooccurrence.frequencies("emoji")
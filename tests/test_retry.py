@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import tweepy
+from config import PySNATestCase
+
+from pysna.fetch import TwitterDataFetcher
+from pysna.retry import (
+    CircuitOpenError,
+    ClientError,
+    DeadlineExceeded,
+    RetryPolicy,
+    TransientError,
+    classify,
+)
+
+
+class FaultServer:
+    """Local HTTP server that answers requests with scripted faults.
+
+    Every response is taken from 'faults' as (status code, headers) until the script is used up, then requests succeed.
+    A status code of None closes the connection without a response.
+    """
+
+    def __init__(self):
+        self.faults = list()
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                status, headers = server.faults.pop(0) if server.faults else (200, dict())
+                if status is None:
+                    self.close_connection = True
+                    return
+                body = json.dumps({"data": [{"id": "1"}]} if status == 200 else {"title": "Fault", "detail": "Injected fault"}).encode("utf-8")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{}".format(self.httpd.server_address[1])
+        self.host = "127.0.0.1:{}".format(self.httpd.server_address[1])
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestRetryPolicy(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.server = FaultServer()
+        self.policy = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.05, failure_threshold=4, recovery_time=0.2)
+        self.fetcher = TwitterDataFetcher(bearer_token="token", retry_policy=self.policy)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_retry_transient(self):
+        self.server.faults = [(503, dict()), (None, dict()), (500, dict())]
+        self.assertEqual(self.fetcher._manual_request(f"{self.server.url}/2/tweets"), {"data": [{"id": "1"}]})
+        self.assertEqual(self.server.requests, 4)
+        metrics = self.policy.metrics()[self.server.host]
+        self.assertEqual((metrics["calls"], metrics["retries"], metrics["failures"]), (1, 3, 0))
+        self.assertGreater(metrics["wasted_time"], 0)
+
+    def test_client_error(self):
+        self.server.faults = [(404, dict())]
+        with self.assertRaises(ClientError) as context:
+            self.fetcher._manual_request(f"{self.server.url}/2/tweets")
+        self.assertEqual(context.exception.status_code, 404)
+        # rejected requests are not retried
+        self.assertEqual(self.server.requests, 1)
+
+    def test_retry_after(self):
+        # custom headers (e.g., Botometer API) are retried on rate limits, too
+        self.server.faults = [(429, {"Retry-After": "1"})]
+        start = time.monotonic()
+        self.fetcher._manual_request(f"{self.server.url}/2/tweets", header={"X-Key": "key"})
+        self.assertGreaterEqual(time.monotonic() - start, 1)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_exhausted_retries(self):
+        self.server.faults = [(502, dict())] * 4
+        with self.assertRaises(TransientError):
+            self.fetcher._manual_request(f"{self.server.url}/2/tweets", header={"X-Key": "key"})
+        self.assertEqual(self.server.requests, 4)
+        self.assertEqual(self.policy.metrics()[self.server.host]["failures"], 1)
+
+    def test_circuit_breaker(self):
+        self.server.faults = [(503, dict())] * 10
+        with self.assertRaises(TransientError):
+            self.fetcher._manual_request(f"{self.server.url}/2/tweets")
+        # the circuit opened after four failures and rejects further requests without making them
+        self.assertEqual(self.policy.breaker(self.server.host).state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.fetcher._manual_request(f"{self.server.url}/2/tweets")
+        self.assertEqual(self.server.requests, 4)
+        self.assertEqual(self.policy.metrics()[self.server.host]["rejected"], 1)
+        # a successful trial request closes the circuit after the recovery time
+        self.server.faults = list()
+        time.sleep(0.2)
+        self.fetcher._manual_request(f"{self.server.url}/2/tweets")
+        self.assertEqual(self.policy.breaker(self.server.host).state, "closed")
+
+    def test_deadline(self):
+        self.server.faults = [(503, {"Retry-After": "5"})]
+        with self.assertRaises(DeadlineExceeded):
+            with self.policy.deadline(1):
+                self.fetcher._manual_request(f"{self.server.url}/2/tweets")
+        self.assertEqual(self.server.requests, 1)
+        # nested deadlines only extend outer ones explicitly
+        with self.policy.deadline(1):
+            with self.policy.deadline(10):
+                self.assertLessEqual(self.policy.remaining_time(), 1)
+            with self.policy.deadline(10, extend=True):
+                self.assertGreater(self.policy.remaining_time(), 1)
+            with self.policy.deadline(None, extend=True):
+                self.assertIsNone(self.policy.remaining_time())
+            self.assertLessEqual(self.policy.remaining_time(), 1)
+
+    def test_tweepy_errors(self):
+        attempts = list()
+
+        def fail():
+            attempts.append(1)
+            response = requests.Response()
+            response.status_code = 503 if len(attempts) < 3 else 403
+            raise tweepy.errors.TwitterServerError(response) if len(attempts) < 3 else tweepy.errors.Forbidden(response)
+
+        # server errors are retried, tweepy errors are raised as is
+        with self.assertRaises(tweepy.errors.Forbidden):
+            self.policy.call("api.twitter.com", fail)
+        self.assertEqual(len(attempts), 3)
+
+    def test_session_errors(self):
+        def wrapped(error):
+            # tweepy wraps errors of the session like this
+            try:
+                try:
+                    raise error
+                except Exception as e:
+                    raise tweepy.errors.TweepyException(f"Failed to send request: {e}")
+            except tweepy.errors.TweepyException as e:
+                return e
+
+        # only connection errors and timeouts are transient
+        self.assertEqual(classify(wrapped(requests.exceptions.ConnectionError("reset"))), (True, False, None))
+        self.assertEqual(classify(wrapped(requests.exceptions.ReadTimeout("timeout"))), (True, False, None))
+        for error in (requests.exceptions.InvalidURL("url"), requests.exceptions.SSLError("ssl"), requests.exceptions.TooManyRedirects("redirects"), ValueError("cassette")):
+            self.assertEqual(classify(wrapped(error)), (False, False, None))
+        self.assertEqual(classify(requests.exceptions.SSLError("ssl")), (False, False, None))
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from config import PySNATestCase
+
+from pysna.pool import CredentialPool
+from pysna.retry import DeadlineExceeded
+from pysna.schedule import RequestScheduler
+
+
+class TestRequestScheduler(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.pool = CredentialPool([{"bearer_token": "token0"}, {"bearer_token": "token1"}])
+        self.scheduler = RequestScheduler(self.pool, workers=2)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def _limit(self, idx, endpoint, limit, remaining, reset):
+        self.pool.credentials[idx].limits[endpoint] = {"limit": limit, "remaining": remaining, "reset": reset}
+
+    def test_overtake_exhausted_endpoint(self):
+        now = time.time()
+        for idx in range(2):
+            self._limit(idx, "1.1/followers/ids", 15, 0, now + 1)
+        finished = list()
+        exhausted = self.scheduler.submit("1.1/followers/ids", lambda: finished.append("followers") or "followers")
+        available = self.scheduler.submit("2/users/:id/liked_tweets", lambda: finished.append("likes") or "likes")
+        self.assertEqual(available.result(timeout=5), "likes")
+        self.assertEqual(self.scheduler.queue_depth(), {"1.1/followers/ids": 1})
+        # queued job runs after the reset
+        self.assertEqual(exhausted.result(timeout=5), "followers")
+        self.assertEqual(finished, ["likes", "followers"])
+        self.assertGreaterEqual(time.time(), now + 1)
+        self.assertEqual(self.scheduler.queue_depth(), dict())
+
+    def test_exception(self):
+        future = self.scheduler.submit("1.1/users/show", lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+
+    def test_eta(self):
+        now = time.time()
+        self._limit(0, "1.1/followers/ids", 15, 5, now + 100)
+        self._limit(1, "1.1/followers/ids", 15, 0, now + 300)
+        # remaining requests are available immediately
+        self.assertEqual(self.scheduler._completion("1.1/followers/ids", 5, now), now)
+        # further requests after the resets of the credentials' windows
+        self.assertEqual(self.scheduler._completion("1.1/followers/ids", 20, now), now + 100)
+        self.assertEqual(self.scheduler._completion("1.1/followers/ids", 35, now), now + 300)
+        self.assertEqual(self.scheduler._completion("1.1/followers/ids", 50, now), now + 100 + RequestScheduler.WINDOW)
+        # unknown endpoints are assumed to be unlimited
+        self.assertEqual(self.scheduler._completion("1.1/friends/ids", 100, now), now)
+
+    def test_fetcher_schedule(self):
+        self.fetcher.get_user_follower_ids = lambda user: {int(user) + 1}
+        self.assertEqual(self.fetcher.schedule("get_user_follower_ids", 1).result(timeout=5), {2})
+        with self.assertRaises(KeyError):
+            self.fetcher.schedule("get_botometer_scores", 1)
+
+    def test_deadline(self):
+        now = time.time()
+        for idx in range(2):
+            self._limit(idx, "1.1/followers/ids", 15, 0, now + 60)
+        # queued jobs inherit the deadline of the submitting thread
+        with self.pool.retry.deadline(0.2):
+            queued = self.scheduler.submit("1.1/followers/ids", lambda: "followers")
+            running = self.scheduler.submit("1.1/users/show", self.pool.retry.remaining_time)
+        with self.assertRaises(DeadlineExceeded):
+            queued.result(timeout=5)
+        self.assertLessEqual(running.result(timeout=5), 0.2)
+        self.assertEqual(self.scheduler.queue_depth(), dict())
+
+    def test_priority(self):
+        now = time.time()
+        for idx in range(2):
+            self._limit(idx, "1.1/followers/ids", 10, 4, now + 60)
+        # background jobs leave half of the limit of every credential to other jobs
+        background = self.scheduler.submit("1.1/followers/ids", lambda: "background", priority="background")
+        normal = self.scheduler.submit("1.1/followers/ids", lambda: "normal")
+        self.assertEqual(normal.result(timeout=5), "normal")
+        self.assertEqual(self.scheduler.queue_depth(), {"1.1/followers/ids": 1})
+        self.assertFalse(background.done())
+        # high-priority jobs jump the queue and run with their priority
+        scheduler = RequestScheduler(self.pool, workers=1)
+        gate, order = threading.Event(), list()
+        scheduler.submit("1.1/users/show", gate.wait)
+        later = scheduler.submit("1.1/users/show", lambda: order.append(self.pool.current_priority()), priority="background")
+        first = scheduler.submit("1.1/users/show", lambda: order.append(self.pool.current_priority()), priority="high")
+        gate.set()
+        first.result(timeout=5)
+        later.result(timeout=5)
+        self.assertEqual(order, ["high", "background"])
+        # jobs inherit the priority of the submitting thread
+        with self.pool.prioritized("background"):
+            self.assertEqual(scheduler.submit("1.1/users/show", self.pool.current_priority).result(timeout=5), "background")
+        with self.assertRaises(ValueError):
+            scheduler.submit("1.1/users/show", time.time, priority="urgent")
+        scheduler.shutdown()
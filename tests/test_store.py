@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+import tempfile
+import time
+
+import numpy as np
+from config import PySNATestCase
+
+from pysna.store import (
+    IDStore,
+    LRUCache,
+    MetricsStore,
+    NegativeCache,
+    RateLimitStore,
+    TimelineStore,
+)
+
+test_user_id_1 = 24677217
+test_user_id_2 = 38180826
+test_user_id_3 = 160286320
+
+test_sets = {test_user_id_1: set([1, 3, 5, 7]), test_user_id_2: set([3, 6, 7, 9]), test_user_id_3: set([0, 3, 7])}
+
+
+class TestIDStore(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = IDStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_and_read(self):
+        # write unsorted IDs with duplicates
+        results = self.store.write("followers_1", [9, 3, 3, 1, 2**62])
+        # assert sorted, deduplicated memory map
+        self.assertIsInstance(results, np.memmap)
+        self.assertEqual(results.dtype, np.int64)
+        self.assertListEqual(results.tolist(), [1, 3, 9, 2**62])
+        self.assertListEqual(self.store.read("followers_1").tolist(), [1, 3, 9, 2**62])
+        # assert metadata
+        self.assertEqual(self.store.metadata("followers_1")["count"], 4)
+        self.assertIn("followers_1", self.store)
+        self.assertListEqual(self.store.keys(), ["followers_1"])
+        # overwrite collection
+        self.store.write("followers_1", set([5]))
+        self.assertListEqual(self.store.read("followers_1").tolist(), [5])
+        self.assertEqual(len(self.store), 1)
+        # delete collection
+        self.store.delete("followers_1")
+        self.assertNotIn("followers_1", self.store)
+        with self.assertRaises(KeyError):
+            self.store.read("followers_1")
+
+    def test_write_pages(self):
+        results = self.store.write_pages("retweeters_1", iter([[5, 4], [], [3, 4]]))
+        self.assertListEqual(results.tolist(), [3, 4, 5])
+        self.assertDictEqual(self.store.index(), {"retweeters_1": self.store.metadata("retweeters_1")})
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            self.store.write("../followers", [1])
+
+    def test_set_operations_on_mapped_buffers(self):
+        # store test sets
+        mapped = {key: self.store.write(f"followers_{key}", values) for key, values in test_sets.items()}
+        # intersection and difference must equal the results for Python sets
+        self.assertListEqual(sorted(self.data_processor.intersection(mapped.values())), sorted(self.data_processor.intersection(test_sets.values())))
+        expected = {key: sorted(values) for key, values in self.data_processor.difference(test_sets).items()}
+        self.assertDictEqual(self.data_processor.difference(mapped), expected)
+
+
+class TestTimelineStore(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = TimelineStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_prepend(self):
+        self.assertIsNone(self.store.newest_id("composed_tweets_1"))
+        # timelines keep their order
+        self.assertListEqual(self.store.prepend("composed_tweets_1", [30, 20, 10]).tolist(), [30, 20, 10])
+        self.assertListEqual(self.store.prepend("composed_tweets_1", [50, 40, 30]).tolist(), [50, 40, 30, 20, 10])
+        self.assertEqual(self.store.newest_id("composed_tweets_1"), 50)
+        self.assertEqual(self.store.metadata("composed_tweets_1")["count"], 5)
+        # empty updates keep the timeline
+        self.assertListEqual(self.store.prepend("composed_tweets_1", []).tolist(), [50, 40, 30, 20, 10])
+
+    def test_prepend_records(self):
+        self.assertListEqual(self.store.read_records("composed_tweets_texts_1"), list())
+        self.store.prepend_records("composed_tweets_texts_1", [{"id": "20", "text": "b"}, {"id": "10", "text": "a"}])
+        records = self.store.prepend_records("composed_tweets_texts_1", [{"id": "30", "text": "c"}, {"id": "20", "text": "b"}])
+        # records keep their order and duplicates are removed
+        self.assertListEqual([record["text"] for record in records], ["c", "b", "a"])
+        self.assertListEqual(self.store.read_records("composed_tweets_texts_1"), records)
+        self.assertEqual(self.store.newest_id("composed_tweets_texts_1"), 30)
+        self.store.delete("composed_tweets_texts_1")
+        self.assertListEqual(self.store.read_records("composed_tweets_texts_1"), list())
+
+
+class TestLRUCache(PySNATestCase):
+    def test_eviction(self):
+        cache = LRUCache(max_size=2)
+        cache[1] = "a"
+        cache[2] = "b"
+        # reading an entry marks it as recently used
+        self.assertEqual(cache[1], "a")
+        cache[3] = "c"
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(2, cache)
+        self.assertListEqual(list(cache), [1, 3])
+        with self.assertRaises(ValueError):
+            LRUCache(max_size=0)
+
+
+class TestMetricsStore(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MetricsStore(self.tmp_dir.name)
+        # two Tweets sampled every 30 minutes
+        for step in range(4):
+            self.store.append({1: {"like_count": 10 * step, "retweet_count": step}, 2: {"like_count": 5}}, timestamp=1800.0 * step)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read(self):
+        self.assertEqual(len(self.store), 8)
+        samples = self.store.read(["tweet_id", "like_count"], start=1800.0, end=5400.0)
+        self.assertListEqual(samples["tweet_id"].tolist(), [1, 2, 1, 2])
+        self.assertListEqual(samples["like_count"].tolist(), [10, 5, 20, 5])
+        samples = self.store.read(["timestamp", "retweet_count", "quote_count"], tweet_ids=[1])
+        self.assertListEqual(samples["retweet_count"].tolist(), [0, 1, 2, 3])
+        self.assertListEqual(samples["quote_count"].tolist(), [0, 0, 0, 0])
+        with self.assertRaises(KeyError):
+            self.store.read(["views"])
+        # samples must be appended in chronological order
+        with self.assertRaises(ValueError):
+            self.store.append({1: {"like_count": 0}}, timestamp=0.0)
+        # samples are loaded from the directory
+        self.assertEqual(len(MetricsStore(self.tmp_dir.name)), 8)
+
+    def test_growth_rates(self):
+        self.assertDictEqual(self.store.growth_rates("like_count"), {1: 20.0, 2: 0.0})
+        self.assertDictEqual(self.store.growth_rates("retweet_count", start=1800.0), {1: 2.0, 2: 0.0})
+        # time ranges without samples and empty stores have no growth rates
+        self.assertDictEqual(self.store.growth_rates(start=10**9), dict())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertDictEqual(MetricsStore(tmp_dir).growth_rates(), dict())
+
+
+class TestRateLimitStore(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = RateLimitStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reserve(self):
+        now = time.time()
+        # unknown windows are granted
+        self.assertTrue(self.store.reserve("a", "1.1/followers/ids", now))
+        self.store.update("a", "1.1/followers/ids", {"limit": 15, "remaining": 2, "reset": now + 60})
+        self.assertTrue(self.store.reserve("a", "1.1/followers/ids", now))
+        self.assertTrue(self.store.reserve("a", "1.1/followers/ids", now))
+        self.assertFalse(self.store.reserve("a", "1.1/followers/ids", now))
+        # reset windows are granted again
+        self.assertTrue(self.store.reserve("a", "1.1/followers/ids", now + 61))
+
+    def test_update(self):
+        now = time.time()
+        self.store.update("a", "1.1/followers/ids", {"limit": 15, "remaining": 10, "reset": now + 60})
+        self.store.reserve("a", "1.1/followers/ids", now)
+        # responses of the same window do not count requests reserved by other processes yet
+        self.store.update("a", "1.1/followers/ids", {"limit": 15, "remaining": 10, "reset": now + 60})
+        self.assertEqual(self.store.read()["a"]["1.1/followers/ids"]["remaining"], 9)
+        # a new window replaces the state
+        self.store.update("a", "1.1/followers/ids", {"limit": 15, "remaining": 14, "reset": now + 960})
+        self.store.update("b", "1.1/friends/ids", {"limit": 15, "remaining": 1, "reset": now + 60})
+        self.assertDictEqual(RateLimitStore(self.tmp_dir.name).read("1.1/followers/ids"), {"a": {"1.1/followers/ids": {"limit": 15, "remaining": 14, "reset": now + 960}}})
+
+
+class TestNegativeCache(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = NegativeCache(ttl=60, directory=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_ttl(self):
+        now = time.time()
+        self.cache.add("user_id", 1, "suspended", now)
+        self.assertEqual(self.cache.get("user_id", "1", now + 30), "suspended")
+        self.assertIsNone(self.cache.get("screen_name", "1", now + 30))
+        # expired entries are removed
+        self.assertIsNone(self.cache.get("user_id", 1, now + 61))
+        self.assertEqual(len(self.cache), 0)
+        with self.assertRaises(ValueError):
+            self.cache.add("tweet", 1, "deleted")
+
+    def test_shared(self):
+        self.cache.add("tweet", 2, "not_found")
+        # other processes and later runs read the same database
+        other = NegativeCache(ttl=60, directory=self.tmp_dir.name)
+        self.assertEqual(other.get("tweet", 2), "not_found")
+        self.assertEqual(len(other), 1)
+        other.discard("tweet", 2)
+        self.assertIsNone(NegativeCache(directory=self.tmp_dir.name).get("tweet", 2))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import queue
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import PySNATestCase
+
+from pysna.stream import SentimentStream, replay_ndjson
+
+test_tweets = ["I love this, it is great!", "This is terrible and sad.", "The meeting is at noon."]
+
+
+class TestSentimentStream(PySNATestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "stream.ndjson")
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        # 60 tweets, one every 10 seconds; stream messages wrap tweets in a 'data' field
+        with open(self.path, "w", encoding="utf-8") as handle:
+            for idx in range(60):
+                tweet = {"id": str(idx), "text": test_tweets[idx % 3], "created_at": (start + timedelta(seconds=10 * idx)).isoformat().replace("+00:00", ".000Z"), "entities": {"hashtags": [{"tag": "pysna"}]}}
+                handle.write(json.dumps({"data": tweet} if idx % 2 else tweet) + "\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rolling_window(self):
+        stream = SentimentStream(window=300.0, resolution=10.0, batch_size=16)
+        stream.consume(replay_ndjson(self.path, speed=None))
+        self.assertEqual(stream.processed, 60)
+        results = stream.aggregates(top=1)
+        # only the last 5 minutes are kept
+        self.assertEqual(results["volume"], 30)
+        self.assertDictEqual(results["sentiment"], {"positive": 10, "neutral": 10, "negative": 10})
+        self.assertDictEqual(results["top_entities"], {"hashtag:pysna": 30})
+        self.assertEqual(results["end"] - results["start"], 300.0)
+
+    def test_replay_speed(self):
+        start = time.monotonic()
+        tweets = list(tweet for _, tweet in zip(range(3), replay_ndjson(self.path, speed=100.0)))
+        # the third tweet was created 20 seconds after the first one
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertListEqual([tweet["id"] for tweet in tweets], ["0", "1", "2"])
+
+    def test_backpressure(self):
+        stream = SentimentStream(batch_size=4, max_queue_size=2)
+        stream.put({"text": test_tweets[0]})
+        stream.put({"text": test_tweets[1]})
+        # the producer is blocked while the queue is full
+        with self.assertRaises(queue.Full):
+            stream.put({"text": test_tweets[2]}, timeout=0.05)
+        stream.start()
+        for tweet in test_tweets * 3:
+            stream.put({"text": tweet}, timeout=5)
+        stream.stop()
+        self.assertEqual(stream.processed, 11)
+        self.assertEqual(stream.aggregates()["queue_size"], 0)
+
+    def test_malformed_tweets(self):
+        stream = SentimentStream(batch_size=2, max_queue_size=2)
+        stream.start()
+        # malformed tweets neither stop the consumer nor block the producer
+        for tweet in [{"text": test_tweets[0], "created_at": "yesterday"}, {"text": None, "entities": "none"}] + [{"text": tweet} for tweet in test_tweets * 2]:
+            stream.put(tweet, timeout=5)
+        stream.stop()
+        self.assertEqual(stream.aggregates()["queue_size"], 0)
+        # an unparseable creation date counts as missing, the tweet with malformed entities is skipped
+        self.assertEqual(stream.aggregates()["volume"], 7)